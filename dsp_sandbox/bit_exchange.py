@@ -1,8 +1,10 @@
 from amaranth import *
 from math import ceil, log2
+from functools import lru_cache
 
 from .streams import SampleStream
 from .delay import StreamDelay
+from .pipeline import StreamPipeline
 
 # TODO: Add documentation
 # Reference:
@@ -18,6 +20,7 @@ class SerialBitExchange(Elaboratable):
         self.j            = j
         self.k            = k
         self.L            = 2**j - 2**k
+        self.latency      = self.L
         self.internal_s   = internal_s
         # signals
         self.input        = SampleStream(shape)
@@ -87,35 +90,190 @@ class SerialBitExchange(Elaboratable):
 
         return m
 
-class SerialBitReversal(Elaboratable):
-    def __init__(self, shape, N):
+class SerialBitPermutation(Elaboratable):
+    '''
+    Streaming bit-index permutation of frames of 2^n samples
+
+    The sample with input index i is emitted at the output position whose bit j is bit
+    `permutation[j]` of i. The permutation is decomposed into the minimum number of
+    `SerialBitExchange` stages, choosing among those the decomposition with the smallest total
+    delay (see `bit_exchanges`).
+    '''
+    def __init__(self, shape, permutation):
+        assert sorted(permutation) == list(range(len(permutation))), "invalid permutation"
+        self.shape       = shape
+        self.permutation = list(permutation)
+        self.exchanges   = bit_exchanges(self.permutation)
+        self.latency     = self.delay()
+        # signals
+        self.input       = SampleStream(shape)
+        self.output      = SampleStream(shape)
+
+    def delay(self):
+        '''Total number of samples held in delay lines'''
+        return sum(2**j - 2**k for j, k in self.exchanges)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        stages = [ SerialBitExchange(self.shape, j, k) for j, k in self.exchanges ]
+        if not stages:
+            m.d.comb += self.output.stream_eq(self.input)
+            return m
+
+        # Connect stages
+        pipeline = StreamPipeline(stages)
+        pipeline.elaborate(m)
+        m.d.comb += [
+            pipeline.input.stream_eq(self.input),
+            self.output.stream_eq(pipeline.output),
+        ]
+
+        return m
+
+class SerialBitReversal(SerialBitPermutation):
+    def __init__(self, shape, N, channels=1):
         assert N & (N-1) == 0, "N must be a power of two"
-        self.shape = shape
+        assert channels & (channels-1) == 0, "channels must be a power of two"
         self.N = N
+        self.channels = channels
+        # Interleaved channels take the lowest index bits, which are kept in place
+        channel_bits = ceil(log2(channels))
+        super().__init__(shape, list(range(channel_bits)) + bit_reversal(ceil(log2(N)), offset=channel_bits))
+
+class SerialHalfSwap(Elaboratable):
+    '''
+    Swaps the two halves of every frame of N samples (fftshift)
+
+    This is not a bit permutation but a bit inversion, so it does not decompose into bit
+    exchanges. The first half of every frame is stored in a memory of N/2 samples and emitted
+    after the second half, while the first half of the next frame overwrites the samples
+    already emitted.
+    '''
+    def __init__(self, shape, N):
+        assert N % 2 == 0, "N must be even"
+        self.shape  = shape
+        self.N      = N
         # signals
         self.input  = SampleStream(shape)
         self.output = SampleStream(shape)
-        self.s      = Signal()
 
     def elaborate(self, platform):
         m = Module()
 
-        bits = ceil(log2(self.N))
+        half = self.N // 2
 
-        j, k = bits-1, 0
-        
-        stages = []
-        while j != k and j > k:
-            bx_stage = SerialBitExchange(self.shape, j, k)
-            m.submodules[f'bx_{j}_{k}'] = bx_stage
-            stages.append(bx_stage)
-            j, k = j-1, k+1
+        mem = Memory(width=len(self.input.payload), depth=half)
+        m.submodules.mem_wr = mem_wr = mem.write_port()
+        m.submodules.mem_rd = mem_rd = mem.read_port(domain="sync", transparent=False)
 
-        # Connect stages
-        last = self.input
-        for stage in stages:
-            m.d.comb += stage.input.stream_eq(last)
-            last = stage.output
-        m.d.comb += self.output.stream_eq(last)
+        # wr_idx:  position of the next input sample within its frame
+        # rd_idx:  next stored sample to emit
+        # pending: a stored first half is waiting to be emitted
+        wr_idx  = Signal(range(self.N))
+        rd_idx  = Signal(range(half))
+        pending = Signal()
+
+        first_half = wr_idx < half
+        slot_free  = ~pending | (rd_idx > wr_idx)
+
+        # First halves go to memory, second halves pass through once the previous frame is done
+        m.d.comb += [
+            self.input.ready .eq(Mux(first_half, slot_free, self.output.produce & ~pending)),
+            mem_wr.addr      .eq(wr_idx),
+            mem_wr.data      .eq(self.input.payload),
+            mem_wr.en        .eq(self.input.consume & first_half),
+        ]
+        with m.If(self.input.consume):
+            m.d.sync += wr_idx.eq(Mux(wr_idx == self.N - 1, 0, wr_idx + 1))
+            with m.If(wr_idx == self.N - 1):
+                m.d.sync += pending.eq(1)
+
+        # Output multiplexer, selecting stored or incoming samples
+        from_mem  = Signal()
+        bypass    = Signal.like(self.input.payload)
+        m.d.comb += [
+            mem_rd.addr         .eq(rd_idx),
+            mem_rd.en           .eq(self.output.produce),
+            self.output.payload .eq(Mux(from_mem, mem_rd.data, bypass)),
+        ]
+        with m.If(self.output.produce):
+            m.d.sync += [
+                self.output.valid .eq(pending | (self.input.valid & ~first_half)),
+                from_mem          .eq(pending),
+                bypass            .eq(self.input.payload),
+            ]
+            with m.If(pending):
+                m.d.sync += rd_idx.eq(Mux(rd_idx == half - 1, 0, rd_idx + 1))
+                with m.If(rd_idx == half - 1):
+                    m.d.sync += pending.eq(0)
 
         return m
+
+def bit_reversal(bits, offset=0):
+    '''Bit reversal of `bits` index bits, starting at bit `offset`'''
+    return [ offset + bits - 1 - j for j in range(bits) ]
+
+def digit_reversal(bits, radix=4):
+    '''Digit reversal for radix-`radix` FFTs'''
+    digit_bits = ceil(log2(radix))
+    assert bits % digit_bits == 0, "bits must be a multiple of the digit size"
+    digits = bits // digit_bits
+    return [ (digits - 1 - j // digit_bits) * digit_bits + j % digit_bits for j in range(bits) ]
+
+def stride_permutation(bits, stride_bits):
+    '''
+    Stride-2^stride_bits permutation: the output reads the input with a stride of 2^stride_bits,
+    which transposes a row-major matrix with 2^stride_bits columns
+    '''
+    rows_bits = bits - stride_bits
+    return [ j + stride_bits if j < rows_bits else j - rows_bits for j in range(bits) ]
+
+def bit_exchanges(permutation):
+    '''
+    Decompose a bit permutation into a sequence of bit exchanges (j, k), j > k.
+
+    Every exchange splits one cycle of the remaining permutation, which gives the minimum number
+    of stages (number of bits minus number of cycles). Among those decompositions, the one with
+    the smallest total delay sum(2^j - 2^k) is found by exhaustive search for up to 10 bits, and
+    by greedily picking the cheapest exchange for larger permutations.
+    '''
+    def cycles(perm):
+        seen, result = set(), []
+        for start in range(len(perm)):
+            cycle = []
+            while start not in seen:
+                seen.add(start)
+                cycle.append(start)
+                start = perm[start]
+            if len(cycle) > 1:
+                result.append(cycle)
+        return result
+
+    def candidates(perm):
+        for cycle in cycles(perm):
+            for a in cycle:
+                for b in cycle:
+                    if a > b:
+                        # remaining permutation after exchanging bits a and b first
+                        rest = tuple(b if p == a else a if p == b else p for p in perm)
+                        yield (a, b), 2**a - 2**b, rest
+
+    @lru_cache(maxsize=None)
+    def search(perm):
+        best = (0, ())
+        for exchange, cost, rest in candidates(perm):
+            rest_cost, rest_exchanges = search(rest)
+            if not best[1] or cost + rest_cost < best[0]:
+                best = (cost + rest_cost, (exchange,) + rest_exchanges)
+        return best
+
+    perm = tuple(permutation)
+    if len(perm) <= 10:
+        return list(search(perm)[1])
+
+    exchanges = []
+    while cycles(perm):
+        exchange, _, perm = min(candidates(perm), key=lambda c: c[1])
+        exchanges.append(exchange)
+    return exchanges
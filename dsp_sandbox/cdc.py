@@ -0,0 +1,47 @@
+from amaranth import Elaboratable, Module, Cat, Value, DomainRenamer
+from amaranth.lib.fifo import AsyncFIFO
+
+
+class StreamCDC(Elaboratable):
+    '''
+    Moves a stream from `input_domain` to `output_domain` through an asynchronous FIFO
+
+    Payload, `first` and `last` are carried through the FIFO. `depth` must be a power of 2
+    and large enough to cover the synchronizer latency in both directions, otherwise the
+    crossing limits throughput.
+    '''
+    def __init__(self, stream_class, shape, *, depth=8, input_domain="sync", output_domain="sync"):
+        assert input_domain != output_domain, "both domains are the same, no crossing is needed"
+        self.depth         = depth
+        self.input_domain  = input_domain
+        self.output_domain = output_domain
+        self.input         = stream_class(shape)
+        self.output        = stream_class(shape)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        w_data = Cat(Value.cast(self.input.payload), self.input.first, self.input.last)
+        r_data = Cat(Value.cast(self.output.payload), self.output.first, self.output.last)
+
+        m.submodules.fifo = fifo = AsyncFIFO(width=len(w_data), depth=self.depth, exact_depth=True,
+                                             w_domain=self.input_domain, r_domain=self.output_domain)
+        m.d.comb += [
+            # Write signaling
+            fifo.w_data         .eq(w_data),
+            fifo.w_en           .eq(self.input.valid),
+            self.input.ready    .eq(fifo.w_rdy),
+            # Read signaling
+            r_data              .eq(fifo.r_data),
+            self.output.valid   .eq(fifo.r_rdy),
+            fifo.r_en           .eq(self.output.ready),
+        ]
+
+        return m
+
+
+def in_domain(module, domain):
+    '''Move the synchronous logic of `module` to `domain`'''
+    if domain == "sync":
+        return module
+    return DomainRenamer(domain)(module)
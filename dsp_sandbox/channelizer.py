@@ -0,0 +1,161 @@
+from amaranth import Elaboratable, Module, Signal, Memory, Mux, Array, Cat, Value
+from math import ceil
+
+from .types.fixed_point import Q, FixedPointConst, FixedPointValue
+from .types.complex import Complex
+from .streams import ComplexStream
+from .serial_fft import SerialFFT, FFTScaling
+from .fir import pipelined_adder_tree
+
+
+class PFBChannelizer(Elaboratable):
+    '''
+    Polyphase filter bank channelizer with M channels, critically sampled or 2x oversampled
+
+    A new set of M channel samples is produced every M/oversampling input samples:
+
+        y_k[f] = sum_l x[l] h[f*M/oversampling + M-1 - l] exp(-2j*pi*k*l/M)
+
+    Per-branch sample histories are kept in a single RAM, and the T = ceil(len(taps)/M) filter
+    multipliers are time-shared among the M branches. Branch outputs are fed to the FFT in the
+    order of their absolute sample index modulo M, which implements the circular shift needed
+    for the oversampled case with no additional phase rotation.
+
+    With critical sampling the channelizer accepts one sample per clock cycle; when oversampled,
+    the filter and FFT run at twice the input rate, which must be at most half the clock rate.
+    '''
+    def __init__(self, taps, *, M, shape=Q(1,15), shape_taps=Q(1,17), oversampling=1,
+                 natural_order=True, strategy=FFTScaling.UNSCALED):
+        assert M & (M-1) == 0, "M must be a power of 2"
+        assert oversampling in (1, 2), "only critically sampled or 2x oversampled banks are supported"
+        self.taps          = list(taps)
+        self.M             = M
+        self.T             = ceil(len(self.taps) / M)
+        self.hop           = M // oversampling
+        self.shape_taps    = shape_taps
+        self.natural_order = natural_order
+        self.strategy      = strategy
+        self.input         = ComplexStream(shape)
+        self.output        = ComplexStream(SerialFFT.output_shape(M, shape, strategy))
+
+    def branch_coefficients(self, t):
+        '''Coefficients used by multiplier t, indexed by sample age within the frame'''
+        M = self.M
+        taps = self.taps + [0] * (self.T * M - len(self.taps))
+        return [ taps[t*M + M-1 - q] for q in range(M) ]
+
+    def elaborate(self, platform):
+        m = Module()
+
+        M, T, D = self.M, self.T, self.hop
+        shape = self.input.shape
+        width = len(Value.cast(self.input.payload))
+
+        # Sample history: B blocks of M samples, stored side by side in the same RAM.
+        # A frame reads T+1 consecutive blocks while the next block is being written.
+        B = T + 2
+        mem = Memory(width=B*width, depth=M)
+        m.submodules.hist_wr = hist_wr = mem.write_port(granularity=width)
+        m.submodules.hist_rd = hist_rd = mem.read_port(domain="sync", transparent=False)
+
+        # Write side
+        wr_addr  = Signal(range(M))
+        wr_block = Signal(range(B))
+        avail    = Signal(range(2*M + 1))  # samples written since the start of the current frame
+        m.d.comb += [
+            self.input.ready .eq(avail < 2*M),
+            hist_wr.addr     .eq(wr_addr),
+            hist_wr.data     .eq(Cat([self.input.payload] * B)),
+            hist_wr.en       .eq(Cat(self.input.consume & (wr_block == i) for i in range(B))),
+        ]
+        with m.If(self.input.consume):
+            m.d.sync += wr_addr.eq(Mux(wr_addr == M-1, 0, wr_addr + 1))
+            with m.If(wr_addr == M-1):
+                m.d.sync += wr_block.eq(Mux(wr_block == B-1, 0, wr_block + 1))
+
+        # Frame sequencing
+        #   p:      absolute sample index modulo M, also the FFT input index
+        #   q:      sample age within the frame, (p - offset) mod M
+        #   offset: frame start index modulo M
+        #   block:  block holding the frame start
+        p      = Signal(range(M))
+        q      = Signal(range(M))
+        offset = Signal(range(M))
+        block  = Signal(range(B))
+
+        frame_ready = avail >= M
+        frame_end   = p == M-1
+
+        # Stage 0: read histories for the current branch
+        s0_valid = Signal()
+        s0_ready = Signal()
+        s0_block = Signal(range(B))
+        s0_age   = Signal(range(M))
+        s0_load  = ~s0_valid | s0_ready
+        issue    = s0_load & frame_ready
+
+        m.d.comb += [
+            hist_rd.addr .eq(p),
+            hist_rd.en   .eq(issue),
+        ]
+        with m.If(s0_load):
+            m.d.sync += s0_valid.eq(frame_ready)
+        with m.If(issue):
+            branch_block = Mux(p < offset, Mux(block == B-1, 0, block + 1), block)
+            m.d.sync += [
+                s0_block .eq(branch_block),
+                s0_age   .eq(q),
+                p        .eq(p + 1),
+                q        .eq(q + 1),
+            ]
+            with m.If(frame_end):
+                # Move on to the next frame, `hop` samples later
+                next_offset = (offset + D)[:len(offset)]
+                m.d.sync += [
+                    offset .eq(next_offset),
+                    q      .eq(-next_offset),
+                ]
+                with m.If(offset + D >= M):
+                    m.d.sync += block.eq(Mux(block == B-1, 0, block + 1))
+
+        with m.If(issue & frame_end):
+            m.d.sync += avail.eq(avail + self.input.consume - D)
+        with m.Else():
+            m.d.sync += avail.eq(avail + self.input.consume)
+
+        # Stage 1: multiply every tap by its coefficient
+        blocks = Array(hist_rd.data[i*width:(i+1)*width] for i in range(B))
+        muls_val = []
+        for t in range(T):
+            coeffs = [ FixedPointConst(self.shape_taps, c).value for c in self.branch_coefficients(t) ]
+            rom = Memory(width=len(self.shape_taps), depth=M, init=coeffs)
+            m.submodules[f"coeff_rd{t}"] = coeff_rd = rom.read_port(domain="comb")
+            m.d.comb += coeff_rd.addr.eq(s0_age)
+            coeff = FixedPointValue(self.shape_taps, value=coeff_rd.data.as_signed())
+            sample_block = Mux(s0_block >= t, s0_block - t, s0_block + B - t)
+            sample = Complex(shape=shape, value=blocks[sample_block])
+            muls_val.append(sample * coeff)
+        muls_reg = [ Complex(shape=v.shape, name="mul") for v in muls_val ]
+
+        s1_valid = Signal()
+        s1_ready = Signal()
+        m.d.comb += s0_ready.eq(~s1_valid | s1_ready)
+        with m.If(s0_ready):
+            m.d.sync += s1_valid.eq(s0_valid)
+            with m.If(s0_valid):
+                for reg, value in zip(muls_reg, muls_val):
+                    m.d.sync += reg.eq(value)
+
+        # Adder tree and FFT
+        total, total_valid, total_ready = pipelined_adder_tree(m, muls_reg, s1_valid, s1_ready)
+
+        m.submodules.fft = fft = SerialFFT(N=M, shape=shape, natural_order=self.natural_order,
+                                           strategy=self.strategy)
+        m.d.comb += [
+            fft.input.payload .eq(total.reshape(shape)),
+            fft.input.valid   .eq(total_valid),
+            total_ready       .eq(fft.input.ready),
+            self.output.stream_eq(fft.output),
+        ]
+
+        return m
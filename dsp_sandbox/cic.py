@@ -1,25 +1,32 @@
 from amaranth import Elaboratable, Module, Shape, Signal, Mux, EnableInserter
 from .streams import ComplexStream
+from .pipeline import StreamPipeline
+from .cdc import in_domain
 from .types.fixed_point import Q, FixedPointConst, FixedPointRounding
 from .types.complex import Complex, ComplexConst
 
 class UpsamplingCICFilter(Elaboratable):
-    def __init__(self, M, stages, rate, width_in, width_out=None):
+    def __init__(self, M, stages, rate, width_in, width_out=None, max_ready_depth=None, monitor=False,
+                 domain="sync", rounding=FixedPointRounding.TRUNCATION, overflow=None):
         self.M            = M
+        self.rounding     = rounding
+        self.overflow     = overflow
+        self.domain       = domain
+        self.max_ready_depth = max_ready_depth
+        self.monitor      = monitor
         self.stages       = stages
         self.rate         = rate
         self.width_in     = width_in
         self.width_out    = width_out or (width_in + self.bit_growths()[-1])
         self.input        = ComplexStream(Q(self.width_in, 0))
         self.output       = ComplexStream(Q(self.width_out, 0))
+        self.pipeline     = self.build_pipeline()
 
     def bit_growths(self):
         bit_growths = cic_growth(N=self.stages, M=self.M, R=self.rate)
         return bit_growths
 
-    def elaborate(self, platform):
-        m = Module()
-
+    def build_pipeline(self):
         stages = []
 
         # Calculated bit growths only used below for integrator stages
@@ -41,39 +48,50 @@ class UpsamplingCICFilter(Elaboratable):
             stages += [ IntegratorStage(width, width_out) ]
             width = width_out
 
-        # Rounding strategy: fixed to truncation for now
-        rounding = FixedPointRounding.TRUNCATION
+        return StreamPipeline(stages, max_ready_depth=self.max_ready_depth, monitor=self.monitor)
+
+    def latency(self):
+        return self.pipeline.latency()
+
+    def elaborate(self, platform):
+        m = Module()
+
+        rounding = self.rounding
 
         # Connect all stages to build the final filter
         # For the upsampling CIC, we can only drop bits at the last stage
-        m.submodules += stages
-        last = self.input
-        for stage in stages:
-            m.d.comb += stage.input.stream_eq(last)
-            last = stage.output
-        m.d.comb += self.output.payload.eq(last.payload.reshape(self.output.shape, rounding=rounding))
+        pipeline = self.pipeline
+        pipeline.elaborate(m)
+        m.d.comb += pipeline.input.stream_eq(self.input)
+        last = pipeline.output
+        m.d.comb += self.output.payload.eq(_prune(last.payload, self.output.shape, rounding, self.overflow))
         m.d.comb += self.output.stream_eq(last, omit="payload")
 
-        return m
+        return in_domain(m, self.domain)
 
 
 class DownsamplingCICFilter(Elaboratable):
-    def __init__(self, M, stages, rate, width_in, width_out=None):
+    def __init__(self, M, stages, rate, width_in, width_out=None, max_ready_depth=None, monitor=False,
+                 domain="sync", rounding=FixedPointRounding.TRUNCATION, overflow=None):
         self.M            = M
+        self.rounding     = rounding
+        self.overflow     = overflow
+        self.domain       = domain
+        self.max_ready_depth = max_ready_depth
+        self.monitor      = monitor
         self.stages       = stages
         self.rate         = rate
         self.width_in     = width_in
         self.width_out    = width_out or (self.width_in + ceil(stages * log2(rate * M)))
         self.input        = ComplexStream(Q(self.width_in, 0))
         self.output       = ComplexStream(Q(self.width_out, 0))
+        self.pipeline     = self.build_pipeline()
 
     def truncation_summary(self):
         return cic_truncation(N=self.stages, R=self.rate, M=self.M, 
                               Bin=self.width_in, Bout=self.width_out)
 
-    def elaborate(self, platform):
-        m = Module()
-
+    def build_pipeline(self):
         stages = []
 
         full_width = self.width_in + ceil(self.stages * log2(self.rate * self.M))
@@ -93,20 +111,35 @@ class DownsamplingCICFilter(Elaboratable):
             stage_width = next(stage_widths)
             stages += [ CombStage(self.M, stage_width, stage_width) ]
 
-        # Rounding strategy: fixed to truncation for now
-        rounding = FixedPointRounding.TRUNCATION
+        return StreamPipeline(stages, max_ready_depth=self.max_ready_depth, connect=self.connect_stages,
+                              monitor=self.monitor)
+
+    def latency(self):
+        return self.pipeline.latency()
+
+    def connect_stages(self, source, sink):
+        # Intermediate results rely on wrap-around, so overflow handling is only applied to
+        # the filter output
+        rounding = self.rounding
+        return [
+            sink.payload.eq(_prune(source.payload, sink.shape, rounding)),
+            sink.stream_eq(source, omit="payload"),
+        ]
+
+    def elaborate(self, platform):
+        m = Module()
+
+        rounding = self.rounding
 
         # Connect stages, rounding/truncating where needed
-        m.submodules += stages
-        last = self.input
-        for stage in stages:
-            m.d.comb += stage.input.payload.eq(last.payload.reshape(stage.input.shape, rounding=rounding))
-            m.d.comb += stage.input.stream_eq(last, omit="payload")
-            last = stage.output
-        m.d.comb += self.output.payload.eq(last.payload.reshape(self.output.shape, rounding=rounding))
+        pipeline = self.pipeline
+        pipeline.elaborate(m)
+        m.d.comb += self.connect_stages(self.input, pipeline.input)
+        last = pipeline.output
+        m.d.comb += self.output.payload.eq(_prune(last.payload, self.output.shape, rounding, self.overflow))
         m.d.comb += self.output.stream_eq(last, omit="payload")
         
-        return m
+        return in_domain(m, self.domain)
 
 
 class CombStage(Elaboratable):
@@ -114,6 +147,7 @@ class CombStage(Elaboratable):
         self.M         = M
         self.width_in  = width_in
         self.width_out = width_out or width_in + 1
+        self.latency   = 1
         self.input     = ComplexStream(Q(self.width_in, 0))
         self.output    = ComplexStream(Q(self.width_out, 0))  # 1-bit growth
 
@@ -139,6 +173,7 @@ class CombStage(Elaboratable):
 
 class IntegratorStage(Elaboratable):
     def __init__(self, width_in, width_out):
+        self.latency = 1
         self.input  = ComplexStream(Q(width_in, 0))
         self.output = ComplexStream(Q(width_out, 0))
 
@@ -158,6 +193,7 @@ class IntegratorStage(Elaboratable):
 class Upsampler(Elaboratable):
     def __init__(self, width, factor):
         self.factor = factor
+        self.latency = 1
         self.input  = ComplexStream(Q(width, 0))
         self.output = ComplexStream(Q(width, 0))
 
@@ -185,6 +221,7 @@ class Upsampler(Elaboratable):
 class Downsampler(Elaboratable):
     def __init__(self, width, factor):
         self.factor = factor
+        self.latency = 1
         self.input  = ComplexStream(Q(width, 0))
         self.output = ComplexStream(Q(width, 0))
 
@@ -226,6 +263,14 @@ class Delay(Elaboratable):
         return m
 
     
+def _prune(value, shape, rounding, overflow=None):
+    '''Fit a complex integer value into `shape`, dropping its least significant bits'''
+    drop = max(0, value.shape.integer_bits - shape.integer_bits)
+    value = Complex(value=tuple(Q(part.shape.integer_bits - drop, drop)(part.as_value())
+                                for part in (value.real, value.imag)))
+    return value.reshape(shape, rounding=rounding, overflow=overflow)
+
+
 def _incr(signal, modulo):
     if modulo == 2 ** len(signal):
         return signal + 1
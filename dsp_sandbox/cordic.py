@@ -0,0 +1,149 @@
+from amaranth import Elaboratable, Module, Signal, Mux
+from math import atan, ceil, log2, pi, sqrt
+from functools import reduce
+from enum import IntEnum
+import operator
+
+from .types.fixed_point import Q, FixedPointConst, FixedPointValue
+from .streams import ComplexStream, SampleStream
+
+
+class CORDICMode(IntEnum):
+    ROTATION  = 0
+    VECTORING = 1
+
+
+def cordic_gain(iterations):
+    '''Magnitude gain of a CORDIC with the given number of iterations'''
+    return reduce(operator.mul, (sqrt(1 + 2**(-2*i)) for i in range(iterations)), 1.0)
+
+
+class CORDIC(Elaboratable):
+    '''
+    Pipelined CORDIC, one iteration per pipeline stage
+
+    Angles are expressed in units of pi, as fixed-point values in the range [-1, 1), so that
+    they wrap around naturally.
+
+    With `CORDICMode.ROTATION`, every input sample is rotated by `angle`, which is sampled
+    together with the input payload. The output is a `ComplexStream`.
+
+    With `CORDICMode.VECTORING`, every input sample is converted to polar form. The output is a
+    `SampleStream` whose payload is split into the `magnitude` and `phase` fields.
+
+    Gain compensation is done with shift-and-add terms, so no multipliers are used at all.
+    Results out of the range of `shape_out` are handled according to `overflow`.
+    '''
+    def __init__(self, shape, *, mode=CORDICMode.ROTATION, iterations=None, shape_angle=None,
+                 shape_out=None, gain_compensation=True, overflow=None):
+        self.mode              = mode
+        self.overflow          = overflow
+        self.iterations        = iterations or shape.fraction_bits + 1
+        self.latency           = self.iterations + 2
+        self.shape_angle       = shape_angle or Q(1, shape.fraction_bits)
+        self.gain_compensation = gain_compensation
+        self.shape_out         = shape_out or Q(shape.integer_bits + (1 if gain_compensation else 2),
+                                                shape.fraction_bits)
+        self.input             = ComplexStream(shape)
+        if mode == CORDICMode.ROTATION:
+            self.angle         = FixedPointValue(self.shape_angle)
+            self.output        = ComplexStream(self.shape_out)
+        else:
+            width = len(self.shape_out)
+            self.output        = SampleStream(Q(width + len(self.shape_angle), 0))
+            self.magnitude     = FixedPointValue(self.shape_out, value=self.output.payload[:width].as_signed())
+            self.phase         = FixedPointValue(self.shape_angle, value=self.output.payload[width:].as_signed())
+
+    def elaborate(self, platform):
+        m = Module()
+
+        n = self.iterations
+        shape = self.input.shape
+        guard = ceil(log2(n)) + 1
+        # Datapath holds the CORDIC gain on top of sqrt(2) times the input range
+        shape_xy = Q(shape.integer_bits + 2, shape.fraction_bits + guard)
+        shape_z  = Q(1, max(self.shape_angle.fraction_bits, n) + guard)
+
+        enable = self.output.produce
+        m.d.comb += self.input.ready.eq(enable)
+
+        def register(valid, *values):
+            valid_r  = Signal()
+            values_r = [ FixedPointValue(v.shape, name="cordic") for v in values ]
+            with m.If(enable):
+                m.d.sync += valid_r.eq(valid)
+                m.d.sync += [ r.eq(v) for r, v in zip(values_r, values) ]
+            return (valid_r, *values_r)
+
+        # Pre-rotation by pi brings the remaining angle into the convergence range
+        x = self.input.real.reshape(shape_xy)
+        y = self.input.imag.reshape(shape_xy)
+        if self.mode == CORDICMode.ROTATION:
+            angle = self.angle.reshape(shape_z).as_value()
+            flip  = angle[-1] ^ angle[-2]
+            z     = shape_z(_flip_msb(angle, flip))
+        else:
+            flip  = x.as_value()[-1]
+            z     = shape_z(Mux(flip, -2**(len(shape_z) - 1), 0))
+        x = shape_xy(Mux(flip, -x, x))
+        y = shape_xy(Mux(flip, -y, y))
+        valid, x, y, z = register(self.input.valid, x, y, z)
+
+        # CORDIC iterations, rotating counterclockwise by atan(2^-i) when `ccw` is set
+        for i in range(n):
+            if self.mode == CORDICMode.ROTATION:
+                ccw = ~z.as_value()[-1]
+            else:
+                ccw = y.as_value()[-1]
+            step = FixedPointConst(shape_z, atan(2**-i) / pi).value
+            x_next = shape_xy(Mux(ccw, (x - (y >> i)).reshape(shape_xy), (x + (y >> i)).reshape(shape_xy)))
+            y_next = shape_xy(Mux(ccw, (y + (x >> i)).reshape(shape_xy), (y - (x >> i)).reshape(shape_xy)))
+            z_next = shape_z(Mux(ccw, z.as_value() - step, z.as_value() + step)[:len(shape_z)].as_signed())
+            valid, x, y, z = register(valid, x_next, y_next, z_next)
+
+        # Gain compensation and output
+        if self.gain_compensation:
+            x = _scale(x, 1 / cordic_gain(n), shape_xy.fraction_bits + 2)
+            y = _scale(y, 1 / cordic_gain(n), shape_xy.fraction_bits + 2)
+
+        with m.If(enable):
+            m.d.sync += self.output.valid.eq(valid)
+            if self.mode == CORDICMode.ROTATION:
+                m.d.sync += self.output.real.eq(x.reshape(self.shape_out, overflow=self.overflow))
+                m.d.sync += self.output.imag.eq(y.reshape(self.shape_out, overflow=self.overflow))
+            else:
+                m.d.sync += self.magnitude.eq(x.reshape(self.shape_out, overflow=self.overflow))
+                m.d.sync += self.phase.eq(z.reshape(self.shape_angle))
+
+        return m
+
+
+def _flip_msb(value, flip):
+    '''Invert the most significant bit of `value` if `flip` is set'''
+    return (value ^ (flip << (len(value) - 1)))[:len(value)].as_signed()
+
+
+def _csd(value, bits):
+    '''Canonical signed digit terms (sign, shift) of value, with `bits` fraction bits'''
+    n = round(value * 2**bits)
+    terms, position = [], 0
+    while n:
+        if n & 1:
+            digit = 2 - (n & 3)
+            terms.append((digit, bits - position))
+            n -= digit
+        n >>= 1
+        position += 1
+    return terms
+
+
+def _scale(value, factor, bits):
+    '''Multiply by a constant factor in the range (0, 1) using shifts and adds'''
+    result = None
+    for sign, shift in _csd(factor, bits):
+        term = value.reshape(Q(value.shape.integer_bits, value.shape.fraction_bits + shift)) >> shift
+        if result is None:
+            result = term if sign > 0 else -term
+        else:
+            result = result + term if sign > 0 else result - term
+    return result
@@ -0,0 +1,70 @@
+from amaranth import Elaboratable, Module, Signal
+
+from .types.fixed_point import Q
+from .streams import ComplexStream
+from .nco import NCO, ComplexMixer
+from .cic import DownsamplingCICFilter
+from .fir import FIRFilter
+
+
+class DigitalDownConverter(Elaboratable):
+    '''
+    Digital down-converter: NCO mixer, decimating CIC filter and compensation FIR filter
+
+    The input is multiplied by exp(-2j*pi*n*frequency / 2**phase_bits), decimated by `rate` and
+    filtered by `taps`. CIC outputs are interpreted with its bit growth as fraction bits, so the
+    CIC gain is normalized when (rate*M)**cic_stages is a power of 2.
+
+    All blocks are connected through their stream interfaces, so the chain runs at one sample
+    per clock cycle and propagates backpressure from the output.
+    '''
+    def __init__(self, taps, *, rate, shape_in=Q(1,15), shape_out=Q(1,15), shape_taps=Q(1,17),
+                 cic_stages=4, cic_M=1, cic_width_out=None, phase_bits=32, table_bits=10, dither_bits=0):
+        self.taps          = list(taps)
+        self.rate          = rate
+        self.shape_taps    = shape_taps
+        self.cic_stages    = cic_stages
+        self.cic_M         = cic_M
+        self.cic_width_out = cic_width_out
+        self.phase_bits    = phase_bits
+        self.table_bits    = table_bits
+        self.dither_bits   = dither_bits
+        self.frequency     = Signal(phase_bits)
+        self.input         = ComplexStream(shape_in)
+        self.output        = ComplexStream(shape_out)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        shape_in = self.input.shape
+
+        # Local oscillator and mixer, one extra integer bit for |x * lo| <= sqrt(2) |x|
+        m.submodules.nco = nco = NCO(shape=shape_in, phase_bits=self.phase_bits,
+                                     table_bits=self.table_bits, dither_bits=self.dither_bits)
+        m.d.comb += nco.frequency.eq(-self.frequency)
+
+        shape_mix = Q(shape_in.integer_bits + 1, shape_in.fraction_bits)
+        m.submodules.mixer = mixer = ComplexMixer(shape_in, nco.output.shape, shape_mix)
+        m.d.comb += [
+            mixer.input.stream_eq(self.input),
+            mixer.lo.stream_eq(nco.output),
+        ]
+
+        # Decimation, on the raw integer representation of samples
+        m.submodules.cic = cic = DownsamplingCICFilter(self.cic_M, self.cic_stages, self.rate,
+                                                       len(shape_mix), self.cic_width_out)
+        m.d.comb += [
+            cic.input.payload.eq(mixer.output.payload),
+            cic.input.stream_eq(mixer.output, omit="payload"),
+        ]
+
+        # Compensation filter
+        shape_cic = Q(shape_mix.integer_bits, cic.width_out - shape_mix.integer_bits)
+        m.submodules.fir = fir = FIRFilter(self.taps, shape_cic, self.output.shape, shape_taps=self.shape_taps)
+        m.d.comb += [
+            fir.input.payload.eq(cic.output.payload),
+            fir.input.stream_eq(cic.output, omit="payload"),
+            self.output.stream_eq(fir.output),
+        ]
+
+        return m
@@ -3,6 +3,19 @@ from amaranth.lib.fifo import SyncFIFO
 from .streams import SampleStream
 
 class StreamDelay(Elaboratable):
+    '''
+    Elastic delay line holding up to `delay` samples
+
+    Storage backends:
+      - "distributed": chain of `StreamRegister`s
+      - "shift":       shift register with a dynamic output tap, which maps to SRL primitives
+      - "circular":    single RAM used as a circular buffer
+      - "bram":        `SyncFIFO`
+      - "auto":        chosen by depth and total number of bits
+    '''
+    # Largest delay line, in bits, that is implemented as a shift register by the "auto" policy
+    SHIFT_MAX_BITS = 4096
+
     def __init__(self, shape, delay, storage="auto"):
         self.depth        = delay
         self.shape        = shape
@@ -13,14 +26,85 @@ class StreamDelay(Elaboratable):
     def elaborate(self, platform):
         storage = self.storage
         if storage == "auto":
-            # Decide to use FFs or RAM depending on depth
-            storage = "bram" if self.depth > 2 else "distributed"
+            # Decide to use FFs, shift registers or RAM depending on depth and width
+            width = Shape.cast(self.shape).width
+            if self.depth <= 2:
+                storage = "distributed"
+            elif self.depth * width <= self.SHIFT_MAX_BITS:
+                storage = "shift"
+            else:
+                storage = "circular"
 
         if storage == "distributed":
             return self.elaborate_distributed(platform)
+        elif storage == "shift":
+            return self.elaborate_shift(platform)
+        elif storage == "circular":
+            return self.elaborate_circular(platform)
         elif storage == "bram":
             return self.elaborate_bram(platform)
-        
+        else:
+            raise ValueError(f"unknown storage {storage}")
+
+    def elaborate_shift(self, platform):
+        m = Module()
+
+        # Samples are shifted in on every write and read through a tap at the oldest one,
+        # so no read/write pointers are needed
+        line  = Array(Signal(len(self.input.payload), name=f"shift{i}") for i in range(self.depth))
+        level = Signal(range(self.depth + 1))
+
+        push = self.input.consume
+        pop  = self.output.produce & (level != 0)
+
+        m.d.comb += self.input.ready.eq(level != self.depth)
+        with m.If(push):
+            m.d.sync += line[0].eq(self.input.payload)
+            m.d.sync += [ line[i+1].eq(line[i]) for i in range(self.depth - 1) ]
+
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(level != 0)
+            with m.If(level != 0):
+                m.d.sync += self.output.payload.eq(line[level - 1])
+
+        m.d.sync += level.eq(level + push - pop)
+
+        return m
+
+    def elaborate_circular(self, platform):
+        m = Module()
+
+        # Single RAM with one write pointer; the read pointer is derived from the fill level
+        depth = self.depth
+        mem = Memory(width=len(self.input.payload), depth=depth)
+        m.submodules.mem_wr = mem_wr = mem.write_port()
+        m.submodules.mem_rd = mem_rd = mem.read_port(domain="sync", transparent=False)
+
+        wr_ptr = Signal(range(depth))
+        level  = Signal(range(depth + 1))
+        rd_ptr = Mux(wr_ptr >= level, wr_ptr - level, wr_ptr + depth - level)
+
+        push = self.input.consume
+        pop  = self.output.produce & (level != 0)
+
+        m.d.comb += [
+            self.input.ready    .eq(level != depth),
+            mem_wr.addr         .eq(wr_ptr),
+            mem_wr.data         .eq(self.input.payload),
+            mem_wr.en           .eq(push),
+            mem_rd.addr         .eq(rd_ptr),
+            mem_rd.en           .eq(pop),
+            self.output.payload .eq(mem_rd.data),
+        ]
+        with m.If(push):
+            m.d.sync += wr_ptr.eq(Mux(wr_ptr == depth - 1, 0, wr_ptr + 1))
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(level != 0)
+
+        m.d.sync += level.eq(level + push - pop)
+
+        return m
+
     def elaborate_bram(self, platform):
         m = Module()
 
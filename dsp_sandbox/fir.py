@@ -1,14 +1,28 @@
 from itertools import zip_longest
 from amaranth import Elaboratable, Module, Signal, Cat
 
-from dsp_sandbox.streams import ComplexStream
+from dsp_sandbox.streams import ComplexStream, ParallelComplexStream
 from dsp_sandbox.types.complex import Complex
+from dsp_sandbox.types.fixed_point import Q, FixedPointRounding, pipelined_reshape
+from dsp_sandbox.cdc import in_domain
 
 
 class FIRFilter(Elaboratable):
-    def __init__(self, taps, shape_in, shape_out, *, shape_taps):
+    '''
+    Pipelined FIR filter, folded for symmetric taps
+
+    Output fraction bits are rounded with `rounding` (default: truncation) and integer bits
+    are removed according to `overflow` (default: wrap around). With `pipelined_rounding`,
+    the rounding adder gets its own pipeline stage.
+    '''
+    def __init__(self, taps, shape_in, shape_out, *, shape_taps, domain="sync", rounding=None,
+                 overflow=None, pipelined_rounding=False):
         self.taps       = list(taps)
         self.shape_taps = shape_taps
+        self.domain     = domain
+        self.rounding   = rounding
+        self.overflow   = overflow
+        self.pipelined_rounding = pipelined_rounding
         self.input      = ComplexStream(shape_in)
         self.output     = ComplexStream(shape_out)
 
@@ -57,25 +71,145 @@ class FIRFilter(Elaboratable):
                 m.d.sync += Cat(delay_line).eq(Cat(self.input.payload, *delay_line))
                 
         # Adder tree stages, with ceil(log2(N)) levels
-        level, level_valid, level_ready = muls_reg, muls_valid, muls_ready
-        while len(level) > 1:
-            even = level[0::2]
-            odd  = level[1::2]
-            results = [ a+b if b is not None else a for a,b in zip_longest(even, odd) ]
-            new_level = [ Complex(shape=r.shape) for r in results ]
-            new_valid = Signal()
-            new_ready = Signal()
-            m.d.comb += level_ready.eq(~new_valid | new_ready)
-            with m.If(level_ready):
-                m.d.sync += new_valid.eq(level_valid)
-                with m.If(level_valid):
-                    for reg, value in zip(new_level, results):
-                        m.d.sync += reg.eq(value)
-            level, level_valid, level_ready = new_level, new_valid, new_ready
+        total, total_valid, total_ready = pipelined_adder_tree(m, muls_reg, muls_valid, muls_ready)
+
+        # Output rounding and overflow handling. A plain reshape already truncates, without
+        # the scaling of `FixedPointRounding.TRUNCATION`.
+        shape_out = self.output.shape
+        rounding  = None if self.rounding == FixedPointRounding.TRUNCATION else self.rounding
+        if self.pipelined_rounding:
+            m.d.comb += total_ready.eq(self.output.produce)
+            with m.If(self.output.produce):
+                m.d.sync += self.output.valid.eq(total_valid)
+            rounded = Complex(value=tuple(
+                pipelined_reshape(m, part, shape_out, rounding, self.overflow, enable=self.output.produce)
+                for part in (total.real, total.imag)))
+        else:
+            m.d.comb += self.output.valid  .eq(total_valid)
+            m.d.comb += total_ready        .eq(self.output.ready)
+            rounded = total.reshape(shape_out, rounding=rounding, overflow=self.overflow)
 
         # Output wiring
-        m.d.comb += self.output.payload.eq(level[0].reshape(self.output.payload.shape))
-        m.d.comb += self.output.valid  .eq(level_valid)
-        m.d.comb += level_ready        .eq(self.output.ready)
+        m.d.comb += self.output.payload.eq(rounded)
+
+        return in_domain(m, self.domain)
+
+
+def pipelined_adder_tree(m, level, level_valid, level_ready):
+    '''
+    Add up a list of registered values with a tree of ceil(log2(N)) pipelined stages.
+    Returns the final sum along with its valid and ready signals.
+    '''
+    while len(level) > 1:
+        even = level[0::2]
+        odd  = level[1::2]
+        results = [ a+b if b is not None else a for a,b in zip_longest(even, odd) ]
+        new_level = [ Complex(shape=r.shape) for r in results ]
+        new_valid = Signal()
+        new_ready = Signal()
+        m.d.comb += level_ready.eq(~new_valid | new_ready)
+        with m.If(level_ready):
+            m.d.sync += new_valid.eq(level_valid)
+            with m.If(level_valid):
+                for reg, value in zip(new_level, results):
+                    m.d.sync += reg.eq(value)
+        level, level_valid, level_ready = new_level, new_valid, new_ready
+    return level[0], level_valid, level_ready
+
+
+class ParallelFIRFilter(Elaboratable):
+    '''
+    Parallel FIR filter processing `parallelism` samples per clock cycle.
+
+    Built recursively from 2-parallel Fast FIR Algorithm (FFA) blocks. Each level splits
+    taps and samples into even/odd polyphase components and computes
+
+        Y0 = H0 X0 + z^-1 H1 X1
+        Y1 = (H0 + H1)(X0 + X1) - H0 X0 - H1 X1
+
+    with three subfilters of half length instead of four, saving 25% of the multipliers per
+    level. Subfilters are regular `FIRFilter`s, so symmetric folding is applied wherever a
+    subfilter ends up with symmetric taps (e.g. H0 + H1 for even-length symmetric filters).
+    Output is bit-exact with `FIRFilter` for the same taps and shapes.
+    '''
+    def __init__(self, taps, shape_in, shape_out, *, shape_taps, parallelism=2, domain="sync"):
+        assert parallelism > 1 and parallelism & (parallelism-1) == 0, "parallelism must be a power of 2"
+        assert len(taps) >= parallelism, "at least one tap per lane is needed"
+        self.taps        = list(taps)
+        self.shape_taps  = shape_taps
+        self.parallelism = parallelism
+        self.domain      = domain
+        self.input       = ParallelComplexStream(shape_in, parallelism)
+        self.output      = ParallelComplexStream(shape_out, parallelism)
+
+    def subfilters(self):
+        '''Return (taps, shape_in, shape_taps) for the H0, H1 and H0+H1 subfilters'''
+        # Quantize taps before splitting so that H0+H1 is exact
+        scale = 2**self.shape_taps.fraction_bits
+        taps  = [ round(tap * scale) / scale for tap in self.taps ]
+        h0, h1 = taps[0::2], taps[1::2]
+        h01 = [ a + b for a, b in zip_longest(h0, h1, fillvalue=0) ]
+        shape_in, shape_taps = self.input.shape, self.shape_taps
+        shape_in_sum   = Q(shape_in.integer_bits + 1, shape_in.fraction_bits)
+        shape_taps_sum = Q(shape_taps.integer_bits + 1, shape_taps.fraction_bits)
+        return [
+            (h0,  shape_in,     shape_taps),
+            (h1,  shape_in,     shape_taps),
+            (h01, shape_in_sum, shape_taps_sum),
+        ]
+
+    def elaborate(self, platform):
+        m = Module()
+
+        P = self.parallelism
+        shape_out = self.output.shape
+
+        # Subfilters keep all fraction bits, so that partial results can be combined exactly.
+        # Integer overflows wrap around and cancel out as long as the final output fits.
+        sub_shape_out = Q(shape_out.integer_bits, self.input.shape.fraction_bits + self.shape_taps.fraction_bits)
+        subs = []
+        for taps, shape_in, shape_taps in self.subfilters():
+            if P // 2 == 1:
+                sub = FIRFilter(taps, shape_in, sub_shape_out, shape_taps=shape_taps)
+            else:
+                sub = ParallelFIRFilter(taps, shape_in, sub_shape_out, shape_taps=shape_taps, parallelism=P//2)
+            subs.append(sub)
+        m.submodules.h0, m.submodules.h1, m.submodules.h01 = subs
+
+        # Input polyphase decomposition, broadcast to all subfilters
+        x0 = self.input.samples[0::2]
+        x1 = self.input.samples[1::2]
+        x01 = [ a + b for a, b in zip(x0, x1) ]
+        for sub, lanes in zip(subs, (x0, x1, x01)):
+            m.d.comb += [ dst.eq(src) for dst, src in zip(_lanes(sub.input), lanes) ]
+            m.d.comb += sub.input.valid.eq(self.input.valid & self.input.ready)
+        m.d.comb += self.input.ready.eq(Cat(sub.input.ready for sub in subs).all())
+
+        # Postaddition stage
+        s0, s1, s01 = [ _lanes(sub.output) for sub in subs ]
+        subs_valid = Cat(sub.output.valid for sub in subs).all()
+        for sub in subs:
+            m.d.comb += sub.output.ready.eq(self.output.produce & subs_valid)
+
+        # Delay H1 X1 by one sample of the decimated stream
+        s1_last = Complex(shape=sub_shape_out)
+        s1_delayed = [s1_last] + s1[:-1]
+
+        y0 = [ a + b for a, b in zip(s0, s1_delayed) ]
+        y1 = [ a - b - c for a, b, c in zip(s01, s0, s1) ]
+        y  = [ v for pair in zip(y0, y1) for v in pair ]
+
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(subs_valid)
+            with m.If(subs_valid):
+                m.d.sync += s1_last.eq(s1[-1])
+                for lane, value in zip(self.output.samples, y):
+                    m.d.sync += lane.eq(value.reshape(shape_out))
+
+        return in_domain(m, self.domain)
+
 
-        return m
+def _lanes(stream):
+    if isinstance(stream, ParallelComplexStream):
+        return stream.samples
+    return [stream.payload]
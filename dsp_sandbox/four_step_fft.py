@@ -0,0 +1,180 @@
+from amaranth import Elaboratable, Module, Signal, Memory, Cat
+from cmath import exp, pi
+from math import ceil, log2
+
+from .types.fixed_point import Q, FixedPointRounding
+from .types.complex import Complex, ComplexConst, pipelined_multiply
+from .streams import ComplexStream
+from .serial_fft import SerialFFT, FFTScaling, TwiddleBackend
+from .framing import CornerTurn
+from .pipeline import StreamPipeline
+from .cordic import CORDIC
+
+
+class FourStepFFT(Elaboratable):
+    '''
+    Four-step FFT of N = N1 * N2 points, built from an N1-point and an N2-point SerialFFT
+
+    With n = N2*n1 + n2 and k = k1 + N1*k2:
+
+        X[k1 + N1*k2] = sum_n2 W_N2^(n2*k2) W_N^(n2*k1) sum_n1 x[N2*n1 + n2] W_N1^(n1*k1)
+
+    The input frame is transposed so that every column n2 goes through the N1-point FFT,
+    multiplied by the W_N^(n2*k1) twiddles and transposed again for the N2-point FFTs. With
+    `natural_order`, a last transpose emits bins in natural order; otherwise bins are emitted in
+    k1-major order (index k1*N2 + k2).
+
+    The W_N^(n2*k1) twiddles are generated on the fly, see `FourStepTwiddleStage`, and all
+    twiddle factors are quantized to `twiddle_shape`.
+
+    Corner turns hold one frame each (two if N1 or N2 is not a power of 2), so about 3N samples
+    are buffered, or 2N without `natural_order`, on top of the feedback and reordering memories
+    of the two small FFTs. This is no less than the 2N samples held by the feedback memories
+    and the bit reversal of an N-point SerialFFT: what the four-step form saves are the N-entry
+    twiddle ROMs and the wide datapath of a single large transform.
+    '''
+    def __init__(self, *, N1, N2, shape=Q(1,15), natural_order=True, strategy=FFTScaling.UNSCALED,
+                 twiddle_backend=TwiddleBackend.MULTIPLIER, twiddle_shape=Q(2,15)):
+        self.N1              = N1
+        self.N2              = N2
+        self.natural_order   = natural_order
+        self.strategy        = strategy
+        self.twiddle_backend = twiddle_backend
+        self.twiddle_shape   = twiddle_shape
+        self.input           = ComplexStream(shape)
+        shape_n1             = SerialFFT.output_shape(N1, shape, strategy)
+        self.output          = ComplexStream(SerialFFT.output_shape(N2, shape_n1, strategy))
+
+    def elaborate(self, platform):
+        m = Module()
+
+        N1, N2 = self.N1, self.N2
+        shape = self.input.shape
+        fft_options = dict(strategy=self.strategy, twiddle_backend=self.twiddle_backend,
+                           twiddle_shape=self.twiddle_shape)
+
+        stages = []
+
+        # Columns of the N1 x N2 input matrix
+        stages += [ CornerTurn(shape, N1, N2) ]
+        stages += [ SerialFFT(N=N1, shape=shape, **fft_options) ]
+        shape = stages[-1].output.shape
+
+        # Twiddle factors W_N^(n2*k1), for every column n2
+        stages += [ FourStepTwiddleStage(N1, N2, shape, backend=self.twiddle_backend,
+                                         twiddle_shape=self.twiddle_shape) ]
+
+        # Rows of the N2 x N1 matrix of column transforms
+        stages += [ CornerTurn(shape, N2, N1) ]
+        stages += [ SerialFFT(N=N2, shape=shape, **fft_options) ]
+        shape = stages[-1].output.shape
+
+        if self.natural_order:
+            stages += [ CornerTurn(shape, N1, N2) ]
+
+        pipeline = StreamPipeline(stages)
+        pipeline.elaborate(m)
+        m.d.comb += [
+            pipeline.input.stream_eq(self.input),
+            self.output.stream_eq(pipeline.output),
+        ]
+
+        return m
+
+
+class FourStepTwiddleStage(Elaboratable):
+    '''
+    Multiplies N2 consecutive blocks of N1 samples by W_N^(n2*k1), for block n2 and sample k1
+
+    The exponent e = n2*k1 is accumulated from a counter, instead of reading N twiddle factors
+    from a ROM. With `TwiddleBackend.MULTIPLIER`, W_N^e = W_N^(F*e_hi) * W_N^e_lo is the product
+    of a coarse and a fine ROM factor, with F = 2^ceil(log2(N)/2) so that both ROMs have about
+    sqrt(N) entries; each factor and their product are rounded to `twiddle_shape`. With
+    `TwiddleBackend.CORDIC`, the exponent directly gives the rotation angle.
+    '''
+    def __init__(self, N1, N2, shape, *, backend=TwiddleBackend.MULTIPLIER, twiddle_shape=Q(2,15)):
+        assert N1 & (N1-1) == 0 and N2 & (N2-1) == 0, "N1 and N2 must be powers of 2"
+        self.N1            = N1
+        self.N2            = N2
+        self.backend       = backend
+        self.twiddle_shape = twiddle_shape
+        # Twiddle product and data product, or the CORDIC pre-rotation, iterations and output
+        self.latency       = 6 if backend == TwiddleBackend.MULTIPLIER else shape.fraction_bits + 3
+        self.input         = ComplexStream(shape)
+        self.output        = ComplexStream(shape)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        N1, N2 = self.N1, self.N2
+        N = N1 * N2
+        bits = ceil(log2(N))
+
+        # Exponent n2*k1 of the next input sample, always below N
+        k1       = Signal(range(N1))
+        n2       = Signal(range(N2))
+        exponent = Signal(bits)
+        with m.If(self.input.consume):
+            with m.If(k1 == N1 - 1):
+                m.d.sync += [
+                    k1       .eq(0),
+                    n2       .eq(n2 + 1),
+                    exponent .eq(0),
+                ]
+            with m.Else():
+                m.d.sync += [
+                    k1       .eq(k1 + 1),
+                    exponent .eq(exponent + n2),
+                ]
+
+        if self.backend == TwiddleBackend.CORDIC:
+            # Rotation angle -2e/N in units of pi, wrapped into [-1, 1)
+            angle_shape = Q(1, bits)
+            m.submodules.cordic = cordic = CORDIC(self.input.shape, shape_angle=angle_shape,
+                                                  shape_out=self.output.shape)
+            m.d.comb += [
+                cordic.angle.as_value()   .eq((-(exponent << 1))[:len(angle_shape)]),
+                cordic.input.stream_eq(self.input),
+                self.output.stream_eq(cordic.output),
+            ]
+            return m
+
+        # Coarse and fine twiddle ROMs
+        twiddle_shape = self.twiddle_shape
+        fine_bits = ceil(bits / 2)
+        F = 2**fine_bits
+        def rom(name, factors):
+            init = [ ComplexConst(twiddle_shape, exp(-2j*pi*e/N)).value() for e in factors ]
+            mem = Memory(width=2*len(twiddle_shape), depth=len(init), init=init, name=name)
+            m.submodules[name] = port = mem.read_port(domain="comb")
+            return port
+        coarse_rd = rom("coarse", range(0, N, F))
+        fine_rd   = rom("fine", range(F))
+        m.d.comb += [
+            coarse_rd.addr .eq(exponent[fine_bits:]),
+            fine_rd.addr   .eq(exponent[:fine_bits]),
+        ]
+
+        enable = self.output.produce
+        valid  = Signal(5)
+        m.d.comb += self.input.ready.eq(enable)
+        with m.If(enable):
+            m.d.sync += Cat(valid, self.output.valid).eq(Cat(self.input.valid, valid))
+
+        # Twiddle factor, with the input delayed alongside its computation
+        coarse = Complex(shape=twiddle_shape, value=coarse_rd.data)
+        fine   = Complex(shape=twiddle_shape, value=fine_rd.data)
+        twiddle = pipelined_multiply(m, coarse, fine, enable=enable)
+        twiddle = twiddle.reshape(twiddle_shape, rounding=FixedPointRounding.CONVERGENT)
+        delayed = self.input.payload
+        for i in range(3):
+            delayed_r = Complex(shape=self.input.shape, name=f"delayed{i}")
+            with m.If(enable):
+                m.d.sync += delayed_r.eq(delayed)
+            delayed = delayed_r
+
+        # Complex rotation
+        product = pipelined_multiply(m, delayed, twiddle, enable=enable)
+        m.d.comb += self.output.payload.eq(product.reshape(self.output.shape))
+
+        return m
@@ -0,0 +1,336 @@
+from amaranth import Elaboratable, Module, Signal, Memory, Cat, Mux
+from math import ceil, log2
+
+from .streams import ComplexStream
+
+
+class FrameOverlapBuffer(Elaboratable):
+    '''
+    Splits a sample stream into frames of N samples, starting a new frame every `hop` samples.
+
+    Consecutive frames share N-hop samples, which are replayed from a circular buffer. The
+    buffer starts filled with zeros, so the first frame is made of N-hop zeros followed by
+    the first `hop` input samples. New samples are accepted while the current frame is being
+    emitted, so the output runs at full rate as long as the input rate is below hop/N.
+    '''
+    # Upstream `ready` only depends on the buffer level
+    comb_ready = False
+
+    def __init__(self, shape, N, hop):
+        assert 0 < hop <= N, "hop must be in the range [1, N]"
+        self.N      = N
+        self.hop    = hop
+        self.input  = ComplexStream(shape)
+        self.output = ComplexStream(shape)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        N, hop = self.N, self.hop
+        overlap = N - hop
+
+        # Circular buffer, with room for a whole frame plus the samples of the next one
+        depth = 2**ceil(log2(N + hop))
+        mem = Memory(width=len(self.input.payload.as_value()), depth=depth)
+        m.submodules.mem_wr = mem_wr = mem.write_port()
+        m.submodules.mem_rd = mem_rd = mem.read_port(domain="sync", transparent=False)
+
+        # Buffer state:
+        #   wr_addr: next write address
+        #   rd_base: start address of the current frame
+        #   rd_idx:  index of the next sample to read within the current frame
+        #   level:   samples written since the start of the current frame
+        wr_addr = Signal(range(depth))
+        rd_base = Signal(range(depth), reset=(depth - overlap) % depth)
+        rd_idx  = Signal(range(N))
+        level   = Signal(range(depth + 1), reset=overlap)
+
+        frame_end = rd_idx == N - 1
+        can_read  = level > rd_idx
+        do_read   = self.output.produce & can_read
+
+        # Write incoming samples
+        m.d.comb += [
+            self.input.ready .eq(level < depth),
+            mem_wr.addr      .eq(wr_addr),
+            mem_wr.data      .eq(self.input.payload),
+            mem_wr.en        .eq(self.input.consume),
+        ]
+        with m.If(self.input.consume):
+            m.d.sync += wr_addr.eq(wr_addr + 1)
+
+        # Read frames
+        m.d.comb += [
+            mem_rd.addr         .eq(rd_base + rd_idx),
+            mem_rd.en           .eq(self.output.produce),
+            self.output.payload .eq(mem_rd.data),
+        ]
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(can_read)
+        with m.If(do_read):
+            m.d.sync += rd_idx.eq(Mux(frame_end, 0, rd_idx + 1))
+            with m.If(frame_end):
+                m.d.sync += rd_base.eq(rd_base + hop)
+
+        # Track buffer level, releasing `hop` samples at the end of each frame
+        level_next = level + self.input.consume
+        with m.If(do_read & frame_end):
+            m.d.sync += level.eq(level_next - hop)
+        with m.Else():
+            m.d.sync += level.eq(level_next)
+
+        return m
+
+
+class FrameDiscard(Elaboratable):
+    '''
+    Drops the first `discard` samples of every frame of N samples
+    '''
+    def __init__(self, shape, N, discard):
+        assert 0 <= discard < N
+        self.N       = N
+        self.discard = discard
+        self.input   = ComplexStream(shape)
+        self.output  = ComplexStream(shape)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        counter = Signal(range(self.N))
+        keep    = counter >= self.discard
+
+        m.d.comb += self.input.ready.eq(self.output.produce | ~keep)
+
+        with m.If(self.input.consume):
+            m.d.sync += counter.eq(Mux(counter == self.N - 1, 0, counter + 1))
+
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(self.input.valid & keep)
+            with m.If(self.input.valid & keep):
+                m.d.sync += self.output.payload.eq(self.input.payload)
+
+        return m
+
+
+class FrameReplay(Elaboratable):
+    '''
+    Emits every frame of N input samples `repeats` times in a row
+
+    Two frames are buffered, so the next frame can be received while the current one is being
+    replayed.
+    '''
+    # Upstream `ready` only depends on the buffer level
+    comb_ready = False
+
+    def __init__(self, shape, N, repeats):
+        assert repeats >= 1
+        self.N       = N
+        self.repeats = repeats
+        self.input   = ComplexStream(shape)
+        self.output  = ComplexStream(shape)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        N, repeats = self.N, self.repeats
+
+        mem = Memory(width=len(self.input.payload.as_value()), depth=2*N)
+        m.submodules.mem_wr = mem_wr = mem.write_port()
+        m.submodules.mem_rd = mem_rd = mem.read_port(domain="sync", transparent=False)
+
+        # Buffer state:
+        #   wr_idx, wr_bank: next write position
+        #   rd_idx, rd_bank: next read position
+        #   rd_rep:          current repetition of the frame being read
+        #   filled:          number of complete frames in the buffer
+        wr_idx  = Signal(range(N))
+        wr_bank = Signal()
+        rd_idx  = Signal(range(N))
+        rd_bank = Signal()
+        rd_rep  = Signal(range(repeats))
+        filled  = Signal(range(3))
+
+        can_read = filled != 0
+        do_read  = self.output.produce & can_read
+        received = self.input.consume & (wr_idx == N - 1)
+        released = do_read & (rd_idx == N - 1) & (rd_rep == repeats - 1)
+
+        # Write incoming frames
+        m.d.comb += [
+            self.input.ready .eq(filled != 2),
+            mem_wr.addr      .eq(Mux(wr_bank, N + wr_idx, wr_idx)),
+            mem_wr.data      .eq(self.input.payload),
+            mem_wr.en        .eq(self.input.consume),
+        ]
+        with m.If(self.input.consume):
+            m.d.sync += wr_idx.eq(Mux(wr_idx == N - 1, 0, wr_idx + 1))
+            with m.If(wr_idx == N - 1):
+                m.d.sync += wr_bank.eq(~wr_bank)
+
+        # Replay frames
+        m.d.comb += [
+            mem_rd.addr         .eq(Mux(rd_bank, N + rd_idx, rd_idx)),
+            mem_rd.en           .eq(self.output.produce),
+            self.output.payload .eq(mem_rd.data),
+        ]
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(can_read)
+        with m.If(do_read):
+            m.d.sync += rd_idx.eq(Mux(rd_idx == N - 1, 0, rd_idx + 1))
+            with m.If(rd_idx == N - 1):
+                m.d.sync += rd_rep.eq(Mux(rd_rep == repeats - 1, 0, rd_rep + 1))
+                with m.If(rd_rep == repeats - 1):
+                    m.d.sync += rd_bank.eq(~rd_bank)
+
+        m.d.sync += filled.eq(filled + received - released)
+
+        return m
+
+
+class CornerTurn(Elaboratable):
+    '''
+    Transposes every frame of `rows` x `cols` samples
+
+    Frames are received in row-major order and emitted in column-major order.
+
+    When `rows` and `cols` are powers of 2, a single frame is buffered: every incoming sample
+    is written to the address just read out, and the address sequence is rotated by log2(cols)
+    bits on every frame, so that the next frame is read in transposed order. Incoming samples
+    are held back until their address has been read out, and one cycle is lost at the start
+    of every frame. Otherwise, two frames are buffered, so the next frame can be received
+    while the current one is being emitted.
+    '''
+    # Upstream `ready` only depends on the buffer level
+    comb_ready = False
+
+    def __init__(self, shape, rows, cols):
+        self.rows   = rows
+        self.cols   = cols
+        self.input  = ComplexStream(shape)
+        self.output = ComplexStream(shape)
+
+    @property
+    def in_place(self):
+        return self.rows & (self.rows-1) == 0 and self.cols & (self.cols-1) == 0
+
+    def elaborate(self, platform):
+        if self.in_place:
+            return self.elaborate_in_place()
+
+        m = Module()
+        rows, cols = self.rows, self.cols
+        size = rows * cols
+
+        mem = Memory(width=len(self.input.payload.as_value()), depth=2*size)
+        m.submodules.mem_wr = mem_wr = mem.write_port()
+        m.submodules.mem_rd = mem_rd = mem.read_port(domain="sync", transparent=False)
+
+        # Buffer state:
+        #   wr_idx, wr_bank: next write position, in row-major order
+        #   rd_row, rd_col:  next read position, in column-major order
+        #   filled:          number of complete frames in the buffer
+        wr_idx  = Signal(range(size))
+        wr_bank = Signal()
+        rd_row  = Signal(range(rows))
+        rd_col  = Signal(range(cols))
+        rd_bank = Signal()
+        filled  = Signal(range(3))
+
+        can_read = filled != 0
+        do_read  = self.output.produce & can_read
+        rd_last  = (rd_row == rows - 1) & (rd_col == cols - 1)
+        received = self.input.consume & (wr_idx == size - 1)
+        released = do_read & rd_last
+
+        # Write incoming frames
+        m.d.comb += [
+            self.input.ready .eq(filled != 2),
+            mem_wr.addr      .eq(Mux(wr_bank, size + wr_idx, wr_idx)),
+            mem_wr.data      .eq(self.input.payload),
+            mem_wr.en        .eq(self.input.consume),
+        ]
+        with m.If(self.input.consume):
+            m.d.sync += wr_idx.eq(Mux(wr_idx == size - 1, 0, wr_idx + 1))
+            with m.If(wr_idx == size - 1):
+                m.d.sync += wr_bank.eq(~wr_bank)
+
+        # Read transposed frames
+        rd_addr = rd_row * cols + rd_col
+        m.d.comb += [
+            mem_rd.addr         .eq(Mux(rd_bank, size + rd_addr, rd_addr)),
+            mem_rd.en           .eq(self.output.produce),
+            self.output.payload .eq(mem_rd.data),
+        ]
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(can_read)
+        with m.If(do_read):
+            m.d.sync += rd_row.eq(Mux(rd_row == rows - 1, 0, rd_row + 1))
+            with m.If(rd_row == rows - 1):
+                m.d.sync += rd_col.eq(Mux(rd_col == cols - 1, 0, rd_col + 1))
+                with m.If(rd_col == cols - 1):
+                    m.d.sync += rd_bank.eq(~rd_bank)
+
+        m.d.sync += filled.eq(filled + received - released)
+
+        return m
+
+    def elaborate_in_place(self):
+        m = Module()
+
+        rows, cols = self.rows, self.cols
+        size = rows * cols
+        bits, step = ceil(log2(size)), ceil(log2(cols))
+
+        mem = Memory(width=len(self.input.payload.as_value()), depth=size)
+        m.submodules.mem_wr = mem_wr = mem.write_port()
+        m.submodules.mem_rd = mem_rd = mem.read_port(domain="sync", transparent=False)
+
+        # Buffer state:
+        #   wr_idx, wr_rot: next write position, and address rotation of the frame being written
+        #   rd_idx, rd_rot: next read position, and address rotation of the frame being read
+        #   filled:         a complete frame is being read out
+        # Both sides step through the same addresses: frame f is written with a rotation of
+        # f*step bits, and read with a rotation of (f+1)*step bits.
+        wr_idx  = Signal(range(size))
+        wr_rot  = Signal(range(max(bits, 1)))
+        rd_idx  = Signal(range(size))
+        rd_rot  = Signal(range(max(bits, 1)), reset=step % max(bits, 1))
+        filled  = Signal()
+
+        def address(index, rotation):
+            # Rotate the index left by `rotation` bits
+            return Cat(index, index).bit_select((bits - rotation).as_unsigned(), bits) if bits else 0
+
+        def next_rotation(rotation):
+            return Mux(rotation + step >= bits, rotation + step - bits, rotation + step)
+
+        do_read = self.output.produce & filled
+
+        # Write incoming frames, behind the frame being read
+        m.d.comb += [
+            self.input.ready .eq(~filled | (wr_idx < rd_idx)),
+            mem_wr.addr      .eq(address(wr_idx, wr_rot)),
+            mem_wr.data      .eq(self.input.payload),
+            mem_wr.en        .eq(self.input.consume),
+        ]
+        with m.If(self.input.consume):
+            m.d.sync += wr_idx.eq(Mux(wr_idx == size - 1, 0, wr_idx + 1))
+            with m.If(wr_idx == size - 1):
+                m.d.sync += wr_rot.eq(next_rotation(wr_rot))
+                m.d.sync += filled.eq(1)
+
+        # Read transposed frames
+        m.d.comb += [
+            mem_rd.addr         .eq(address(rd_idx, rd_rot)),
+            mem_rd.en           .eq(self.output.produce),
+            self.output.payload .eq(mem_rd.data),
+        ]
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(filled)
+        with m.If(do_read):
+            m.d.sync += rd_idx.eq(Mux(rd_idx == size - 1, 0, rd_idx + 1))
+            with m.If(rd_idx == size - 1):
+                m.d.sync += rd_rot.eq(next_rotation(rd_rot))
+                m.d.sync += filled.eq(0)
+
+        return m
@@ -0,0 +1,111 @@
+from amaranth import Elaboratable, Module, Signal, Cat, Array, Mux, Value
+
+from .streams import ComplexStream, ParallelComplexStream
+
+
+def _complex_stream(shape, parallelism):
+    if parallelism == 1:
+        return ComplexStream(shape)
+    return ParallelComplexStream(shape, parallelism)
+
+
+class StreamGearbox(Elaboratable):
+    '''
+    Converts between streams carrying a different number of `Complex` samples per beat
+
+    A parallelism of 1 is a plain `ComplexStream`, otherwise a `ParallelComplexStream`. One of
+    the two parallelisms must be a multiple of the other; samples keep their order, with the
+    first sample in the lowest lane.
+
+    Both directions sustain one beat per cycle on the wider side, so converters add no bubbles
+    as long as the narrow side runs at full rate. Frame lengths must be multiples of the
+    larger parallelism: `first` is taken from the first sample of a wide beat and `last` from
+    its last sample.
+    '''
+    def __init__(self, shape, parallelism_in, parallelism_out):
+        assert max(parallelism_in, parallelism_out) % min(parallelism_in, parallelism_out) == 0, \
+            "parallelisms must be multiples of each other"
+        self.parallelism_in  = parallelism_in
+        self.parallelism_out = parallelism_out
+        self.input           = _complex_stream(shape, parallelism_in)
+        self.output          = _complex_stream(shape, parallelism_out)
+
+    def elaborate(self, platform):
+        if self.parallelism_in <= self.parallelism_out:
+            return self.elaborate_upsizer()
+        else:
+            return self.elaborate_downsizer()
+
+    def elaborate_upsizer(self):
+        m = Module()
+
+        R = self.parallelism_out // self.parallelism_in
+        payload_in  = Value.cast(self.input.payload)
+        payload_out = Value.cast(self.output.payload)
+        w = len(payload_in)
+
+        if R == 1:
+            m.d.comb += self.output.stream_eq(self.input)
+            return m
+
+        # Narrow beats before the last one are shifted in, first beat ending in the lowest lanes
+        lanes = Signal(w * (R-1))
+        first = Signal()
+        index = Signal(range(R))
+        complete = index == R-1
+
+        m.d.comb += self.input.ready.eq(~complete | self.output.produce)
+        with m.If(self.input.consume):
+            m.d.sync += index.eq(Mux(complete, 0, index + 1))
+            with m.If(~complete):
+                m.d.sync += lanes.eq(Cat(lanes[w:], payload_in))
+            with m.If(index == 0):
+                m.d.sync += first.eq(self.input.first)
+
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(self.input.valid & complete)
+            with m.If(self.input.valid & complete):
+                m.d.sync += [
+                    payload_out      .eq(Cat(lanes, payload_in)),
+                    self.output.first.eq(first),
+                    self.output.last .eq(self.input.last),
+                ]
+
+        return m
+
+    def elaborate_downsizer(self):
+        m = Module()
+
+        R = self.parallelism_in // self.parallelism_out
+        payload_in  = Value.cast(self.input.payload)
+        payload_out = Value.cast(self.output.payload)
+        w = len(payload_out)
+
+        # Wide beat being sent out, one narrow beat per cycle
+        beat  = Signal(len(payload_in))
+        first = Signal()
+        last  = Signal()
+        full  = Signal()
+        index = Signal(range(R))
+        final = index == R-1
+
+        m.d.comb += [
+            self.input.ready    .eq(~full | (self.output.ready & final)),
+            self.output.valid   .eq(full),
+            payload_out         .eq(Array(beat[i*w:(i+1)*w] for i in range(R))[index]),
+            self.output.first   .eq(first & (index == 0)),
+            self.output.last    .eq(last & final),
+        ]
+
+        with m.If(self.output.consume):
+            m.d.sync += index.eq(Mux(final, 0, index + 1))
+        with m.If(self.input.ready):
+            m.d.sync += full.eq(self.input.valid)
+            with m.If(self.input.valid):
+                m.d.sync += [
+                    beat  .eq(payload_in),
+                    first .eq(self.input.first),
+                    last  .eq(self.input.last),
+                ]
+
+        return m
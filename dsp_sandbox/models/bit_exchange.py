@@ -0,0 +1,17 @@
+import numpy as np
+
+
+def bit_permutation(x, permutation):
+    '''
+    Model of `SerialBitPermutation`: reorder every frame of 2^len(permutation) samples along
+    the first axis of x
+    '''
+    bits = len(permutation)
+    index = np.arange(2**bits)
+    position = np.zeros_like(index)
+    for j, source in enumerate(permutation):
+        position |= ((index >> source) & 1) << j
+    frames = np.asarray(x).reshape(-1, 2**bits, *np.shape(x)[1:])
+    result = np.empty_like(frames)
+    result[:, position] = frames
+    return result.reshape(np.shape(x))
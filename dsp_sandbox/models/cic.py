@@ -0,0 +1,50 @@
+import numpy as np
+
+from ..types.fixed_point import Q
+from ..cic import CombStage, IntegratorStage, Upsampler, Downsampler
+from .fixed_point import reshape, wrap
+
+
+class CICFilterModel:
+    '''
+    Bit-exact model of an `UpsamplingCICFilter` or `DownsamplingCICFilter` core
+
+    Stages of the core pipeline are modelled one after the other, with the rounding applied
+    by the core wherever stage widths shrink, and the overflow handling of the output. Integrators are modelled with cumulative sums,
+    whose int64 wrap-around agrees with the stage width wrap-around.
+
+    Input and output samples are raw complex values, see `models.fixed_point`.
+    '''
+    def __init__(self, core):
+        self.core = core
+
+    def __call__(self, x):
+        core = self.core
+        rounding = core.rounding
+        x = np.asarray(x, dtype=np.int64)
+        shape = core.input.shape
+        for stage in core.pipeline.stages:
+            x = _prune(x, shape, stage.input.shape, rounding)
+            if isinstance(stage, CombStage):
+                delayed = np.concatenate([ np.zeros((stage.M, 2), dtype=np.int64), x[:-stage.M] ])[:len(x)]
+                full = Q(stage.width_in + 1, 0)
+                x = reshape(x - delayed, full, stage.output.shape)
+            elif isinstance(stage, IntegratorStage):
+                x = wrap(np.cumsum(x, axis=0), stage.output.shape)
+            elif isinstance(stage, Upsampler):
+                upsampled = np.zeros((len(x) * stage.factor, 2), dtype=np.int64)
+                upsampled[::stage.factor] = x
+                x = upsampled
+            elif isinstance(stage, Downsampler):
+                x = x[::stage.factor]
+            else:
+                raise NotImplementedError(f"unsupported stage {type(stage).__name__}")
+            shape = stage.output.shape
+        return _prune(x, shape, core.output.shape, rounding, core.overflow)
+
+
+def _prune(x, shape, new_shape, rounding, overflow=None):
+    '''Model of `cic._prune`'''
+    drop = max(0, shape.integer_bits - new_shape.integer_bits)
+    shape = Q(shape.integer_bits - drop, drop)
+    return reshape(x, shape, new_shape, rounding=rounding, overflow=overflow)
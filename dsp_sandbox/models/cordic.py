@@ -0,0 +1,81 @@
+import numpy as np
+from math import atan, ceil, log2, pi
+
+from ..types.fixed_point import Q, FixedPointConst
+from ..cordic import CORDICMode, cordic_gain, _csd
+from .fixed_point import reshape, wrap
+
+
+class CORDICModel:
+    '''
+    Bit-exact model of a `CORDIC` core
+
+    The pre-rotation, every iteration with its wrap-around in the datapath widths, and the
+    shift-and-add gain compensation are modelled on all samples at once.
+
+    Input samples are raw complex values, see `models.fixed_point`. With
+    `CORDICMode.ROTATION`, `angle` holds the raw angle sampled with every input sample, and
+    raw complex samples are returned. With `CORDICMode.VECTORING`, raw output payloads are
+    returned, holding the magnitude and phase fields.
+    '''
+    def __init__(self, core):
+        self.core = core
+
+    def __call__(self, x, angle=None):
+        core = self.core
+        shape, n = core.input.shape, core.iterations
+        guard = ceil(log2(n)) + 1
+        shape_xy = Q(shape.integer_bits + 2, shape.fraction_bits + guard)
+        shape_z  = Q(1, max(core.shape_angle.fraction_bits, n) + guard)
+        rotation = core.mode == CORDICMode.ROTATION
+
+        x = np.asarray(x, dtype=np.int64)
+        xr = reshape(x[..., 0], shape, shape_xy)
+        yr = reshape(x[..., 1], shape, shape_xy)
+
+        # Pre-rotation by pi
+        if rotation:
+            z = reshape(np.broadcast_to(np.asarray(angle, dtype=np.int64), xr.shape), core.shape_angle, shape_z)
+            msb = 1 << (len(shape_z) - 1)
+            flip = (z < 0) != ((z & (msb >> 1)) != 0)
+            z = wrap(z ^ np.where(flip, msb, 0), shape_z)
+        else:
+            flip = xr < 0
+            z = np.where(flip, -2**(len(shape_z) - 1), 0)
+        xr = np.where(flip, wrap(-xr, shape_xy), xr)
+        yr = np.where(flip, wrap(-yr, shape_xy), yr)
+
+        # Iterations
+        for i in range(n):
+            ccw = z >= 0 if rotation else yr < 0
+            step = FixedPointConst(shape_z, atan(2**-i) / pi).value.value
+            dx, dy = yr >> i, xr >> i
+            xr, yr, z = (
+                wrap(np.where(ccw, xr - dx, xr + dx), shape_xy),
+                wrap(np.where(ccw, yr + dy, yr - dy), shape_xy),
+                wrap(np.where(ccw, z - step, z + step), shape_z),
+            )
+
+        # Gain compensation and output
+        if core.gain_compensation:
+            xr, shape_scaled = _scale(xr, shape_xy, 1 / cordic_gain(n), shape_xy.fraction_bits + 2)
+            yr, shape_scaled = _scale(yr, shape_xy, 1 / cordic_gain(n), shape_xy.fraction_bits + 2)
+        else:
+            shape_scaled = shape_xy
+
+        if rotation:
+            real = reshape(xr, shape_scaled, core.shape_out, overflow=core.overflow)
+            imag = reshape(yr, shape_scaled, core.shape_out, overflow=core.overflow)
+            return np.stack([ real, imag ], axis=-1)
+        width = len(core.shape_out)
+        magnitude = reshape(xr, shape_scaled, core.shape_out, overflow=core.overflow) & ((1 << width) - 1)
+        phase = reshape(z, shape_z, core.shape_angle) & ((1 << len(core.shape_angle)) - 1)
+        return magnitude | (phase << width)
+
+
+def _scale(x, shape, factor, bits):
+    '''Model of `cordic._scale`, returning the exact sum of terms and its shape'''
+    terms = _csd(factor, bits)
+    top = max(s for _, s in terms)
+    result = sum(sign * (x << (top - s)) for sign, s in terms)
+    return result, Q(shape.integer_bits + len(terms) - 1, shape.fraction_bits + top)
@@ -0,0 +1,29 @@
+import numpy as np
+
+from ..types.fixed_point import Q, FixedPointRounding
+from .fixed_point import reshape
+
+
+class FIRFilterModel:
+    '''
+    Bit-exact model of a `FIRFilter` core
+
+    The filter sum is exact in hardware, so it is modelled with an integer convolution by the
+    quantized taps, followed by the output rounding and overflow handling of the core.
+
+    Input and output samples are raw complex values, see `models.fixed_point`.
+    '''
+    def __init__(self, core):
+        self.core = core
+        self.taps = np.array([ core.shape_taps.const(tap).value.value for tap in core.taps ], dtype=np.int64)
+
+    def __call__(self, x):
+        core = self.core
+        x = np.asarray(x, dtype=np.int64)
+        total = np.stack([ np.convolve(x[:, i], self.taps)[:len(x)] for i in range(2) ], axis=-1)
+
+        # Sums never wrap in hardware; model them with the widest shape
+        fraction_bits = core.input.shape.fraction_bits + core.shape_taps.fraction_bits
+        shape_total   = Q(63 - fraction_bits, fraction_bits)
+        rounding      = None if core.rounding == FixedPointRounding.TRUNCATION else core.rounding
+        return reshape(total, shape_total, core.output.shape, rounding=rounding, overflow=core.overflow)
@@ -0,0 +1,66 @@
+import numpy as np
+
+from ..types.fixed_point import FixedPointRounding, FixedPointOverflow
+
+# Integer models of fixed-point arithmetic.
+# Values are represented by their raw integers in int64 NumPy arrays; complex values have a
+# trailing axis of length 2 holding the real and imaginary parts.
+
+
+def from_complex(values, shape):
+    '''Raw complex samples of `shape` nearest to `values`, quantized like `ComplexConst`'''
+    values = np.asarray(values, dtype=complex) * 2**shape.fraction_bits
+    raw = np.stack([ np.round(values.real), np.round(values.imag) ], axis=-1).astype(np.int64)
+    return wrap(raw, shape)
+
+
+def to_complex(raw, shape):
+    '''Complex values of raw complex samples of `shape`'''
+    raw = np.asarray(raw)
+    return (raw[..., 0] + 1j * raw[..., 1]) / 2**shape.fraction_bits
+
+
+def wrap(x, shape):
+    '''Keep the low len(shape) bits of x, as hardware slicing does'''
+    width = len(shape)
+    assert width <= 63, "values wider than 63 bits are not supported"
+    x = np.asarray(x, dtype=np.int64) & ((1 << width) - 1)
+    if shape.signed:
+        x = (x ^ (1 << (width - 1))) - (1 << (width - 1))
+    return x
+
+
+def saturate(x, shape):
+    '''Clamp x to the range of `shape`'''
+    width = len(shape)
+    if shape.signed:
+        return np.clip(x, -2**(width - 1), 2**(width - 1) - 1)
+    return np.clip(x, 0, 2**width - 1)
+
+
+def shift(x, shift, rounding=None):
+    '''Multiply x by 2**shift, rounding the discarded bits of negative shifts'''
+    x = np.asarray(x, dtype=np.int64)
+    if shift >= 0:
+        return x << shift
+    dropped = -shift
+    if rounding == FixedPointRounding.ROUND_HALF_UP:
+        x = x + (1 << (dropped - 1))
+    elif rounding == FixedPointRounding.CONVERGENT:
+        x = x + ((1 << (dropped - 1)) - 1) + ((x >> dropped) & 1)
+    return x >> dropped
+
+
+def reshape(x, shape, new_shape, rounding=None, overflow=None):
+    '''Model of `FixedPointValue.reshape` on raw values'''
+    if shape == new_shape:
+        return np.asarray(x, dtype=np.int64)
+    integer_diff  = new_shape.integer_bits - shape.integer_bits
+    fraction_diff = new_shape.fraction_bits - shape.fraction_bits
+    amount = fraction_diff
+    if integer_diff < 0 and rounding == FixedPointRounding.TRUNCATION:
+        amount += integer_diff
+    x = shift(x, amount, rounding)
+    if overflow == FixedPointOverflow.SATURATE:
+        x = saturate(x, new_shape)
+    return wrap(x, new_shape)
@@ -0,0 +1,116 @@
+import numpy as np
+
+from ..types.fixed_point import Q
+from ..serial_fft import FFTDirection, TwiddleBackend, SDFRadix2Stage, TwiddleStage, R22TwiddleStage
+from ..bit_exchange import SerialBitPermutation
+from ..skid_buffer import StreamSkidBuffer
+from ..cordic import CORDIC
+from .fixed_point import reshape, wrap
+from .bit_exchange import bit_permutation
+from .cordic import CORDICModel
+
+
+class SerialFFTModel:
+    '''
+    Bit-exact model of a `SerialFFT` core
+
+    Every stage of the core pipeline is modelled on whole frames at once: butterflies with
+    their rounding, trivial and quantized twiddle factors with the wrap-around of the output
+    reshape, and the final reordering. Twiddle stages with `TwiddleBackend.CORDIC` are
+    modelled with `CORDICModel`.
+
+    Input and output samples are raw complex values, see `models.fixed_point`, with
+    interleaved channels as in the core. The number of samples must be a multiple of
+    N * channels.
+    '''
+    def __init__(self, core):
+        self.core = core
+
+    def __call__(self, x, inverse=None):
+        '''
+        Transform raw samples `x`. With `FFTDirection.RUNTIME`, `inverse` gives the direction
+        of every frame.
+        '''
+        core = self.core
+        frame_length = core.N * core.channels
+        x = np.asarray(x, dtype=np.int64)
+        assert len(x) % frame_length == 0, "input must hold whole frames"
+        frames = x.reshape(-1, frame_length, 2)
+
+        runtime = core.direction == FFTDirection.RUNTIME
+        if runtime:
+            inverse = np.broadcast_to(np.asarray(inverse, dtype=bool), (len(frames),))[:, None]
+            frames = _conj(frames, core.shape, inverse)
+
+        for stage in core.pipeline.stages:
+            if isinstance(stage, SDFRadix2Stage):
+                frames = _butterfly(frames, stage)
+            elif isinstance(stage, R22TwiddleStage):
+                frames = _r22_twiddle(frames, stage)
+            elif isinstance(stage, TwiddleStage):
+                frames = _twiddle(frames, stage)
+            elif isinstance(stage, SerialBitPermutation):
+                frames = bit_permutation(frames.reshape(-1, 2), stage.permutation).reshape(frames.shape)
+            elif not isinstance(stage, StreamSkidBuffer):
+                raise NotImplementedError(f"unsupported stage {type(stage).__name__}")
+
+        if runtime:
+            frames = _conj(frames, core.output.shape, inverse)
+        return frames.reshape(-1, 2)
+
+
+def _conj(frames, shape, enable):
+    imag = np.where(enable, wrap(-frames[..., 1], shape), frames[..., 1])
+    return np.stack([ frames[..., 0], imag ], axis=-1)
+
+
+def _blocks(frames, stage, parts):
+    '''View frames as blocks of the stage length, split in `parts` parts'''
+    F, length = frames.shape[:2]
+    block = stage.N * stage.channels
+    return frames.reshape(F, length // block, parts, block // parts, 2)
+
+
+def _butterfly(frames, stage):
+    shape_in, shape_out = stage.input.shape, stage.output.shape
+    # Scaled butterflies move the binary point of the full-precision result
+    drop = max(0, shape_in.integer_bits + 1 - shape_out.integer_bits)
+    full = Q(shape_in.integer_bits + 1 - drop, shape_in.fraction_bits + drop)
+    blocks = _blocks(frames, stage, 2)
+    a, b = blocks[:, :, 0], blocks[:, :, 1]
+    total      = reshape(a + b, full, shape_out, rounding=stage.rounding, overflow=stage.overflow)
+    difference = reshape(a - b, full, shape_out, rounding=stage.rounding, overflow=stage.overflow)
+    return np.stack([ total, difference ], axis=2).reshape(frames.shape)
+
+
+def _r22_twiddle(frames, stage):
+    blocks = _blocks(frames, stage, 4).copy()
+    real, imag = blocks[:, :, 3, :, 0], blocks[:, :, 3, :, 1]
+    if stage.inverse:
+        rotated = wrap(-imag, stage.shape), real
+    else:
+        rotated = imag, wrap(-real, stage.shape)
+    blocks[:, :, 3] = np.stack(rotated, axis=-1)
+    return blocks.reshape(frames.shape)
+
+
+def _twiddle(frames, stage):
+    F, length = frames.shape[:2]
+    factors = stage.twiddle_factors()
+    blocks = frames.reshape(F, length // (len(factors) * stage.channels), len(factors), stage.channels, 2)
+    if stage.backend == TwiddleBackend.CORDIC:
+        angles = stage.twiddle_angles()
+        cordic = CORDIC(stage.shape, shape_angle=angles[0].shape, shape_out=stage.shape_out,
+                        overflow=stage.overflow)
+        angles = np.array([ angle.value.value for angle in angles ], dtype=np.int64)[:, None]
+        return CORDICModel(cordic)(blocks, angles).reshape(frames.shape)
+
+    c = np.array([ f.real.value.value for f in factors ], dtype=np.int64)[:, None]
+    d = np.array([ f.imag.value.value for f in factors ], dtype=np.int64)[:, None]
+    a, b = blocks[..., 0], blocks[..., 1]
+    shape = stage.input.shape
+    shape_product = Q(shape.integer_bits + stage.twiddle_shape.integer_bits + 1,
+                      shape.fraction_bits + stage.twiddle_shape.fraction_bits)
+    real = reshape(a * c - b * d, shape_product, stage.output.shape, overflow=stage.overflow)
+    imag = reshape(a * d + b * c, shape_product, stage.output.shape, overflow=stage.overflow)
+    return np.stack([ real, imag ], axis=-1).reshape(frames.shape)
@@ -0,0 +1,31 @@
+import numpy as np
+
+from ..types.fixed_point import Q
+from .fixed_point import reshape, wrap
+
+
+class WindowModel:
+    '''
+    Bit-exact model of a `Window` core
+
+    Input and output samples are raw complex values, see `models.fixed_point`. With several
+    windows, `select` gives the window index of every frame.
+    '''
+    def __init__(self, core):
+        self.core = core
+        tables = [ [ c.value.value for c in core.window_coefficients(i) ] for i in range(len(core.windows)) ]
+        # Coefficients are read back from the ROM as unsigned values, so that a window value
+        # of 1 is exact even if it does not fit the signed coefficient shape
+        cshape = core.cshape
+        self.tables = wrap(tables, Q(cshape.integer_bits, cshape.fraction_bits, signed=False))
+
+    def __call__(self, x, select=0):
+        core = self.core
+        x = np.asarray(x, dtype=np.int64)
+        index = np.arange(len(x))
+        frame = index // core.N
+        select = np.broadcast_to(np.asarray(select), (-(-len(x) // core.N),))
+        w = self.tables[select[frame], index % core.N][:, None]
+        shape, cshape = core.input.shape, core.cshape
+        shape_product = Q(shape.integer_bits + cshape.integer_bits, shape.fraction_bits + cshape.fraction_bits)
+        return reshape(x * w, shape_product, core.output.shape)
@@ -0,0 +1,56 @@
+from amaranth import Elaboratable, Module, Signal
+
+
+class StreamMonitor(Elaboratable):
+    '''
+    Performance counters for a stream link, observing its handshake signals only
+
+    Every cycle, the link is counted as:
+
+        valid:        valid
+        transfer:     valid & ready
+        backpressure: valid & ~ready, the consumer is stalling
+        starvation:   ready & ~valid, the producer is stalling
+
+    Counters saturate at their maximum value. Asserting `snapshot` copies all counters to the
+    readout signals and restarts counting, so that every readout refers to the same interval.
+    '''
+    COUNTERS = ("cycles", "valid", "transfers", "backpressure", "starvation")
+
+    def __init__(self, stream, width=32):
+        self.stream       = stream
+        self.width        = width
+        self.snapshot     = Signal()
+        # Readout
+        self.cycles       = Signal(width)
+        self.valid        = Signal(width)
+        self.transfers    = Signal(width)
+        self.backpressure = Signal(width)
+        self.starvation   = Signal(width)
+
+    def readout(self):
+        '''Readout signals, by counter name'''
+        return { name: getattr(self, name) for name in self.COUNTERS }
+
+    def elaborate(self, platform):
+        m = Module()
+
+        stream = self.stream
+        events = {
+            "cycles":       1,
+            "valid":        stream.valid,
+            "transfers":    stream.consume,
+            "backpressure": stream.backpressure,
+            "starvation":   stream.starvation,
+        }
+
+        for name, event in events.items():
+            counter = Signal(self.width, name=f"{name}_counter")
+            saturated = counter == 2**self.width - 1
+            with m.If(self.snapshot):
+                m.d.sync += getattr(self, name).eq(counter)
+                m.d.sync += counter.eq(event)
+            with m.Elif(event & ~saturated):
+                m.d.sync += counter.eq(counter + 1)
+
+        return m
@@ -0,0 +1,105 @@
+from amaranth import Elaboratable, Module, Signal, Memory, Mux
+from math import pi, sin
+
+from .types.fixed_point import Q, FixedPointConst
+from .types.complex import Complex, ComplexMultiplication
+from .streams import ComplexStream
+
+
+class NCO(Elaboratable):
+    '''
+    Numerically controlled oscillator, generating exp(2j*pi*phase) samples
+
+    The phase accumulator advances by `frequency` (in units of 2*pi / 2**phase_bits) with every
+    output sample. The top `table_bits` phase bits address a quarter-wave sine ROM, with
+    samples taken at the center of every phase interval so that all four quadrants are obtained
+    by mirroring and negation. Cosine and sine are read through two ports of the same ROM.
+
+    With `dither_bits` > 0, pseudo-random values are added to the phase bits right below the
+    ROM address, which spreads phase truncation spurs into the noise floor.
+    '''
+    def __init__(self, *, shape=Q(1,15), phase_bits=32, table_bits=10, dither_bits=0):
+        assert table_bits > 2, "table_bits must be larger than 2"
+        assert table_bits + dither_bits <= phase_bits, "not enough phase bits for the table and dithering"
+        assert dither_bits <= 32, "at most 32 dither bits are supported"
+        self.phase_bits  = phase_bits
+        self.table_bits  = table_bits
+        self.dither_bits = dither_bits
+        self.frequency   = Signal(phase_bits)
+        self.output      = ComplexStream(shape)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        shape = self.output.shape
+        P, T, D = self.phase_bits, self.table_bits, self.dither_bits
+
+        phase = Signal(P)
+
+        # Optional phase dithering with a 32-bit Galois LFSR
+        if D > 0:
+            lfsr = Signal(32, reset=1)
+            with m.If(self.output.produce):
+                m.d.sync += lfsr.eq(Mux(lfsr[0], (lfsr >> 1) ^ 0x80200003, lfsr >> 1))
+            phase_dithered = (phase + (lfsr[:D] << (P - T - D)))[:P]
+        else:
+            phase_dithered = phase
+
+        # Quarter-wave sine ROM, scaled to avoid overflowing the output shape
+        amplitude = 1 - 2**-shape.fraction_bits
+        depth = 2**(T - 2)
+        table = [ FixedPointConst(shape, amplitude * sin(2*pi*(i+0.5) / 2**T)).value for i in range(depth) ]
+        rom = Memory(width=len(shape), depth=depth, init=table)
+        m.submodules.cos_rd = cos_rd = rom.read_port(domain="comb")
+        m.submodules.sin_rd = sin_rd = rom.read_port(domain="comb")
+
+        index    = phase_dithered[P-T:P-2]
+        quadrant = phase_dithered[P-2:]
+
+        def lookup(port, quadrant):
+            # Mirror the index in odd quadrants, negate in the second half of the period
+            m.d.comb += port.addr.eq(Mux(quadrant[0], ~index, index))
+            value = shape(port.data.as_signed())
+            return shape(Mux(quadrant[1], -value, value))
+
+        cosine = lookup(cos_rd, (quadrant + 1)[:2])
+        sine   = lookup(sin_rd, quadrant)
+
+        with m.If(self.output.produce):
+            m.d.sync += [
+                self.output.valid   .eq(1),
+                self.output.payload .eq(Complex(value=(cosine, sine))),
+                phase               .eq(phase + self.frequency),
+            ]
+
+        return m
+
+
+class ComplexMixer(Elaboratable):
+    '''
+    Multiplies every input sample by a sample of the local oscillator stream `lo`, with the
+    multiplier arrangement given by `multiplication`
+    '''
+    def __init__(self, shape_in, shape_lo, shape_out, *,
+                 multiplication=ComplexMultiplication.FOUR_MULTIPLIERS):
+        self.multiplication = multiplication
+        self.input  = ComplexStream(shape_in)
+        self.lo     = ComplexStream(shape_lo)
+        self.output = ComplexStream(shape_out)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        transfer = self.input.valid & self.lo.valid
+
+        m.d.comb += [
+            self.input.ready .eq(self.output.produce & self.lo.valid),
+            self.lo.ready    .eq(self.output.produce & self.input.valid),
+        ]
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(transfer)
+            with m.If(transfer):
+                product = self.input.payload.multiply(self.lo.payload, self.multiplication)
+                m.d.sync += self.output.payload.eq(product.reshape(self.output.shape))
+
+        return m
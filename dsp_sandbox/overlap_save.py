@@ -0,0 +1,132 @@
+from amaranth import Elaboratable, Module, Signal, Memory, Mux
+from math import ceil, log2
+from numpy.fft import fft as np_fft
+
+from .types.fixed_point import Q
+from .types.complex import Complex, ComplexConst
+from .streams import ComplexStream
+from .serial_fft import SerialFFT, FFTScaling, FFTDirection
+from .framing import FrameOverlapBuffer, FrameDiscard
+
+
+class OverlapSaveFilter(Elaboratable):
+    '''
+    FFT-based fast convolution (overlap-save) for long FIR filters
+
+    The input stream is split into frames of N samples overlapping by L-1 samples, where L is
+    the number of taps. Each frame is transformed, multiplied by the filter frequency response
+    and transformed back; the first L-1 output samples of each frame are discarded.
+    Multiplier count grows as O(log N) instead of O(L).
+    '''
+    def __init__(self, taps, shape_in, shape_out, *, N, shape_coeffs=Q(2, 15)):
+        assert N & (N-1) == 0, "N must be a power of 2"
+        assert len(taps) < N, "N must be larger than the number of taps"
+        self.taps         = list(taps)
+        self.N            = N
+        self.shape_coeffs = shape_coeffs
+        self.input        = ComplexStream(shape_in)
+        self.output       = ComplexStream(shape_out)
+
+    def coefficients(self):
+        '''Filter frequency response, in natural order'''
+        return np_fft(self.taps, n=self.N)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        N = self.N
+        overlap = len(self.taps) - 1
+        shape_in, shape_out = self.input.shape, self.output.shape
+
+        # Block segmentation
+        m.submodules.framer = framer = FrameOverlapBuffer(shape_in, N, N - overlap)
+        m.d.comb += framer.input.stream_eq(self.input)
+
+        # Forward transform, keeping full precision
+        m.submodules.fft = fft = SerialFFT(N=N, shape=shape_in, strategy=FFTScaling.UNSCALED)
+        m.d.comb += fft.input.stream_eq(framer.output)
+
+        # Frequency-domain multiplication
+        # The inverse transform scales by 1/N, so keep log2(N) additional fraction bits
+        # to avoid accumulating truncation errors along its stages.
+        fraction_bits = max(shape_in.fraction_bits, shape_out.fraction_bits) + ceil(log2(N))
+        shape_freq = Q(fft.output.shape.integer_bits + self.shape_coeffs.integer_bits, fraction_bits)
+        m.submodules.mul = mul = SpectralMultiplier(self.coefficients(), fft.output.shape, shape_freq,
+                                                    shape_coeffs=self.shape_coeffs)
+        m.d.comb += mul.input.stream_eq(fft.output)
+
+        # Inverse transform
+        m.submodules.ifft = ifft = SerialFFT(N=N, shape=shape_freq, strategy=FFTScaling.SCALED,
+                                             direction=FFTDirection.INVERSE)
+        m.d.comb += ifft.input.stream_eq(mul.output)
+
+        # Overlap discard
+        m.submodules.discard = discard = FrameDiscard(shape_freq, N, overlap)
+        m.d.comb += discard.input.stream_eq(ifft.output)
+
+        m.d.comb += self.output.payload.eq(discard.output.payload.reshape(shape_out))
+        m.d.comb += self.output.stream_eq(discard.output, omit="payload")
+
+        return m
+
+
+class SpectralMultiplier(Elaboratable):
+    '''
+    Multiplies every frame of N samples by a set of N coefficients stored in RAM
+
+    Coefficients can be updated at runtime through the `coeff_addr`, `coeff_data` and
+    `coeff_we` write port signals.
+    '''
+    def __init__(self, coefficients, shape_in, shape_out, *, shape_coeffs):
+        self.coefficients = list(coefficients)
+        self.shape_coeffs = shape_coeffs
+        self.input        = ComplexStream(shape_in)
+        self.output       = ComplexStream(shape_out)
+        # Coefficient write port
+        self.coeff_addr   = Signal(range(len(self.coefficients)))
+        self.coeff_data   = Complex(shape=shape_coeffs)
+        self.coeff_we     = Signal()
+
+    def elaborate(self, platform):
+        m = Module()
+
+        N = len(self.coefficients)
+        shape_coeffs = self.shape_coeffs
+
+        # Coefficient RAM
+        limit = 2**(shape_coeffs.integer_bits - 1)
+        if any(max(abs(c.real), abs(c.imag)) >= limit for c in self.coefficients):
+            raise ValueError(f"coefficients do not fit in {shape_coeffs}")
+        init = [ ComplexConst(shape_coeffs, complex(c)).value() for c in self.coefficients ]
+        mem = Memory(width=2*len(shape_coeffs), depth=N, init=init)
+        m.submodules.coeff_rd = coeff_rd = mem.read_port(domain="comb")
+        m.submodules.coeff_wr = coeff_wr = mem.write_port()
+        m.d.comb += [
+            coeff_wr.addr.eq(self.coeff_addr),
+            coeff_wr.data.eq(self.coeff_data),
+            coeff_wr.en  .eq(self.coeff_we),
+        ]
+
+        # Internal counter selects current coefficient
+        counter = Signal(range(N))
+        coeff = Complex(shape=shape_coeffs)
+        m.d.comb += [
+            coeff_rd.addr .eq(counter),
+            coeff         .eq(coeff_rd.data),
+        ]
+
+        m.d.comb += self.input.ready.eq(self.output.produce)
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(self.input.valid)
+            with m.If(self.input.valid):
+                m.d.sync += self.output.payload.eq((self.input.payload * coeff).reshape(self.output.shape))
+                m.d.sync += counter.eq(_incr(counter, N))
+
+        return m
+
+
+def _incr(signal, modulo):
+    if modulo == 2 ** len(signal):
+        return signal + 1
+    else:
+        return Mux(signal == modulo - 1, 0, signal + 1)
@@ -0,0 +1,101 @@
+from amaranth import Signal
+
+from .streams import ComplexStream, SampleStream
+from .skid_buffer import StreamSkidBuffer
+from .monitor import StreamMonitor
+
+
+def stream_connect(source, sink):
+    '''Default connection between consecutive stages'''
+    return sink.stream_eq(source)
+
+
+class StreamPipeline:
+    '''
+    Chain of stream stages, connected output to input
+
+    Stages whose `input.ready` is combinationally driven from `output.ready` extend the ready
+    path; stages declare otherwise with a `comb_ready = False` attribute. With
+    `max_ready_depth`, registered skid buffers are inserted so that no ready path crosses more
+    than `max_ready_depth` stages.
+
+    `connect(source, sink)` returns the statements connecting two stages, for pipelines where
+    payloads need adapting between stages.
+
+    With `monitor`, a `StreamMonitor` is attached to the input of every stage and to the
+    pipeline output, in that order, all sharing the `snapshot` signal.
+    '''
+    def __init__(self, stages, *, max_ready_depth=None, connect=stream_connect, monitor=False):
+        assert max_ready_depth is None or max_ready_depth >= 1
+        self.max_ready_depth = max_ready_depth
+        self.connect         = connect
+        self.stages          = list(stages)
+        if max_ready_depth is not None:
+            self.stages = self._insert_skid_buffers(self.stages)
+        self.monitors        = []
+        if monitor:
+            links = [ stage.input for stage in self.stages ] + [ self.output ]
+            self.monitors = [ StreamMonitor(link) for link in links ]
+            self.snapshot = Signal()
+
+    @property
+    def input(self):
+        return self.stages[0].input
+
+    @property
+    def output(self):
+        return self.stages[-1].output
+
+    @staticmethod
+    def comb_ready(stage):
+        return getattr(stage, "comb_ready", True)
+
+    def _insert_skid_buffers(self, stages):
+        result, depth = [], 0
+        for stage in stages:
+            if self.comb_ready(stage):
+                if depth == self.max_ready_depth:
+                    result.append(_skid_buffer(result[-1].output))
+                    depth = 0
+                depth += 1
+            else:
+                depth = 0
+            result.append(stage)
+        return result
+
+    def ready_depth(self):
+        '''Number of stages crossed by the longest combinational ready path'''
+        longest, depth = 0, 0
+        for stage in self.stages:
+            depth = depth + 1 if self.comb_ready(stage) else 0
+            longest = max(longest, depth)
+        return longest
+
+    def latency(self):
+        '''
+        Cycles from an input sample to its output at full rate, in steady state
+
+        Returns None if any stage does not declare its `latency`.
+        '''
+        latencies = [ getattr(stage, "latency", None) for stage in self.stages ]
+        if None in latencies:
+            return None
+        return sum(latencies)
+
+    def elaborate(self, m):
+        '''Add all stages to the module and connect them'''
+        m.submodules += self.stages
+        for prev, stage in zip(self.stages, self.stages[1:]):
+            m.d.comb += self.connect(prev.output, stage.input)
+        m.submodules += self.monitors
+        for monitor in self.monitors:
+            m.d.comb += monitor.snapshot.eq(self.snapshot)
+
+
+def _skid_buffer(stream):
+    if isinstance(stream, ComplexStream):
+        return StreamSkidBuffer(ComplexStream, shape=stream.shape, reg_output=True)
+    elif isinstance(stream, SampleStream):
+        return StreamSkidBuffer(SampleStream, shape=len(stream.payload), reg_output=True)
+    else:
+        raise TypeError(f"cannot insert a skid buffer after {type(stream)}")
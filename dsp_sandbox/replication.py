@@ -0,0 +1,131 @@
+from amaranth import Elaboratable, Module, Signal, Array, Mux, Value
+
+from .streams import ComplexStream, SampleStream
+
+
+class StreamDistributor(Elaboratable):
+    '''
+    Sends whole frames of the input stream to the K `outputs` in round-robin order
+
+    Frames are `frame_length` samples long or, if it is not given, end at samples flagged
+    with `last`. Use `frame_length=1` to distribute individual samples.
+    '''
+    def __init__(self, stream_class, shape, K, *, frame_length=None):
+        self.K            = K
+        self.frame_length = frame_length
+        self.input        = stream_class(shape)
+        self.outputs      = [ stream_class(shape) for _ in range(K) ]
+
+    def elaborate(self, platform):
+        m = Module()
+
+        sel = Signal(range(self.K))
+        end = _frame_end(m, self.input, self.frame_length)
+
+        m.d.comb += self.input.ready.eq(Array(o.ready for o in self.outputs)[sel])
+        for k, output in enumerate(self.outputs):
+            m.d.comb += [
+                output.stream_eq(self.input, omit={"valid", "ready"}),
+                output.valid.eq(self.input.valid & (sel == k)),
+            ]
+        with m.If(self.input.consume & end):
+            m.d.sync += sel.eq(Mux(sel == self.K - 1, 0, sel + 1))
+
+        return m
+
+
+class StreamCollector(Elaboratable):
+    '''
+    Merges whole frames from the K `inputs` in round-robin order, the inverse of
+    `StreamDistributor`
+
+    Frames are `frame_length` samples long or, if it is not given, end at samples flagged
+    with `last`. As long as every instance in between keeps frames in order, the output
+    stream is in the same order as the distributor input.
+    '''
+    def __init__(self, stream_class, shape, K, *, frame_length=None):
+        self.K            = K
+        self.frame_length = frame_length
+        self.inputs       = [ stream_class(shape) for _ in range(K) ]
+        self.output       = stream_class(shape)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        sel = Signal(range(self.K))
+        end = _frame_end(m, self.output, self.frame_length)
+
+        def select(name):
+            return Array(Value.cast(getattr(i, name)) for i in self.inputs)[sel]
+
+        m.d.comb += [
+            Value.cast(self.output.payload) .eq(select("payload")),
+            self.output.valid               .eq(select("valid")),
+            self.output.first               .eq(select("first")),
+            self.output.last                .eq(select("last")),
+        ]
+        for k, input in enumerate(self.inputs):
+            m.d.comb += input.ready.eq(self.output.ready & (sel == k))
+        with m.If(self.output.consume & end):
+            m.d.sync += sel.eq(Mux(sel == self.K - 1, 0, sel + 1))
+
+        return m
+
+
+class ReplicatedStream(Elaboratable):
+    '''
+    K instances of a stream block working on alternate frames
+
+    `factory()` builds every instance, which must process frames independently of each other
+    (e.g. FFTs, or filters whose state is reset by `first`). Input frames are distributed in
+    round-robin order and outputs are collected in the same order, so that throughput grows
+    with K while the output sequence is the same as with a single instance.
+
+    `frame_length_out` defaults to `frame_length`, and should be given for blocks that change
+    the frame length.
+    '''
+    def __init__(self, factory, K, *, frame_length=None, frame_length_out=None):
+        self.instances   = [ factory() for _ in range(K) ]
+        model            = self.instances[0]
+        self.distributor = StreamDistributor(type(model.input), _shape(model.input), K,
+                                             frame_length=frame_length)
+        self.collector   = StreamCollector(type(model.output), _shape(model.output), K,
+                                           frame_length=frame_length_out or frame_length)
+        self.input       = self.distributor.input
+        self.output      = self.collector.output
+
+    def elaborate(self, platform):
+        m = Module()
+
+        m.submodules.distributor = self.distributor
+        m.submodules.collector   = self.collector
+        for k, instance in enumerate(self.instances):
+            m.submodules[f"instance{k}"] = instance
+            m.d.comb += [
+                instance.input.stream_eq(self.distributor.outputs[k]),
+                self.collector.inputs[k].stream_eq(instance.output),
+            ]
+
+        return m
+
+
+def _frame_end(m, stream, frame_length):
+    '''Whether the current sample of `stream` is the last one of its frame'''
+    if frame_length is None:
+        return stream.last
+    if frame_length == 1:
+        return 1
+    counter = Signal(range(frame_length))
+    end = counter == frame_length - 1
+    with m.If(stream.consume):
+        m.d.sync += counter.eq(Mux(end, 0, counter + 1))
+    return end
+
+
+def _shape(stream):
+    if isinstance(stream, ComplexStream):
+        return stream.shape
+    elif isinstance(stream, SampleStream):
+        return len(stream.payload)
+    else:
+        raise TypeError(f"cannot replicate blocks with {type(stream)} ports")
@@ -0,0 +1,124 @@
+from amaranth import Elaboratable, Module, Signal, Cat
+
+from .types.fixed_point import Q, FixedPointValue
+from .types.complex import Complex
+from .streams import ComplexStream
+
+
+# Cubic Lagrange interpolator in Farrow form: y(mu) = ((c3 mu + c2) mu + c1) mu + c0,
+# where every c_k is a linear combination of the samples x[n-1], x[n], x[n+1], x[n+2]
+FARROW_CUBIC_LAGRANGE = [
+    [    0,    1,    0,    0 ],
+    [ -1/3, -1/2,    1, -1/6 ],
+    [  1/2,   -1,  1/2,    0 ],
+    [ -1/6,  1/2, -1/2,  1/6 ],
+]
+
+
+class FarrowResampler(Elaboratable):
+    '''
+    Fractional resampler based on a cubic Lagrange Farrow interpolator
+
+    Output sample k is interpolated at input time k * step, where `step` is the runtime
+    programmable ratio between input and output sample rates: values below 1 interpolate and
+    values above 1 decimate. Input samples before the first one are taken as zeros.
+
+    Farrow coefficients are computed once per output sample and the polynomial is evaluated in
+    Horner form, with one pipelined multiplication by the fractional delay per stage.
+    Decimation needs no anti-aliasing in this block; it should be filtered upstream.
+    '''
+    def __init__(self, shape_in, shape_out=None, *, shape_step=Q(4, 16, signed=False),
+                 shape_coeffs=Q(2, 16), guard_bits=4):
+        self.shape_coeffs = shape_coeffs
+        self.guard_bits   = guard_bits
+        self.step         = FixedPointValue(shape_step)
+        self.input        = ComplexStream(shape_in)
+        self.output       = ComplexStream(shape_out or shape_in)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        shape_in   = self.input.shape
+        shape_step = self.step.shape
+        frac_bits  = shape_step.fraction_bits
+
+        # Sample window: x[n-1], x[n], x[n+1], x[n+2]
+        window = [ Complex(shape=shape_in, name=f"window{i}") for i in range(4) ]
+
+        # Fractional delay, and number of samples to accept before the next output (mu + step
+        # can reach 2**integer_bits)
+        mu   = Signal(frac_bits)
+        need = Signal(range(max(4, 2**shape_step.integer_bits + 1)), reset=3)
+        acc  = mu + self.step.as_value()
+        acc_int = acc[frac_bits:]
+
+        # Stage 0: latch window and fractional delay
+        s0_valid  = Signal()
+        s0_ready  = Signal()
+        s0_window = [ Complex(shape=shape_in, name=f"s0_window{i}") for i in range(4) ]
+        s0_mu     = FixedPointValue(Q(1, frac_bits))
+        emit      = (need == 0) & (~s0_valid | s0_ready)
+
+        m.d.comb += self.input.ready.eq((need != 0) | (emit & (acc_int != 0)))
+        with m.If(self.input.consume):
+            m.d.sync += Cat(window).eq(Cat(window[1:], self.input.payload))
+        with m.If(emit):
+            m.d.sync += need.eq(acc_int - self.input.consume)
+            m.d.sync += mu.eq(acc[:frac_bits])
+        with m.Elif(self.input.consume):
+            m.d.sync += need.eq(need - 1)
+
+        with m.If(~s0_valid | s0_ready):
+            m.d.sync += s0_valid.eq(need == 0)
+            with m.If(emit):
+                m.d.sync += Cat(s0_window).eq(Cat(window))
+                m.d.sync += s0_mu.eq(FixedPointValue(s0_mu.shape, value=Cat(mu, 0).as_signed()))
+
+        # Stage 1: Farrow coefficients
+        shape_c = Q(shape_in.integer_bits + 3, shape_in.fraction_bits + self.guard_bits)
+        coeffs_val = []
+        for row in FARROW_CUBIC_LAGRANGE:
+            terms = [ x * self.shape_coeffs.const(c) for x, c in zip(s0_window, row) if c != 0 ]
+            total = terms[0]
+            for term in terms[1:]:
+                total = total + term
+            coeffs_val.append(total.reshape(shape_c))
+        coeffs = [ Complex(shape=shape_c, name=f"c{k}") for k in range(4) ]
+        s1_mu  = FixedPointValue(s0_mu.shape)
+
+        s1_valid = Signal()
+        s1_ready = Signal()
+        m.d.comb += s0_ready.eq(~s1_valid | s1_ready)
+        with m.If(s0_ready):
+            m.d.sync += s1_valid.eq(s0_valid)
+            with m.If(s0_valid):
+                m.d.sync += [ reg.eq(value) for reg, value in zip(coeffs, coeffs_val) ]
+                m.d.sync += s1_mu.eq(s0_mu)
+
+        # Horner stages: h = h * mu + c_k, for k = 2, 1
+        h, h_mu, h_valid, h_ready = coeffs[3], s1_mu, s1_valid, s1_ready
+        lower = coeffs[:3]
+        for k in (2, 1):
+            h_val     = (h * h_mu + lower[k]).reshape(shape_c)
+            new_h     = Complex(shape=shape_c, name=f"h{k}")
+            new_lower = [ Complex(shape=shape_c, name=f"c{i}_d") for i in range(k) ]
+            new_mu    = FixedPointValue(h_mu.shape)
+            new_valid = Signal()
+            new_ready = Signal()
+            m.d.comb += h_ready.eq(~new_valid | new_ready)
+            with m.If(h_ready):
+                m.d.sync += new_valid.eq(h_valid)
+                with m.If(h_valid):
+                    m.d.sync += new_h.eq(h_val)
+                    m.d.sync += [ reg.eq(value) for reg, value in zip(new_lower, lower) ]
+                    m.d.sync += new_mu.eq(h_mu)
+            h, h_mu, h_valid, h_ready, lower = new_h, new_mu, new_valid, new_ready, new_lower
+
+        # Last Horner stage and output
+        m.d.comb += h_ready.eq(self.output.produce)
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(h_valid)
+            with m.If(h_valid):
+                m.d.sync += self.output.payload.eq((h * h_mu + lower[0]).reshape(self.output.shape))
+
+        return m
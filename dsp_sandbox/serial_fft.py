@@ -1,18 +1,20 @@
-from amaranth import Elaboratable, Module, Signal, Memory, Cat
+from amaranth import Elaboratable, Module, Signal, Memory, Cat, Mux, Array, Value
 
 from cmath import exp, pi
 from math import ceil, log2
 from enum import IntEnum
 
-from .types.fixed_point import Q, FixedPointValue, FixedPointRounding
-from .types.complex import Complex, ComplexConst
+from .types.fixed_point import Q, FixedPointConst, FixedPointRounding
+from .types.complex import Complex, ComplexConst, ComplexMultiplication, pipelined_multiply
 from .streams import ComplexStream
 from .bit_exchange import SerialBitReversal
 from .delay import StreamDelay
 from .skid_buffer import StreamSkidBuffer
+from .pipeline import StreamPipeline
+from .cordic import CORDIC
+from .cdc import in_domain
 
 # TODO:
-# - Make twiddle shape configurable
 # - Add more tests
 # - Add option for Memory-backed Delay module
 # - Optional digit slicing / shift-and-add multipliers
@@ -22,31 +24,93 @@ class FFTScaling(IntEnum):
     UNSCALED = 0
     SCALED   = 1
 
+class FFTDirection(IntEnum):
+    FORWARD = 0
+    INVERSE = 1
+    RUNTIME = 2  # selected for every frame through the `inverse` signal
+
+class TwiddleBackend(IntEnum):
+    MULTIPLIER = 0  # three real multipliers
+    CORDIC     = 1  # multiplier-free pipelined CORDIC
+
 class SerialFFT(Elaboratable):
     '''
     Single-path Delay Feedback FFT
     Radix-2^2
     Decimation in frequency (DIF)
+
+    The inverse transform uses conjugated twiddle factors; combine it with
+    `FFTScaling.SCALED` to get the 1/N scaling factor. With `FFTDirection.RUNTIME`, the
+    direction is sampled from `inverse` at the first sample of every frame, and the inverse
+    transform is computed as conj(FFT(conj(x))) with no additional pipeline stages.
+
+    With `TwiddleBackend.CORDIC`, twiddle factors are applied by CORDIC rotators instead of
+    multipliers, for devices with few DSP blocks. Otherwise, twiddle factors are quantized to
+    `twiddle_shape`, which greatly affects output accuracy.
+
+    With `channels` = C > 1, the FFT processes C independent channels whose samples are
+    interleaved (sample n of channel c is the n*C+c-th sample of the stream). Outputs are
+    interleaved in the same way. Feedback memories grow C times, while the number of
+    multipliers stays the same.
+
+    By default, skid buffers break the ready path after every twiddle stage. With
+    `max_ready_depth`, they are instead placed by `StreamPipeline` so that no combinational
+    ready path crosses more than `max_ready_depth` stages.
+
+    With `monitor`, performance counters are attached to every link between stages, see
+    `StreamPipeline`. They are available through the `pipeline` attribute.
+
+    All logic runs in the clock domain given by `domain`; see `StreamCDC` to cross into it.
+
+    `rounding` selects how butterfly outputs are rounded when bits are dropped, which happens
+    with `FFTScaling.SCALED`. `overflow` selects how butterfly and twiddle outputs that do not
+    fit their shape are handled: with `FixedPointOverflow.SATURATE`, full-scale samples rotated
+    out of range by a twiddle factor are clamped instead of wrapping around. `multiplication`
+    selects the arrangement of twiddle multipliers, see `ComplexMultiplication`.
     '''
-    def __init__(self, *, N, shape=Q(1,15), natural_order=True, strategy=FFTScaling.UNSCALED):
+    def __init__(self, *, N, shape=Q(1,15), natural_order=True, strategy=FFTScaling.UNSCALED,
+                 direction=FFTDirection.FORWARD, twiddle_backend=TwiddleBackend.MULTIPLIER,
+                 twiddle_shape=None, channels=1,
+                 max_ready_depth=None, monitor=False, domain="sync",
+                 rounding=FixedPointRounding.TRUNCATION, overflow=None,
+                 multiplication=ComplexMultiplication.PRE_ADDER):
         assert N & (N-1) == 0, "N must be a power of 2"
+        assert channels & (channels-1) == 0, "channels must be a power of 2"
         # Internal properties
         self.N              = N
         self.shape          = shape
         self.natural_order  = natural_order
         self.strategy       = strategy
-        if self.strategy == FFTScaling.UNSCALED:
-            output_shape = Q(ceil(log2(N)) + shape.integer_bits, shape.fraction_bits)
-        else:
-            output_shape = shape
+        self.direction      = direction
+        self.twiddle_backend = twiddle_backend
+        self.twiddle_shape  = twiddle_shape
+        self.channels       = channels
+        self.max_ready_depth = max_ready_depth
+        self.monitor        = monitor
+        self.domain         = domain
+        self.rounding       = rounding
+        self.overflow       = overflow
+        self.multiplication = multiplication
         # Ports
         self.input          = ComplexStream(shape=shape)
-        self.output         = ComplexStream(shape=output_shape)
-
-    def elaborate(self, platform):
-        m = Module()
+        self.output         = ComplexStream(shape=self.output_shape(N, shape, strategy))
+        if direction == FFTDirection.RUNTIME:
+            self.inverse    = Signal()
+        # Stages
+        self.pipeline       = self.build_pipeline()
+
+    @staticmethod
+    def output_shape(N, shape, strategy):
+        if strategy == FFTScaling.UNSCALED:
+            return Q(ceil(log2(N)) + shape.integer_bits, shape.fraction_bits)
+        else:
+            return shape
 
+    def build_pipeline(self):
+        '''Butterfly, twiddle and reordering stages of the transform'''
         N = self.N
+        C = self.channels
+        inverse = self.direction == FFTDirection.INVERSE
 
         # Define sequence of butterfly and twiddle stages
         stages    = []
@@ -62,12 +126,14 @@ class SerialFFT(Elaboratable):
         # Radix-2^2 stages
         while N >= 4:
             # First butterfly
-            stages += [ SDFRadix2Stage(N, shape, shape_out=stage_shape_out(shape)) ]
+            stages += [ SDFRadix2Stage(N, shape, shape_out=stage_shape_out(shape), channels=C,
+                                       rounding=self.rounding, overflow=self.overflow) ]
             shape = stages[-1].output.shape
             # Trivial twiddle factors (1, -1j)
-            stages += [ R22TwiddleStage(N=N, shape=shape) ]
+            stages += [ R22TwiddleStage(N=N, shape=shape, inverse=inverse, channels=C) ]
             # Second butterfly
-            stages += [ SDFRadix2Stage(N//2, shape, shape_out=stage_shape_out(shape)) ]
+            stages += [ SDFRadix2Stage(N//2, shape, shape_out=stage_shape_out(shape), channels=C,
+                                       rounding=self.rounding, overflow=self.overflow) ]
             shape = stages[-1].output.shape
             if N == 4: N = 1; break
             # Twiddle factors
@@ -75,47 +141,126 @@ class SerialFFT(Elaboratable):
             for k1 in range(2):
                 for k2 in range(2):
                     w += [ (n3*(k1+2*k2), N) for n3 in range(N//4) ]
-            stages += [ TwiddleStage(factors=w, shape=shape) ]
+            stages += [ TwiddleStage(factors=w, shape=shape, inverse=inverse, backend=self.twiddle_backend,
+                                     twiddle_shape=self.twiddle_shape, channels=C, overflow=self.overflow,
+                                     multiplication=self.multiplication) ]
             # Break long combinatorial paths using a skid buffer
-            stages += [ StreamSkidBuffer(ComplexStream, shape=shape, reg_output=True) ]
+            if self.max_ready_depth is None:
+                stages += [ StreamSkidBuffer(ComplexStream, shape=shape, reg_output=True) ]
             N = N // 4
 
         # Radix-2 stages
         while N >= 2:
             # Butterfly
-            stages += [ SDFRadix2Stage(N, shape, shape_out=stage_shape_out(shape)) ]
+            stages += [ SDFRadix2Stage(N, shape, shape_out=stage_shape_out(shape), channels=C,
+                                       rounding=self.rounding, overflow=self.overflow) ]
             shape = stages[-1].output.shape
             if N == 2: N = 1; break
             # Twiddle factors
             w = [ (0, N) ] * (N//2) + [ (k, N) for k in range(N//2) ]
-            stages += [ TwiddleStage(factors=w, shape=shape) ]
+            stages += [ TwiddleStage(factors=w, shape=shape, inverse=inverse, backend=self.twiddle_backend,
+                                     twiddle_shape=self.twiddle_shape, channels=C, overflow=self.overflow,
+                                     multiplication=self.multiplication) ]
             # Break long combinatorial paths using a skid buffer
-            stages += [ StreamSkidBuffer(ComplexStream, shape=shape, reg_output=True) ]
+            if self.max_ready_depth is None:
+                stages += [ StreamSkidBuffer(ComplexStream, shape=shape, reg_output=True) ]
             N = N // 2
 
         # Optional bit reversal stage at the end
         if self.natural_order:
-            stages += [ SerialBitReversal(2*len(shape), self.N) ]
+            stages += [ SerialBitReversal(2*len(shape), self.N, channels=C) ]
 
-        # Add all stages as submodules
-        m.submodules += stages
+        return StreamPipeline(stages, max_ready_depth=self.max_ready_depth, monitor=self.monitor)
 
-        # Connect all stages and input/output
-        last = self.input
-        for stage in stages:
-            m.d.comb += stage.input.stream_eq(last)
-            last = stage.output
+    def latency(self):
+        '''Cycles from an input sample to its output sample at full rate'''
+        return self.pipeline.latency()
+
+    def elaborate(self, platform):
+        m = Module()
+
+        # Add all stages as submodules and connect them
+        pipeline = self.pipeline
+        pipeline.elaborate(m)
+
+        # Connect input/output
+        if self.direction == FFTDirection.RUNTIME:
+            first, last = self.elaborate_runtime_direction(m, pipeline.input, pipeline.output)
+        else:
+            first, last = self.input, pipeline.output
+            m.d.comb += pipeline.input.stream_eq(first)
         m.d.comb += self.output.stream_eq(last)
 
-        return m
+        return in_domain(m, self.domain)
+
+    def elaborate_runtime_direction(self, m, first, last):
+        # Conjugate input and output samples of inverse frames. The direction of every
+        # frame in flight is kept in a small queue until its last output sample leaves.
+        # With interleaved channels, the direction applies to a whole frame of every channel.
+        frame_length = self.N * self.channels
+        depth = 4
+        flags     = Array(Signal(name=f"inverse_flag{i}") for i in range(depth))
+        wr_ptr    = Signal(range(depth))
+        rd_ptr    = Signal(range(depth))
+        in_flight = Signal(range(depth + 1))
+        in_count  = Signal(range(frame_length))
+        out_count = Signal(range(frame_length))
+
+        push = self.input.consume & (in_count == 0)
+        pop  = self.output.consume & (out_count == frame_length - 1)
+
+        # Input side: latch direction at the start of each frame
+        inv_in = Mux(in_count == 0, self.inverse, flags[(wr_ptr - 1)[:len(wr_ptr)]])
+        m.d.comb += [
+            first.real          .eq(self.input.real),
+            first.imag          .eq(_conj_imag(self.input.imag, inv_in)),
+            first.valid         .eq(self.input.valid & ((in_count != 0) | (in_flight < depth))),
+            self.input.ready    .eq(first.ready & ((in_count != 0) | (in_flight < depth))),
+        ]
+        with m.If(self.input.consume):
+            m.d.sync += in_count.eq(in_count + 1)
+        with m.If(push):
+            m.d.sync += flags[wr_ptr].eq(self.inverse)
+            m.d.sync += wr_ptr.eq(wr_ptr + 1)
+
+        # Output side
+        # Bit reversal stage output is a plain `SampleStream`
+        output  = ComplexStream(shape=self.output.shape)
+        payload = Complex(shape=self.output.shape, value=Value.cast(last.payload))
+        inv_out = flags[rd_ptr]
+        m.d.comb += [
+            output.real         .eq(payload.real),
+            output.imag         .eq(_conj_imag(payload.imag, inv_out)),
+            output.stream_eq(last, omit="payload"),
+        ]
+        with m.If(self.output.consume):
+            m.d.sync += out_count.eq(out_count + 1)
+        with m.If(pop):
+            m.d.sync += rd_ptr.eq(rd_ptr + 1)
+
+        m.d.sync += in_flight.eq(in_flight + push - pop)
+
+        return first, output
 
 
 class SDFRadix2Stage(Elaboratable):
-    def __init__(self, N, shape, shape_out=None):
-        shape_out   = shape_out or Q(1 + shape.integer_bits, shape.fraction_bits)
-        self.N      = N
-        self.input  = ComplexStream(shape=shape)
-        self.output = ComplexStream(shape=shape_out)
+    '''
+    Radix-2 butterfly with its feedback memory
+
+    Sums and differences grow one integer bit. When `shape_out` has fewer integer bits than
+    that, they are scaled down to fit, rounding the dropped bits with `rounding`; values still
+    out of range are handled according to `overflow`.
+    '''
+    def __init__(self, N, shape, shape_out=None, channels=1, rounding=FixedPointRounding.TRUNCATION,
+                 overflow=None):
+        shape_out     = shape_out or Q(1 + shape.integer_bits, shape.fraction_bits)
+        self.N        = N
+        self.channels = channels
+        self.rounding = rounding
+        self.overflow = overflow
+        self.latency  = channels * N // 2
+        self.input    = ComplexStream(shape=shape)
+        self.output   = ComplexStream(shape=shape_out)
 
     def elaborate(self, platform):
         m = Module()
@@ -124,14 +269,11 @@ class SDFRadix2Stage(Elaboratable):
         output_shape = self.output.shape
 
         # Internal counter to generate butterfly control signal
-        counter = Signal(range(N))
+        counter = Signal(range(N * self.channels))
         with m.If(self.input.consume):
             m.d.sync += counter.eq(counter + 1)
         s = counter[-1]
 
-        # Upstream signaling
-        m.d.comb += self.input.ready.eq(self.output.produce)
-
         # Define butterfly signals
         a = ComplexStream(shape=output_shape)
         b = self.input
@@ -142,7 +284,7 @@ class SDFRadix2Stage(Elaboratable):
         # We use an additional bit in the feedback memory to indicate whether a sample
         # has been processed by the butterfly. This avoids holding these samples in the
         # buffer until the arrival of new valid input samples.
-        m.submodules.delay = delay = StreamDelay(2*len(output_shape)+1, self.N // 2)
+        m.submodules.delay = delay = StreamDelay(2*len(output_shape)+1, self.channels * self.N // 2)
         o = Signal()
         m.d.comb += [
             # feedback memory input
@@ -156,20 +298,33 @@ class SDFRadix2Stage(Elaboratable):
 
         # Radix-2 butterfly for Single-path Delay Feedback FFT
         # Two operation modes depending on `s`
-        rounding = FixedPointRounding.TRUNCATION
-        with m.If(s):
+        rounding, overflow = self.rounding, self.overflow
+        def scale(value, shape):
+            # Move the binary point of the full-precision result to drop integer bits
+            drop = max(0, value.shape.integer_bits - shape.integer_bits)
+            value = Complex(value=tuple(
+                Q(part.shape.integer_bits - drop, part.shape.fraction_bits + drop)(part.as_value())
+                for part in (value.real, value.imag)))
+            return value.reshape(shape, rounding=rounding, overflow=overflow)
+        with m.If(s & ~(a.valid & o)):
+            # Every sample taken from the delay line is replaced by a new one
             m.d.comb += [
-                c.payload.eq((a.payload.reshape(b.shape) - b.payload).reshape(c.shape, rounding=rounding)),
-                d.payload.eq((a.payload.reshape(b.shape) + b.payload).reshape(d.shape, rounding=rounding)),
-                c.valid  .eq(a.valid & b.valid),
+                c.payload.eq(scale(a.payload.reshape(b.shape) - b.payload, c.shape)),
+                d.payload.eq(scale(a.payload.reshape(b.shape) + b.payload, d.shape)),
+                b.ready  .eq(d.produce & a.valid),
+                c.valid  .eq(b.consume),
                 d.valid  .eq(a.valid & b.valid),
                 a.ready  .eq(d.produce & b.valid),
             ]
         with m.Else():
+            # Input samples are only accepted while there is room for them in the delay line.
+            # Processed samples still held after output stalls are sent out before the
+            # butterfly needs the delay line again.
             m.d.comb += [
-                c.payload.eq(b.payload.reshape(c.shape, rounding=rounding)),
-                d.payload.eq(a.payload.reshape(d.shape, rounding=rounding)),
-                c.valid  .eq(b.valid),
+                c.payload.eq(b.payload.reshape(c.shape, rounding=rounding, overflow=overflow)),
+                d.payload.eq(a.payload.reshape(d.shape, rounding=rounding, overflow=overflow)),
+                b.ready  .eq(~s & delay.input.ready),
+                c.valid  .eq(b.valid & ~s),
                 d.valid  .eq(a.valid & o),
                 a.ready  .eq(d.produce & o),
             ]
@@ -177,111 +332,133 @@ class SDFRadix2Stage(Elaboratable):
         return m
 
 class TwiddleStage(Elaboratable):
-    def __init__(self, factors, shape, shape_out=None):
-        self.factors   = factors
-        self.shape     = shape
-        self.shape_out = shape_out or shape
-        self.input     = ComplexStream(shape=shape)
-        self.output    = ComplexStream(shape=self.shape_out)
+    twiddle_shape = Q(2, 11)  # default, this greatly affects output accuracy
+
+    def __init__(self, factors, shape, shape_out=None, inverse=False, backend=TwiddleBackend.MULTIPLIER,
+                 twiddle_shape=None, channels=1, overflow=None, multiplication=ComplexMultiplication.PRE_ADDER):
+        if twiddle_shape is not None:
+            self.twiddle_shape = twiddle_shape
+        self.factors        = factors
+        self.inverse        = inverse
+        self.backend        = backend
+        self.channels       = channels
+        self.overflow       = overflow
+        self.multiplication = multiplication
+        self.shape          = shape
+        self.shape_out      = shape_out or shape
+        # Three pipeline stages, or the CORDIC pre-rotation, iterations and output registers
+        self.latency        = 3 if backend == TwiddleBackend.MULTIPLIER else shape.fraction_bits + 3
+        self.input          = ComplexStream(shape=shape)
+        self.output         = ComplexStream(shape=self.shape_out)
+
+    def twiddle_factors(self):
+        '''Quantized twiddle factors, as `ComplexConst`s'''
+        sign = 1 if self.inverse else -1
+        return [ ComplexConst(self.twiddle_shape, exp(sign*1j*2*pi*k/N)) for k,N in self.factors ]
+
+    def twiddle_angles(self):
+        '''Rotation angles of the CORDIC backend in units of pi, as `FixedPointConst`s'''
+        sign = 1 if self.inverse else -1
+        angle_shape = Q(1, ceil(log2(max(N for _, N in self.factors))))
+        return [ FixedPointConst(angle_shape, (sign*2*k/N + 1) % 2 - 1) for k,N in self.factors ]
 
     def elaborate(self, platform):
+        if self.backend == TwiddleBackend.CORDIC:
+            return self.elaborate_cordic()
+
         m = Module()
 
-        twiddle_shape = Q(2, 11)  # this greatly affects output accuracy
+        twiddle_shape = self.twiddle_shape
 
-        # Internal counter selects current twiddle factor
-        counter = Signal(range(len(self.factors)))
+        # Internal counter selects current twiddle factor, shared by interleaved channels
+        counter = Signal(range(len(self.factors) * self.channels))
+        channel_bits = ceil(log2(self.channels))
 
         # Twiddle ROM instance
-        factors = [ComplexConst(twiddle_shape, exp(-1j*2*pi*k/N)).value() for k,N in self.factors]
+        factors = [ factor.value() for factor in self.twiddle_factors() ]
         twiddle_rom = Memory(width=2*len(twiddle_shape), depth=len(factors), init=factors)
         m.submodules.twiddle_rd = twiddle_rd = twiddle_rom.read_port(domain="comb")
         factor = Complex(shape=twiddle_shape)
         m.d.comb += [
-            twiddle_rd.addr .eq(counter),
+            twiddle_rd.addr .eq(counter[channel_bits:]),
             factor          .eq(twiddle_rd.data),
         ]
 
-        # Perform complex rotation with three real multipliers
-        #   k1 = b * (c - d)
-        #   k2 = c * (a - b)
-        #   k3 = d * (a + b)
-        #   real = k1 + k2
-        #   imag = k1 + k3
+        # Complex rotation, with operand, product and output registers
+        enable = self.output.produce
+        valid  = Signal(2)
+        m.d.comb += self.input.ready.eq(enable)
+        with m.If(enable):
+            m.d.sync += Cat(valid, self.output.valid).eq(Cat(self.input.valid, valid))
+        with m.If(self.input.consume):
+            m.d.sync += counter.eq(counter + 1)
 
-        a, b = self.input.real, self.input.imag
-        c, d = factor.real, factor.imag
-        
-        sub_cd = FixedPointValue(shape=(c - d).shape)
-        sub_ab = FixedPointValue(shape=(a - b).shape)
-        add_ab = FixedPointValue(shape=(a + b).shape)
-        k1     = FixedPointValue(shape=(b * sub_cd).shape)
-        k2     = FixedPointValue(shape=(c * sub_ab).shape)
-        k3     = FixedPointValue(shape=(d * add_ab).shape)
-        b_r    = FixedPointValue(shape=b.shape)
-        c_r    = FixedPointValue(shape=c.shape)
-        d_r    = FixedPointValue(shape=d.shape)
-
-        s0_valid = Signal()
-        s0_ready = Signal()
-        s1_valid = Signal()
-        s1_ready = Signal()
-
-        # Split the operation in 3 cycles / stages for faster clock rates
-
-        m.d.comb += self.input.ready.eq(s0_ready | ~s0_valid)
-        with m.If(self.input.ready):
-            m.d.sync += s0_valid.eq(self.input.valid)
-            with m.If(self.input.valid):
-                m.d.sync += sub_cd.eq(c - d)
-                m.d.sync += sub_ab.eq(a - b)
-                m.d.sync += add_ab.eq(a + b)
-                m.d.sync += b_r.eq(b)
-                m.d.sync += c_r.eq(c)
-                m.d.sync += d_r.eq(d)
-                m.d.sync += counter.eq(counter + 1)
+        product = pipelined_multiply(m, self.input.payload, factor, self.multiplication, enable=enable)
+        m.d.comb += self.output.payload.eq(product.reshape(self.output.shape, overflow=self.overflow))
 
-        m.d.comb += s0_ready.eq(s1_ready | ~s1_valid)
-        with m.If(s0_ready):
-            m.d.sync += s1_valid.eq(s0_valid)
-            with m.If(s0_valid):
-                m.d.sync += k1.eq(b_r * sub_cd)
-                m.d.sync += k2.eq(c_r * sub_ab)
-                m.d.sync += k3.eq(d_r * add_ab)
-        
-        m.d.comb += s1_ready.eq(self.output.produce)
-        with m.If(s1_ready):
-            m.d.sync += self.output.valid.eq(s1_valid)
-            with m.If(s1_valid):
-                m.d.sync += self.output.real.eq((k1 + k2).reshape(self.output.shape))
-                m.d.sync += self.output.imag.eq((k1 + k3).reshape(self.output.shape))
+        return m
+
+    def elaborate_cordic(self):
+        m = Module()
+
+        # Rotation angles in units of pi, wrapped into [-1, 1)
+        angles = self.twiddle_angles()
+        angle_shape = angles[0].shape
+        angles = [ angle.value for angle in angles ]
+        angle_rom = Memory(width=len(angle_shape), depth=len(angles), init=angles)
+        m.submodules.angle_rd = angle_rd = angle_rom.read_port(domain="comb")
+
+        counter = Signal(range(len(self.factors) * self.channels))
+        channel_bits = ceil(log2(self.channels))
+        with m.If(self.input.consume):
+            m.d.sync += counter.eq(counter + 1)
+
+        m.submodules.cordic = cordic = CORDIC(self.shape, shape_angle=angle_shape, shape_out=self.shape_out,
+                                              overflow=self.overflow)
+        m.d.comb += [
+            angle_rd.addr             .eq(counter[channel_bits:]),
+            cordic.angle.as_value()   .eq(angle_rd.data),
+            cordic.input.stream_eq(self.input),
+            self.output.stream_eq(cordic.output),
+        ]
 
         return m
 
 class R22TwiddleStage(Elaboratable):
     '''
     Trivial twiddle stage for Radix-2^2, rotates last quarter of the N samples by -1j
+    (or by 1j for the inverse transform)
     '''
-    def __init__(self, N, shape):
-        self.N      = N
-        self.shape  = shape
-        self.input  = ComplexStream(shape=shape)
-        self.output = ComplexStream(shape=shape)
+    def __init__(self, N, shape, inverse=False, channels=1):
+        self.N        = N
+        self.channels = channels
+        self.inverse  = inverse
+        self.latency  = 1
+        self.shape    = shape
+        self.input    = ComplexStream(shape=shape)
+        self.output   = ComplexStream(shape=shape)
 
     def elaborate(self, platform):
         m = Module()
 
-        counter = Signal(range(self.N))
+        counter = Signal(range(self.N * self.channels))
         
         m.d.comb += self.input.ready.eq(self.output.produce)
         with m.If(self.input.ready):
             m.d.sync += self.output.valid.eq(self.input.valid)
             with m.If(self.input.valid):
                 with m.If(counter[-1] & counter[-2]):  # last quarter
-                    m.d.sync += self.output.real.eq( self.input.imag)
-                    m.d.sync += self.output.imag.eq(-self.input.real)
+                    if self.inverse:
+                        m.d.sync += self.output.real.eq(-self.input.imag)
+                        m.d.sync += self.output.imag.eq( self.input.real)
+                    else:
+                        m.d.sync += self.output.real.eq( self.input.imag)
+                        m.d.sync += self.output.imag.eq(-self.input.real)
                 with m.Else():
                     m.d.sync += self.output.payload.eq(self.input.payload)
                 m.d.sync += counter.eq(counter + 1)
 
         return m
+
+def _conj_imag(imag, enable):
+    return imag.shape(Mux(enable, -imag, imag))
@@ -2,10 +2,14 @@ from amaranth import *
 from contextlib import nullcontext
 
 class StreamSkidBuffer(Elaboratable):
+    # Upstream `ready` is registered
+    comb_ready = False
+
     def __init__(self, stream_class, shape, reg_output=False):
         self.input  = stream_class(shape)
         self.output = stream_class(shape)
         self.reg_output = reg_output
+        self.latency = 1 if reg_output else 0
 
     def elaborate(self, platform):
         m = Module()
@@ -0,0 +1,126 @@
+from amaranth import Elaboratable, Module, Signal, Memory, Cat, Mux
+from cmath import exp, pi
+from math import ceil, log2
+
+from .types.fixed_point import Q
+from .types.complex import Complex, ComplexConst, pipelined_multiply
+from .streams import ComplexStream
+
+
+class SlidingDFT(Elaboratable):
+    '''
+    Sliding DFT for a few bins of an N-point DFT
+
+    For every input sample, the DFT of the last N samples is updated for every bin k in `bins`.
+    The modulated form of the sliding DFT is used, with a plain accumulator per bin:
+
+        y_k[n] = y_k[n-1] + (x[n] - x[n-N]) * exp(-2j*pi*k*n/N)
+        S_k[n] = exp(2j*pi*k*(n+1)/N) * y_k[n]
+
+    Modulated samples are accumulated at full precision, so every sample leaving the window
+    cancels out exactly and there is no feedback through a quantized twiddle factor. The error
+    stays bounded however many samples are processed: it only comes from the quantization of
+    twiddle factors to `twiddle_shape`, and of the output, which has `guard_bits` additional
+    fraction bits.
+
+    Bin accumulators are kept in a small RAM and time-multiplexed through a complex multiplier,
+    so every input sample takes len(bins) cycles. A second, pipelined, complex multiplier
+    demodulates the outputs. Outputs are emitted in the order of `bins`, with `first` and `last`
+    flagging the first and last bin of every update.
+    '''
+    def __init__(self, shape, N, bins, *, twiddle_shape=Q(2, 15), guard_bits=4):
+        assert all(0 <= k < N for k in bins)
+        self.N             = N
+        self.bins          = list(bins)
+        self.twiddle_shape = twiddle_shape
+        state_shape        = Q(shape.integer_bits + ceil(log2(N)) + 1, shape.fraction_bits + guard_bits)
+        self.input         = ComplexStream(shape)
+        self.output        = ComplexStream(state_shape)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        N, B = self.N, len(self.bins)
+        shape, twiddle_shape = self.input.shape, self.twiddle_shape
+        # Accumulators hold modulated samples at full precision; sums only need to fit at the
+        # end, since intermediate results wrap around consistently
+        acc_shape = Q(self.output.shape.integer_bits, shape.fraction_bits + twiddle_shape.fraction_bits)
+
+        # Delay line with the last N samples
+        delay = Memory(width=2*len(shape), depth=N)
+        m.submodules.delay_wr = delay_wr = delay.write_port()
+        m.submodules.delay_rd = delay_rd = delay.read_port(domain="sync", transparent=False)
+        delay_addr = Signal(range(N))
+
+        # Twiddle ROM with exp(-2j*pi*i/N), read at the modulation and demodulation phases
+        twiddles = [ ComplexConst(twiddle_shape, exp(-2j*pi*i/N)).value() for i in range(N) ]
+        twiddle_rom = Memory(width=2*len(twiddle_shape), depth=N, init=twiddles)
+        m.submodules.mod_rd   = mod_rd   = twiddle_rom.read_port(domain="comb")
+        m.submodules.demod_rd = demod_rd = twiddle_rom.read_port(domain="comb")
+
+        # Bin ROM, and bin states: accumulator and modulation phase k*n mod N
+        bin_rom = Memory(width=len(Signal(range(N))), depth=B, init=self.bins)
+        m.submodules.bin_rd = bin_rd = bin_rom.read_port(domain="comb")
+        states = Memory(width=2*len(acc_shape) + len(Signal(range(N))), depth=B)
+        m.submodules.state_rd = state_rd = states.read_port(domain="comb")
+        m.submodules.state_wr = state_wr = states.write_port()
+
+        # Stage 0: store new sample and fetch the one leaving the window
+        x      = Complex(shape=shape)
+        x_old  = Complex(shape=shape, value=delay_rd.data)
+        busy   = Signal()
+        bin_idx = Signal(range(B))
+        last_bin = bin_idx == B-1
+
+        # Stage 1: update bins one at a time
+        enable  = self.output.produce
+        advance = busy & enable
+        m.d.comb += self.input.ready.eq(~busy | (advance & last_bin))
+
+        m.d.comb += [
+            delay_wr.addr .eq(delay_addr),
+            delay_wr.data .eq(self.input.payload),
+            delay_wr.en   .eq(self.input.consume),
+            delay_rd.addr .eq(delay_addr),
+            delay_rd.en   .eq(self.input.consume),
+        ]
+        with m.If(self.input.ready):
+            m.d.sync += busy.eq(self.input.valid)
+        with m.If(self.input.consume):
+            m.d.sync += x.eq(self.input.payload)
+            m.d.sync += delay_addr.eq(Mux(delay_addr == N-1, 0, delay_addr + 1))
+
+        acc   = Complex(shape=acc_shape, value=state_rd.data[:2*len(acc_shape)])
+        phase = state_rd.data[2*len(acc_shape):]
+        phase_next = Mux(phase + bin_rd.data >= N, phase + bin_rd.data - N, phase + bin_rd.data)[:len(phase)]
+
+        modulation = Complex(shape=twiddle_shape, value=mod_rd.data)
+        updated    = (acc + ((x - x_old) * modulation).reshape(acc_shape)).reshape(acc_shape)
+
+        m.d.comb += [
+            bin_rd.addr     .eq(bin_idx),
+            mod_rd.addr     .eq(phase),
+            demod_rd.addr   .eq(phase_next),
+            state_rd.addr   .eq(bin_idx),
+            state_wr.addr   .eq(bin_idx),
+            state_wr.data   .eq(Cat(updated, phase_next)),
+            state_wr.en     .eq(advance),
+        ]
+        with m.If(advance):
+            m.d.sync += bin_idx.eq(Mux(last_bin, 0, bin_idx + 1))
+
+        # Stage 2: demodulation, with operand, product and output registers
+        demod = Complex(shape=twiddle_shape, value=demod_rd.data)
+        demod = Complex(value=(demod.real, -demod.imag))
+        flags = Cat(busy, bin_idx == 0, last_bin)
+        flags_r = [ Signal(len(flags), name=f"flags{i}") for i in range(2) ]
+        with m.If(enable):
+            m.d.sync += [
+                flags_r[0].eq(flags),
+                flags_r[1].eq(flags_r[0]),
+                Cat(self.output.valid, self.output.first, self.output.last).eq(flags_r[1]),
+            ]
+        product = pipelined_multiply(m, updated, demod, enable=enable)
+        m.d.comb += self.output.payload.eq(product.reshape(self.output.shape))
+
+        return m
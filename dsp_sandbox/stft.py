@@ -0,0 +1,54 @@
+from amaranth import Elaboratable, Module, Signal
+
+from .types.fixed_point import Q
+from .streams import ComplexStream
+from .framing import FrameOverlapBuffer
+from .window import Window
+from .serial_fft import SerialFFT, FFTScaling
+
+
+class STFT(Elaboratable):
+    '''
+    Streaming short-time Fourier transform
+
+    Emits the spectrum of overlapping frames of N samples, one frame every `hop` input
+    samples (e.g. hop=N//2 for 50% overlap, hop=N//4 for 75%). The first frame is made of
+    N-hop zeros followed by `hop` input samples. The FFT runs at full rate as long as the
+    input rate is below hop/N samples per cycle.
+    '''
+    def __init__(self, *, N, hop, shape=Q(1,15), window="hann", coeff_shape=None,
+                 natural_order=True, strategy=FFTScaling.UNSCALED):
+        self.N             = N
+        self.hop           = hop
+        self.shape         = shape
+        self.window        = window
+        self.coeff_shape   = coeff_shape
+        self.natural_order = natural_order
+        self.strategy      = strategy
+        # Ports
+        self.input         = ComplexStream(shape)
+        self.output        = ComplexStream(SerialFFT.output_shape(N, shape, strategy))
+        if isinstance(window, list) and len(window) > 1:
+            self.select    = Signal(range(len(window)))
+
+    def elaborate(self, platform):
+        m = Module()
+
+        N, shape = self.N, self.shape
+
+        m.submodules.framer = framer = FrameOverlapBuffer(shape, N, self.hop)
+        m.submodules.window = window = Window(shape, N, window=self.window, coeff_shape=self.coeff_shape)
+        m.submodules.fft    = fft    = SerialFFT(N=N, shape=shape, natural_order=self.natural_order,
+                                                 strategy=self.strategy)
+
+        if hasattr(self, "select"):
+            m.d.comb += window.select.eq(self.select)
+
+        m.d.comb += [
+            framer.input.stream_eq(self.input),
+            window.input.stream_eq(framer.output),
+            fft.input.stream_eq(window.output),
+            self.output.stream_eq(fft.output),
+        ]
+
+        return m
@@ -11,6 +11,14 @@ class StreamProperties:
     def consume(self):
         return self.ready & self.valid
 
+    @property
+    def backpressure(self):
+        return self.valid & ~self.ready
+
+    @property
+    def starvation(self):
+        return self.ready & ~self.valid
+
 class ComplexStream(StreamInterface, StreamProperties):
     def __init__(self, shape):
         name = tracer.get_var_name(depth=2, default=None)
@@ -27,3 +35,17 @@ class SampleStream(StreamInterface, StreamProperties):
     def __init__(self, shape):
         name = tracer.get_var_name(depth=2, default=None)
         super().__init__(name=name, payload_width=Shape.cast(shape).width)
+
+class ParallelComplexStream(StreamInterface, StreamProperties):
+    """ Stream carrying `parallelism` complex samples per beat, first sample in the lowest lane """
+    def __init__(self, shape, parallelism):
+        name = tracer.get_var_name(depth=2, default=None)
+        width = 2*Shape.cast(shape).width
+        super().__init__(name=name, payload_width=parallelism*width)
+        self.parallelism = parallelism
+        self.samples = [ Complex(shape=shape, value=self.payload[i*width:(i+1)*width], name=f"lane{i}")
+                         for i in range(parallelism) ]
+
+    @property
+    def shape(self):
+        return self.samples[0].shape
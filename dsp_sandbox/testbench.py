@@ -0,0 +1,259 @@
+import numpy as np
+from amaranth import Elaboratable, Module, Signal, Cat, Mux, Value
+from amaranth.sim import Simulator, Delay
+
+from .streams import ComplexStream, ParallelComplexStream
+from .models.fixed_point import wrap
+
+
+class StreamTestbench:
+    '''
+    Batched simulation of a core with an input and an output stream
+
+    Samples go in and out in bulk as NumPy arrays of raw values: complex streams, parallel or
+    not, take (n, 2) arrays of raw real and imaginary parts (see `models.fixed_point`), and
+    other streams take raw payload integers. Use `input_stream=None` for cores that only
+    produce samples.
+
+    Stream handshakes run in simulated hardware around the core, so the simulation process
+    only wakes up every `batch // 2` cycles to exchange ring buffers of `batch` beats with it,
+    instead of poking signals every cycle. Every exchange is a couple of single-signal
+    commands, and the buffers never throttle the streams. `batch` is reduced for wide input
+    streams, whose ring would otherwise exceed 8192 bits.
+
+    The design is compiled once, and every run starts from a reset of the same simulator, so
+    a testbench should be reused for several runs of the same core.
+
+    `input_valid` and `output_ready` are patterns of 0/1 values repeated every len(pattern)
+    cycles, of up to 64 values: a new input beat is only offered on cycles where `input_valid`
+    is set, and is then held until accepted; the output is ready on cycles where
+    `output_ready` is set.
+
+    `engine` selects the simulation engine. By default, the compiled CXXRTL engine is used
+    when it is installed, and the Python engine otherwise.
+    '''
+    def __init__(self, dut, input_stream, output_stream, *, batch=256, engine=None):
+        assert batch >= 2 and batch & (batch-1) == 0, "batch must be a power of 2"
+        # The input ring is written as a constant, which the Python engine converts to a string
+        width_in = len(Value.cast(input_stream.payload)) if input_stream is not None else 0
+        while batch > 2 and width_in * batch > _MAX_RING_BITS:
+            batch //= 2
+        self.input   = input_stream
+        self.output  = output_stream
+        self.batch   = batch
+        self.engine  = engine or default_engine()
+        self.harness = _StreamHarness(dut, input_stream, output_stream, batch)
+        self._job    = None
+
+        self.sim = Simulator(self.harness, engine=self.engine)
+        self.sim.add_clock(_CLOCK_PERIOD)
+        self.sim.add_process(self._process)
+
+    def run(self, samples=(), count=None, *, input_valid=(1,), output_ready=(1,), max_cycles=None,
+            vcd_file=None, gtkw_file=None):
+        '''
+        Send `samples` and return the first `count` output samples, or those received before
+        `max_cycles` cycles. By default, `count` is the number of input samples.
+        '''
+        beats = pack(self.input, samples) if self.input is not None else []
+        count = len(beats) * _lanes(self.input) if count is None else count
+        count_beats = -(-count // _lanes(self.output))
+        max_cycles = max_cycles or 16 * (len(beats) + count_beats) + 1000
+        received = self.run_beats(beats, count_beats, input_valid=input_valid, output_ready=output_ready,
+                                  max_cycles=max_cycles, vcd_file=vcd_file, gtkw_file=gtkw_file)
+        return unpack(self.output, received)[:count]
+
+    def run_beats(self, beats, count, *, input_valid=(1,), output_ready=(1,), max_cycles,
+                  vcd_file=None, gtkw_file=None):
+        '''
+        Send raw input payloads `beats` and return the first `count` raw output payloads, or
+        those received in `max_cycles` cycles
+        '''
+        for pattern in (input_valid, output_ready):
+            assert 0 < len(pattern) <= _MAX_PATTERN, f"patterns must have 1 to {_MAX_PATTERN} values"
+        self._job = _Job(beats, min(count, 2**32 - 1), input_valid, output_ready, max_cycles)
+        self.sim.reset()
+        if vcd_file is not None:
+            with self.sim.write_vcd(vcd_file=vcd_file, gtkw_file=gtkw_file):
+                self.sim.run()
+        else:
+            self.sim.run()
+        return self._job.received
+
+    def _process(self):
+        job, harness = self._job, self.harness
+        K, period = self.batch, self.batch // 2
+        width_in, width_out = len(harness.ring_in) // K, len(harness.ring_out) // K
+        mask_in, mask_out = (1 << width_in) - 1, (1 << width_out) - 1
+
+        def bits(pattern):
+            return sum(int(bool(value)) << i for i, value in enumerate(pattern))
+        values = [ job.count, bits(job.input_valid), len(job.input_valid) - 1,
+                   bits(job.output_ready), len(job.output_ready) - 1 ]
+        config, offset = 0, 0
+        for field, value in zip(harness.config_fields, values):
+            config |= value << offset
+            offset += len(field)
+        yield harness.config.eq(config)
+
+        ring_in = 0
+        loaded  = 0
+        cycle   = 0
+        while True:
+            status   = yield harness.status
+            taken    = status & 0xffffffff
+            captured = (status >> 32) & 0xffffffff
+            ring_out = status >> 64
+
+            # Collect new output beats
+            for i in range(len(job.received), captured):
+                job.received.append((ring_out >> (width_out * (i % K))) & mask_out)
+            if captured >= job.count or cycle >= job.max_cycles:
+                return
+
+            # Refill the input ring
+            while loaded < len(job.beats) and loaded - taken < K:
+                offset = width_in * (loaded % K)
+                ring_in = ring_in & ~(mask_in << offset) | ((int(job.beats[loaded]) & mask_in) << offset)
+                loaded += 1
+            yield harness.control.eq(ring_in | (loaded << (width_in * K)) | (captured << (width_in * K + 32)))
+
+            # Let the harness run on its own until the next exchange
+            step = min(period, job.max_cycles - cycle)
+            yield Delay(step * _CLOCK_PERIOD)
+            cycle += step
+
+
+class _Job:
+    def __init__(self, beats, count, input_valid, output_ready, max_cycles):
+        self.beats        = beats
+        self.count        = count
+        self.input_valid  = input_valid
+        self.output_ready = output_ready
+        self.max_cycles   = max_cycles
+        self.received     = []
+
+
+_CLOCK_PERIOD  = 1e-6
+_MAX_RING_BITS = 8192
+_MAX_PATTERN   = 64
+
+
+def default_engine():
+    '''Compiled CXXRTL simulation engine if it is installed, the Python engine otherwise'''
+    try:
+        from amaranth.sim.cxxsim import CxxSimEngine
+    except ImportError:
+        return "pysim"
+    return CxxSimEngine
+
+
+class _StreamHarness(Elaboratable):
+    '''
+    Drives the core streams from ring buffers written by the simulation process
+
+    `config` holds the number of output beats to capture and the valid/ready patterns, each
+    with the index of its last value. `control` holds the input ring, the number of beats
+    loaded into it and the number of output beats read back by the process; `status` holds
+    the number of input beats taken, the number of output beats captured and the output ring.
+    Rings are single wide signals, so that exchanging them takes a single simulator command.
+    '''
+    def __init__(self, dut, input_stream, output_stream, batch):
+        self.dut    = dut
+        self.input  = input_stream
+        self.output = output_stream
+        self.batch  = batch
+        width_in  = len(Value.cast(input_stream.payload)) if input_stream is not None else 0
+        width_out = len(Value.cast(output_stream.payload))
+        self.count             = Signal(32)
+        self.input_valid       = Signal(_MAX_PATTERN)
+        self.input_valid_last  = Signal(range(_MAX_PATTERN))
+        self.output_ready      = Signal(_MAX_PATTERN)
+        self.output_ready_last = Signal(range(_MAX_PATTERN))
+        self.ring_in           = Signal(width_in * batch)
+        self.ring_out          = Signal(width_out * batch)
+        self.loaded            = Signal(32)
+        self.read              = Signal(32)
+        self.taken             = Signal(32)
+        self.captured          = Signal(32)
+        self.config_fields     = [ self.count, self.input_valid, self.input_valid_last,
+                                   self.output_ready, self.output_ready_last ]
+        self.config            = Cat(*self.config_fields)
+        self.control           = Cat(self.ring_in, self.loaded, self.read)
+        self.status            = Cat(self.taken, self.captured, self.ring_out)
+
+    def elaborate(self, platform):
+        m = Module()
+        m.submodules.dut = self.dut
+
+        K = self.batch
+        index_bits = (K - 1).bit_length()
+
+        # Cyclic valid/ready patterns, stepping through one value every cycle
+        def pattern(values, last, name):
+            index = Signal(range(_MAX_PATTERN), name=f"{name}_index")
+            m.d.sync += index.eq(Mux(index == last, 0, index + 1))
+            return values.bit_select(index, 1)
+
+        # Input: offer the next loaded beat when the pattern allows it, and hold it until taken
+        if self.input is not None:
+            inp = self.input
+            width = len(self.ring_in) // K
+            hold = Signal()
+            available = self.loaded != self.taken
+            offered = pattern(self.input_valid, self.input_valid_last, "input_valid")
+            m.d.comb += [
+                inp.valid                   .eq(available & (hold | offered)),
+                Value.cast(inp.payload)     .eq(self.ring_in.word_select(self.taken[:index_bits], width)),
+            ]
+            m.d.sync += hold.eq(inp.valid & ~inp.ready)
+            with m.If(inp.consume):
+                m.d.sync += self.taken.eq(self.taken + 1)
+
+        # Output: capture beats while there is room in the ring and more beats are expected
+        out = self.output
+        width = len(self.ring_out) // K
+        room = (self.captured - self.read)[:32] < K
+        ready = pattern(self.output_ready, self.output_ready_last, "output_ready")
+        m.d.comb += out.ready.eq(room & (self.captured < self.count) & ready)
+        with m.If(out.consume):
+            m.d.sync += [
+                self.ring_out.word_select(self.captured[:index_bits], width) .eq(Value.cast(out.payload)),
+                self.captured                                                .eq(self.captured + 1),
+            ]
+
+        return m
+
+
+def _lanes(stream):
+    return stream.parallelism if isinstance(stream, ParallelComplexStream) else 1
+
+
+def pack(stream, samples):
+    '''Payloads of `stream` carrying raw `samples`, as a list of integers'''
+    if not isinstance(stream, (ComplexStream, ParallelComplexStream)):
+        return [ int(s) for s in samples ]
+    width = len(stream.shape)
+    mask  = (1 << width) - 1
+    samples = np.asarray(samples, dtype=np.int64).reshape(-1, _lanes(stream), 2).astype(object)
+    beats = np.zeros(len(samples), dtype=object)
+    for lane in range(_lanes(stream)):
+        real, imag = samples[:, lane, 0], samples[:, lane, 1]
+        beats = beats | (((real & mask) | ((imag & mask) << width)) << (2 * width * lane))
+    return list(beats)
+
+
+def unpack(stream, beats):
+    '''Raw samples carried by a list of payloads of `stream`'''
+    if not isinstance(stream, (ComplexStream, ParallelComplexStream)):
+        return np.array(beats)
+    if not len(beats):
+        return np.zeros((0, 2), dtype=np.int64)
+    shape = stream.shape
+    width = len(shape)
+    mask  = (1 << width) - 1
+    beats = np.array(beats, dtype=object)
+    lanes = [ [ (beats >> (2 * width * lane + width * part)) & mask for part in range(2) ]
+              for lane in range(_lanes(stream)) ]
+    raw = np.array(lanes, dtype=np.int64).reshape(_lanes(stream), 2, -1).transpose(2, 0, 1).reshape(-1, 2)
+    return wrap(raw, shape)
@@ -1,10 +1,21 @@
 from amaranth import *
 from amaranth import tracer
 from amaranth.hdl.ast import ValueCastable
+from enum import IntEnum
 from .fixed_point import FixedPointConst, FixedPointValue, Q
 
 # Copied from Amalthea with some changes
 
+class ComplexMultiplication(IntEnum):
+    """
+    Arrangement of the real operations in a complex multiplication (a + jb) * (c + jd)
+
+    All of them give bit-identical results, with the shape of the four multiplier form.
+    """
+    FOUR_MULTIPLIERS  = 1   # ac - bd, ad + bc
+    THREE_MULTIPLIERS = 2   # k1 = c(a+b), k2 = a(d-c), k3 = b(c+d); k1 - k3, k1 + k2
+    PRE_ADDER         = 3   # k1 = b(c-d), k2 = c(a-b), k3 = d(a+b); k1 + k2, k1 + k3
+
 class ComplexConst(ValueCastable):
     def __init__(self, shape, value):
         self.shape = shape
@@ -57,9 +68,9 @@ class Complex(ValueCastable):
         assert len(self.as_value()) == len(Value.cast(other))
         return self.as_value().eq(other)
 
-    def reshape(self, shape, rounding=None):
-        real = self.real.reshape(shape, rounding=rounding)
-        imag = self.imag.reshape(shape, rounding=rounding)
+    def reshape(self, shape, rounding=None, overflow=None):
+        real = self.real.reshape(shape, rounding=rounding, overflow=overflow)
+        imag = self.imag.reshape(shape, rounding=rounding, overflow=overflow)
         return Complex(value=(real, imag))
 
     def to_complex(self):
@@ -85,15 +96,73 @@ class Complex(ValueCastable):
 
     def __mul__(self, other):
         if isinstance(other, (Complex, ComplexConst)):
-            real = self.real * other.real - self.imag * other.imag
-            imag = self.real * other.imag + self.imag * other.real
-            assert real.shape == imag.shape
+            return self.multiply(other)
         elif isinstance(other, (FixedPointValue, FixedPointConst)):
             real = self.real * other
             imag = self.imag * other
         return Complex(value=(real, imag))
 
+    def multiply(self, other, multiplication=ComplexMultiplication.FOUR_MULTIPLIERS):
+        """Combinational complex product, with the given `ComplexMultiplication` arrangement"""
+        return _multiply(self, other, multiplication, lambda value: value)
+
     def __rshift__(self, shift):
         real = self.real >> shift
         imag = self.imag >> shift
-        return Complex(value=(real, imag))
\ No newline at end of file
+        return Complex(value=(real, imag))
+
+
+def _multiply(x, y, multiplication, register):
+    """
+    Complex product of x and y, with `register` applied to the values at every pipeline
+    boundary: operands (or pre-additions), products and final sums
+    """
+    def operand(value):
+        if isinstance(value, FixedPointConst):
+            return FixedPointValue(value.shape, value.value)
+        return value
+
+    a, b = operand(x.real), operand(x.imag)
+    c, d = operand(y.real), operand(y.imag)
+    shape = (a * c - b * d).shape
+
+    if multiplication == ComplexMultiplication.FOUR_MULTIPLIERS:
+        a, b, c, d = (register(v) for v in (a, b, c, d))
+        ac, bd, ad, bc = (register(p) for p in (a * c, b * d, a * d, b * c))
+        real, imag = ac - bd, ad + bc
+    elif multiplication == ComplexMultiplication.THREE_MULTIPLIERS:
+        # Pre-additions are registered together with the operands; c(a+b) is shared
+        sum_ab, diff_dc, sum_cd = (register(v) for v in (a + b, d - c, c + d))
+        a, b, c = (register(v) for v in (a, b, c))
+        k1 = register(c * sum_ab)
+        k2 = register(a * diff_dc)
+        k3 = register(b * sum_cd)
+        real, imag = k1 - k3, k1 + k2
+    elif multiplication == ComplexMultiplication.PRE_ADDER:
+        # Every product has the (x +- y) * z form, so that pre-additions are absorbed into
+        # the multiplier stage of a DSP block, right after its input registers
+        a, b, c, d = (register(v) for v in (a, b, c, d))
+        k1 = register(b * (c - d))
+        k2 = register(c * (a - b))
+        k3 = register(d * (a + b))
+        real, imag = k1 + k2, k1 + k3
+    else:
+        raise ValueError(f"unsupported complex multiplication {multiplication}")
+
+    # Results always fit in the four multiplier shape, so dropping extra integer bits is exact
+    return Complex(value=(register(real.reshape(shape)), register(imag.reshape(shape))))
+
+
+def pipelined_multiply(m, x, y, multiplication=ComplexMultiplication.FOUR_MULTIPLIERS, enable=1):
+    """
+    Complex product of x and y with three levels of pipeline registers: operands (or
+    pre-additions), products and final sums. The result is available three cycles after
+    the operands, registers only being updated while `enable` is asserted.
+    """
+    def register(value):
+        value_r = FixedPointValue(value.shape, name="cmul")
+        with m.If(enable):
+            m.d.sync += value_r.eq(value)
+        return value_r
+
+    return _multiply(x, y, multiplication, register)
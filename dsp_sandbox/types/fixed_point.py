@@ -1,11 +1,25 @@
-from amaranth import Cat, Const, Module, Shape, Signal, Value, tracer
+from amaranth import Cat, Const, Module, Mux, Shape, Signal, Value, tracer
 from amaranth.hdl.ast import ValueCastable, ShapeCastable
 from enum import IntEnum
 
 # Copied from Amalthea with some changes
 
 class FixedPointRounding(IntEnum):
-    TRUNCATION = 1
+    """
+    Rounding of discarded low-order bits in `FixedPointValue.reshape`
+
+    Rounding keeps the binary point, and removed integer bits are then handled according to
+    `FixedPointOverflow`. For backwards compatibility, `TRUNCATION` takes removed integer
+    bits from the least significant end instead, scaling the value down.
+    """
+    TRUNCATION    = 1   # towards -inf
+    ROUND_HALF_UP = 2   # to nearest, ties towards +inf
+    CONVERGENT    = 3   # to nearest, ties to even
+
+class FixedPointOverflow(IntEnum):
+    """Handling of values out of range of the new shape in `FixedPointValue.reshape`"""
+    WRAP     = 1
+    SATURATE = 2
 
 class FixedPointShape(ShapeCastable):
     def __init__(self, integer_bits, fraction_bits, signed=True):
@@ -64,7 +78,8 @@ class FixedPointValue(ValueCastable):
         self.shape = shape
         self.name = name or tracer.get_var_name(depth=2, default="FixedPoint")
         if value is None:
-            self.value = Signal(shape, name=self.name)
+            # Signal() may already wrap ShapeCastable shapes in a FixedPointValue
+            self.value = Value.cast(Signal(shape, name=self.name))
         elif isinstance(value, FixedPointValue):
             self.value = value.value
         elif isinstance(value, Value):
@@ -91,31 +106,56 @@ class FixedPointValue(ValueCastable):
         value = (yield self.value)
         return float(value) / (2**self.shape.fraction_bits)
 
-    def reshape(self, new_shape, rounding=None):
+    def reshape(self, new_shape, rounding=None, overflow=None):
         if self.shape == new_shape:
             return self
+        biased, finish = self._reshape_stages(new_shape, rounding, overflow)
+        return finish(biased)
+
+    def _reshape_stages(self, new_shape, rounding, overflow):
+        """
+        Split a reshape in two steps: the rounding adder, which adds a bias to the raw value,
+        and the final shift and overflow handling. Returns the biased value and a function
+        completing the reshape from it.
+        """
         integer_diff = new_shape.integer_bits - self.shape.integer_bits
         fraction_diff = new_shape.fraction_bits - self.shape.fraction_bits
 
-        # Extend or reduce fraction bits
-        value = self.value.shift_left(fraction_diff)
-
-        if integer_diff > 0:
-            # Positive difference, extend integer bits
-            # sign-extend if needed
-            top_bit = value[-1] if self.shape.signed else 0
-            value = Cat(value, [top_bit]*integer_diff)
-        elif integer_diff < 0:
-            # Negative difference, act based on selected rounding
-            if rounding == FixedPointRounding.TRUNCATION:
-                value = value[-integer_diff:]
+        # Extend or reduce fraction bits; truncation also drops extra integer bits at the
+        # least significant end
+        shift = fraction_diff
+        if integer_diff < 0 and rounding == FixedPointRounding.TRUNCATION:
+            shift += integer_diff
+
+        value = self.value.as_signed() if self.shape.signed else self.value.as_unsigned()
+        dropped = max(0, -shift)
+        if dropped and rounding == FixedPointRounding.ROUND_HALF_UP:
+            biased = value + (1 << (dropped - 1))
+        elif dropped and rounding == FixedPointRounding.CONVERGENT:
+            biased = value + ((1 << (dropped - 1)) - 1) + value[dropped]
+        else:
+            biased = value
+
+        def finish(biased):
+            value = biased.shift_left(shift)
+            width = len(new_shape)
+            if len(value) < width:
+                # Extend integer bits, sign-extend if needed
+                top_bit = value[-1] if value.shape().signed else 0
+                value = Cat(value, [top_bit]*(width - len(value)))
+            elif len(value) > width and overflow == FixedPointOverflow.SATURATE:
+                # Clamp the rounded value, including any carry out of the rounding adder
+                low  = -2**(width - 1) if new_shape.signed else 0
+                high = 2**(width - 1) - 1 if new_shape.signed else 2**width - 1
+                value = Mux(value > high, high, Mux(value < low, low, value))[:width]
             else:
                 # Default: slice away extra integer bits
-                value = value[:integer_diff]
+                value = value[:width]
+            if new_shape.signed:
+                value = value.as_signed()
+            return FixedPointValue(new_shape, value)
 
-        if new_shape.signed:
-            value = value.as_signed()
-        return FixedPointValue(new_shape, value)
+        return biased, finish
 
 
     def _align(self, other):
@@ -155,4 +195,17 @@ class FixedPointValue(ValueCastable):
         return new_shape(-self.value)
 
     def __rshift__(self, shift):
-        return self.shape(self.value >> shift)
\ No newline at end of file
+        return self.shape(self.value >> shift)
+
+
+def pipelined_reshape(m, value, new_shape, rounding=None, overflow=None, enable=1):
+    """
+    Reshape `value` with a pipeline register right after the rounding adder, so that the
+    addition and the overflow logic are in different clock cycles. The result is available
+    one cycle after `value`, registers only being updated while `enable` is asserted.
+    """
+    biased, finish = value._reshape_stages(new_shape, rounding, overflow)
+    biased_r = Signal(biased.shape(), name="rounding")
+    with m.If(enable):
+        m.d.sync += biased_r.eq(biased)
+    return finish(biased_r)
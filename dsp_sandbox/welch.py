@@ -0,0 +1,135 @@
+from amaranth import Elaboratable, Module, Signal, Memory, Mux
+from math import log2
+from enum import IntEnum
+
+from .types.fixed_point import Q, FixedPointValue
+from .streams import ComplexStream, SampleStream
+
+
+class PowerAveraging(IntEnum):
+    LINEAR      = 0
+    EXPONENTIAL = 1
+
+
+def power_shape(shape):
+    '''Shape of |x|^2 for a complex sample of the given shape'''
+    return Q(2*shape.integer_bits + 1, 2*shape.fraction_bits)
+
+
+class MagnitudeSquared(Elaboratable):
+    def __init__(self, shape):
+        self.input  = ComplexStream(shape)
+        self.output = SampleStream(power_shape(shape))
+
+    def elaborate(self, platform):
+        m = Module()
+
+        re, im = self.input.real, self.input.imag
+        power = FixedPointValue(power_shape(self.input.shape), value=self.output.payload)
+
+        m.d.comb += self.input.ready.eq(self.output.produce)
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(self.input.valid)
+            with m.If(self.input.valid):
+                m.d.sync += power.eq((re * re + im * im).reshape(power.shape))
+
+        return m
+
+
+class PowerSpectrumAccumulator(Elaboratable):
+    '''
+    Welch power spectrum estimate: averages |X|^2 over frames of N bins, using a per-bin
+    accumulator in RAM.
+
+    With `PowerAveraging.LINEAR`, one averaged spectrum is emitted every K frames. With
+    `PowerAveraging.EXPONENTIAL`, every bin is updated as acc += (|X|^2 - acc) / 2^alpha_shift
+    and the accumulated spectrum is emitted every K frames.
+
+    Bins are accumulated and emitted in arrival order, so bit-reversed spectra from
+    `SerialFFT(natural_order=False)` can be averaged as they come and reordered after
+    decimation.
+    '''
+    def __init__(self, shape, N, K, *, averaging=PowerAveraging.LINEAR, alpha_shift=None):
+        assert K & (K-1) == 0 or averaging == PowerAveraging.EXPONENTIAL, "K must be a power of 2"
+        assert averaging == PowerAveraging.LINEAR or alpha_shift is not None, "alpha_shift is required"
+        self.N           = N
+        self.K           = K
+        self.averaging   = averaging
+        self.alpha_shift = alpha_shift
+        shape_power      = power_shape(shape)
+        if averaging == PowerAveraging.LINEAR:
+            # Sum of K frames, interpreted with log2(K) extra fraction bits
+            K_bits = int(log2(K))
+            self.acc_shape   = Q(shape_power.integer_bits + K_bits, shape_power.fraction_bits)
+            self.shape_out   = Q(shape_power.integer_bits, shape_power.fraction_bits + K_bits)
+        else:
+            self.acc_shape   = Q(shape_power.integer_bits, shape_power.fraction_bits + alpha_shift)
+            self.shape_out   = self.acc_shape
+        self.input       = ComplexStream(shape)
+        self.output      = SampleStream(self.shape_out)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        N, K = self.N, self.K
+
+        m.submodules.power = power = MagnitudeSquared(self.input.shape)
+        m.d.comb += power.input.stream_eq(self.input)
+
+        # Accumulator RAM
+        mem = Memory(width=len(self.acc_shape), depth=N)
+        m.submodules.acc_rd = acc_rd = mem.read_port(domain="sync", transparent=False)
+        m.submodules.acc_wr = acc_wr = mem.write_port()
+
+        # Bin and frame counters
+        bin_idx   = Signal(range(N))
+        frame_idx = Signal(range(K))
+        with m.If(power.output.consume):
+            m.d.sync += bin_idx.eq(Mux(bin_idx == N-1, 0, bin_idx + 1))
+            with m.If(bin_idx == N-1):
+                m.d.sync += frame_idx.eq(Mux(frame_idx == K-1, 0, frame_idx + 1))
+
+        # Stage 0: read accumulator for the incoming bin
+        s0_valid = Signal()
+        s0_ready = Signal()
+        s0_addr  = Signal.like(bin_idx)
+        s0_first = Signal()
+        s0_last  = Signal()
+        s0_power = FixedPointValue(power_shape(self.input.shape))
+
+        m.d.comb += [
+            power.output.ready .eq(~s0_valid | s0_ready),
+            acc_rd.addr        .eq(bin_idx),
+            acc_rd.en          .eq(power.output.consume),
+        ]
+        with m.If(power.output.ready):
+            m.d.sync += s0_valid.eq(power.output.valid)
+            with m.If(power.output.valid):
+                m.d.sync += [
+                    s0_addr  .eq(bin_idx),
+                    s0_first .eq(frame_idx == 0),
+                    s0_last  .eq(frame_idx == K-1),
+                    s0_power .eq(FixedPointValue(s0_power.shape, value=power.output.payload)),
+                ]
+
+        # Stage 1: update accumulator, emit results of the last frame
+        acc = FixedPointValue(self.acc_shape, value=acc_rd.data)
+        x   = s0_power.reshape(self.acc_shape)
+        if self.averaging == PowerAveraging.LINEAR:
+            acc_next = FixedPointValue(self.acc_shape, Mux(s0_first, x, (acc + x).reshape(self.acc_shape)))
+        else:
+            delta = ((x - acc) >> self.alpha_shift).reshape(self.acc_shape)
+            acc_next = (acc + delta).reshape(self.acc_shape)
+
+        m.d.comb += s0_ready.eq(~s0_last | self.output.produce)
+        m.d.comb += [
+            acc_wr.addr .eq(s0_addr),
+            acc_wr.data .eq(acc_next),
+            acc_wr.en   .eq(s0_valid & s0_ready),
+        ]
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(s0_valid & s0_last)
+            with m.If(s0_valid & s0_last):
+                m.d.sync += self.output.payload.eq(acc_next)
+
+        return m
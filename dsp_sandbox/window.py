@@ -4,21 +4,35 @@ from .streams import ComplexStream, SampleStream
 from scipy.signal import get_window
 
 class Window(Elaboratable):
+    '''
+    Multiplies frames of N samples by a symmetric window.
+
+    Only the first half of each window is stored in ROM and read back in both directions.
+    `window` can also be a list of windows; they share the ROM and the one applied to the
+    next frame is chosen at runtime with `select`. Since coefficients are fetched ahead of
+    the input samples, `select` must be updated before the end of the previous frame.
+    '''
     def __init__(self, shape, N, window="hann", coeff_shape=None):
-        self.N      = N
-        self.window = window
-        self.cshape = coeff_shape or shape
-        self.input  = ComplexStream(shape)
-        self.output = ComplexStream(shape)
-
-    def window_coefficients(self):
-        w = get_window(self.window, self.N, fftbins=False)  # symmetric window
+        self.N       = N
+        self.windows = window if isinstance(window, list) else [window]
+        self.cshape  = coeff_shape or shape
+        self.input   = ComplexStream(shape)
+        self.output  = ComplexStream(shape)
+        if len(self.windows) > 1:
+            self.select = Signal(range(len(self.windows)))
+
+    def window_coefficients(self, index=0):
+        w = get_window(self.windows[index], self.N, fftbins=False)  # symmetric window
         return [ FixedPointConst(self.cshape, s) for s in w ]
         
     def elaborate(self, platform):
         m = Module()
 
-        m.submodules.win = win = CyclicStream(self.cshape, self.window_coefficients())
+        half = (self.N + 1) // 2
+        tables = [ self.window_coefficients(i)[:half] for i in range(len(self.windows)) ]
+        m.submodules.win = win = SymmetricCyclicStream(self.cshape, tables, self.N)
+        if len(self.windows) > 1:
+            m.d.comb += win.select.eq(self.select)
 
         m.d.comb += self.input.ready.eq(self.output.produce & win.output.valid)
         m.d.comb += win.output.ready.eq(self.output.produce & self.input.valid)
@@ -62,6 +76,64 @@ class CyclicStream(Elaboratable):
 
         return m
 
+class SymmetricCyclicStream(Elaboratable):
+    '''
+    Cyclic stream of a symmetric sequence of the given length, from a ROM holding its
+    first (length+1)//2 samples. Multiple tables can be stored and selected with `select`,
+    which is sampled at the start of every period.
+    '''
+    def __init__(self, shape, tables, length):
+        assert length >= 2
+        assert all(len(t) == (length+1)//2 for t in tables)
+        self.tables  = tables
+        self.length  = length
+        self.output  = SampleStream(shape)
+        self.select  = Signal(range(len(tables)))
+
+    def elaborate(self, platform):
+        m = Module()
+
+        half = (self.length + 1) // 2
+
+        # Stream ROM, with all tables one after the other
+        samp_width = Shape.cast(self.output.payload.shape()).width
+        init_values = [ s.value for t in self.tables for s in t ]
+        mem = Memory(width=samp_width, depth=len(init_values), init=init_values)
+        m.submodules.mem_rd = mem_rd = mem.read_port(domain="sync", transparent=False)
+
+        # Address generation: count up to the middle sample and back down
+        idx  = Signal(range(half))
+        down = Signal()
+        sel  = Signal.like(self.select)
+
+        period_start = ~down & (idx == 0)
+        cur_sel = Mux(period_start, self.select, sel)
+
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(1)
+            with m.If(period_start):
+                m.d.sync += sel.eq(self.select)
+            with m.If(~down):
+                with m.If(idx == half - 1):
+                    m.d.sync += down.eq(1)
+                    if self.length % 2 == 1:
+                        m.d.sync += idx.eq(idx - 1)
+                with m.Else():
+                    m.d.sync += idx.eq(idx + 1)
+            with m.Else():
+                with m.If(idx == 0):
+                    m.d.sync += down.eq(0)
+                with m.Else():
+                    m.d.sync += idx.eq(idx - 1)
+
+        m.d.comb += [
+            mem_rd.addr         .eq(cur_sel * half + idx),
+            mem_rd.en           .eq(self.output.produce),
+            self.output.payload .eq(mem_rd.data),
+        ]
+
+        return m
+
 def _incr(signal, modulo):
     if modulo == 2 ** len(signal):
         return signal + 1
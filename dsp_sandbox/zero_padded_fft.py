@@ -0,0 +1,150 @@
+from amaranth import Elaboratable, Module, Signal, Memory, Mux, Array
+
+from .types.fixed_point import Q
+from .streams import ComplexStream
+from .serial_fft import SerialFFT, TwiddleStage, FFTScaling
+from .framing import FrameReplay
+
+
+class ZeroPaddedFFT(Elaboratable):
+    '''
+    N-point FFT of zero-padded frames, emitting a contiguous range of output bins
+
+    Every input frame holds the first L samples of the N-point frame, the remaining N-L
+    samples being zero padding that is never transferred. With R = N/L, bins are computed as
+
+        X[R*m + r] = sum_n (x[n] W_N^(n*r)) W_L^(n*m),  n, m < L
+
+    The first log2(R) butterfly stages, whose inputs are known to be zero, are replaced by
+    replaying the frame once for every residue r, a twiddle multiplication and an L-point
+    SerialFFT, so butterflies and feedback memories are those of an L-point FFT. Residues with
+    no requested bin are not computed, and the twiddle multiplier is left out when only
+    residue 0 is needed.
+
+    On the output side, bins are selected rather than pruned: the complete L-point FFT of every
+    computed residue is evaluated, and bins outside [first_bin, first_bin + bins) are dropped.
+    With L = N, this is a full N-point FFT followed by bin selection. Selected bins go through a
+    double buffer of 2*bins samples, which replaces the bit reversal (and is larger than it when
+    more than L/2 bins are requested), and are emitted in natural order. With
+    `FFTScaling.SCALED`, outputs are scaled by 1/L.
+    '''
+    def __init__(self, *, N, L, shape=Q(1,15), first_bin=0, bins=None, strategy=FFTScaling.UNSCALED):
+        assert N & (N-1) == 0, "N must be a power of 2"
+        assert L & (L-1) == 0 and 1 < L <= N, "L must be a power of 2 no larger than N"
+        bins = bins or N - first_bin
+        assert 0 <= first_bin and first_bin + bins <= N, "bins out of range"
+        self.N         = N
+        self.L         = L
+        self.first_bin = first_bin
+        self.bins      = bins
+        self.strategy  = strategy
+        self.input     = ComplexStream(shape)
+        self.output    = ComplexStream(SerialFFT.output_shape(L, shape, strategy))
+
+    def residues(self):
+        '''Residues r = k mod N/L of the requested bins k'''
+        R = self.N // self.L
+        return sorted({ k % R for k in range(self.first_bin, self.first_bin + self.bins) })
+
+    def elaborate(self, platform):
+        m = Module()
+
+        N, L = self.N, self.L
+        shape = self.input.shape
+        residues = self.residues()
+
+        # Replay every frame once per residue
+        m.submodules.replay = replay = FrameReplay(shape, L, len(residues))
+        m.d.comb += replay.input.stream_eq(self.input)
+        last = replay.output
+
+        # Twiddle factors W_N^(n*r)
+        if residues != [0]:
+            w = [ (n*r, N) for r in residues for n in range(L) ]
+            m.submodules.twiddle = twiddle = TwiddleStage(factors=w, shape=shape)
+            m.d.comb += twiddle.input.stream_eq(last)
+            last = twiddle.output
+
+        # L-point FFT, bit reversal is done when selecting bins
+        m.submodules.fft = fft = SerialFFT(N=L, shape=shape, natural_order=False, strategy=self.strategy)
+        m.d.comb += fft.input.stream_eq(last)
+
+        m.submodules.select = select = _BinSelector(fft.output.shape, N, L, residues, self.first_bin, self.bins)
+        m.d.comb += [
+            select.input.stream_eq(fft.output),
+            self.output.stream_eq(select.output),
+        ]
+
+        return m
+
+
+class _BinSelector(Elaboratable):
+    '''
+    Collects the requested bins from the bit-reversed outputs of every residue, and emits them
+    in natural order
+    '''
+    def __init__(self, shape, N, L, residues, first_bin, bins):
+        self.N         = N
+        self.L         = L
+        self.residues  = residues
+        self.first_bin = first_bin
+        self.bins      = bins
+        self.input     = ComplexStream(shape)
+        self.output    = ComplexStream(shape)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        L, R, K = self.L, self.N // self.L, self.bins
+        n_residues = len(self.residues)
+
+        mem = Memory(width=len(self.input.payload.as_value()), depth=2*K)
+        m.submodules.mem_wr = mem_wr = mem.write_port()
+        m.submodules.mem_rd = mem_rd = mem.read_port(domain="sync", transparent=False)
+
+        # Write side: bin index k = R*m + r, with m in bit-reversed order
+        idx     = Signal(range(L))
+        res_idx = Signal(range(n_residues))
+        wr_bank = Signal()
+        filled  = Signal(range(3))
+
+        residue = Array(self.residues)[res_idx]
+        k       = idx[::-1] * R + residue
+        offset  = k - self.first_bin
+        keep    = (k >= self.first_bin) & (k < self.first_bin + K)
+
+        received = self.input.consume & (idx == L - 1) & (res_idx == n_residues - 1)
+        m.d.comb += [
+            self.input.ready .eq(filled != 2),
+            mem_wr.addr      .eq(Mux(wr_bank, K + offset, offset)),
+            mem_wr.data      .eq(self.input.payload),
+            mem_wr.en        .eq(self.input.consume & keep),
+        ]
+        with m.If(self.input.consume):
+            m.d.sync += idx.eq(idx + 1)
+            with m.If(idx == L - 1):
+                m.d.sync += res_idx.eq(Mux(res_idx == n_residues - 1, 0, res_idx + 1))
+                with m.If(res_idx == n_residues - 1):
+                    m.d.sync += wr_bank.eq(~wr_bank)
+
+        # Read side: bins in natural order
+        rd_idx   = Signal(range(K))
+        rd_bank  = Signal()
+        can_read = filled != 0
+        do_read  = self.output.produce & can_read
+        released = do_read & (rd_idx == K - 1)
+        m.d.comb += [
+            mem_rd.addr         .eq(Mux(rd_bank, K + rd_idx, rd_idx)),
+            mem_rd.en           .eq(self.output.produce),
+            self.output.payload .eq(mem_rd.data),
+        ]
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(can_read)
+        with m.If(do_read):
+            m.d.sync += rd_idx.eq(Mux(rd_idx == K - 1, 0, rd_idx + 1))
+            with m.If(rd_idx == K - 1):
+                m.d.sync += rd_bank.eq(~rd_bank)
+
+        m.d.sync += filled.eq(filled + received - released)
+
+        return m
@@ -1,7 +1,8 @@
 import unittest
 from math import ceil, log2
 from amaranth import unsigned
-from dsp_sandbox.bit_exchange import SerialBitReversal, SerialBitExchange
+from dsp_sandbox.bit_exchange import SerialBitReversal, SerialBitExchange, SerialBitPermutation, SerialHalfSwap
+from dsp_sandbox.bit_exchange import bit_exchanges, digit_reversal, stride_permutation
 from stream_helper import stream_process
 
 def binrev(v, n):
@@ -19,6 +20,58 @@ class TestSerialBitReversal(unittest.TestCase):
         out = stream_process(dut, dut.input, dut.output, input_sequence, cycles=100)
         self.assertListEqual(expected, out)
 
+    def test_interleaved_bit_reversal(self):
+        N, C = 16, 4
+        shape = unsigned(8)
+        reversed_index = binrev(list(range(N)), N)
+        expected = [ reversed_index[i]*C + c for i in range(N) for c in range(C) ]
+        dut = SerialBitReversal(shape, N, channels=C)
+        input_sequence = list(range(N*C))
+        out = stream_process(dut, dut.input, dut.output, input_sequence, cycles=300)
+        self.assertListEqual(expected, out)
+
+    def check_permutation(self, permutation, frames=2):
+        N = 2**len(permutation)
+        dut = SerialBitPermutation(unsigned(8), permutation)
+        input_sequence = list(range(N)) * frames
+        out = stream_process(dut, dut.input, dut.output, input_sequence, output_stall_cycles=1, cycles=6*N*frames)
+        # Output position of the sample with input index i has bit j = bit permutation[j] of i
+        position = lambda i: sum(((i >> p) & 1) << j for j, p in enumerate(permutation))
+        expected = [0] * N
+        for i in range(N):
+            expected[position(i)] = i
+        self.assertListEqual(out, expected * frames)
+
+    def test_digit_reversal(self):
+        self.assertListEqual(digit_reversal(4), [2, 3, 0, 1])
+        self.check_permutation(digit_reversal(6))
+
+    def test_stride_permutation(self):
+        # Transpose of a 4x8 row-major matrix
+        permutation = stride_permutation(5, 3)
+        dut = SerialBitPermutation(unsigned(8), permutation)
+        out = stream_process(dut, dut.input, dut.output, list(range(32)), cycles=200)
+        self.assertListEqual(out, [ r*8 + c for c in range(8) for r in range(4) ])
+        self.check_permutation(permutation)
+
+    def test_arbitrary_permutation(self):
+        self.check_permutation([3, 0, 4, 1, 2])
+        self.check_permutation([1, 2, 0, 5, 4, 3])
+
+    def test_minimum_exchanges(self):
+        # One stage per 2-cycle for bit reversal, with the known optimum delay
+        self.assertListEqual(bit_exchanges([4, 3, 2, 1, 0]), [(4, 0), (3, 1)])
+        # A cycle of length c needs c-1 exchanges
+        self.assertEqual(len(bit_exchanges([1, 2, 3, 0])), 3)
+
+    def test_half_swap(self):
+        N = 16
+        dut = SerialHalfSwap(unsigned(8), N)
+        input_sequence = list(range(3*N))
+        out = stream_process(dut, dut.input, dut.output, input_sequence, input_idle_cycles=1, output_stall_cycles=2, cycles=12*N)
+        expected = [ f*N + ((i + N//2) % N) for f in range(3) for i in range(N) ]
+        self.assertListEqual(out, expected)
+
     def test_serial_bit_exchange(self):
         N = 8
         shape = unsigned(5)
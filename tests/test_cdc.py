@@ -0,0 +1,114 @@
+import unittest
+
+from amaranth import Elaboratable, Module, ClockDomain
+from amaranth.sim import Simulator
+from dsp_sandbox.cdc import StreamCDC
+from dsp_sandbox.serial_fft import SerialFFT
+from dsp_sandbox.fir import FIRFilter
+from dsp_sandbox.streams import ComplexStream
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from numpy.fft import fft as np_fft
+from scipy.signal import lfilter
+
+
+class CrossedBlock(Elaboratable):
+    '''Runs `core` in the "dsp" domain, between two crossings from and to "sync"'''
+    def __init__(self, core=None, shape=None):
+        self.core    = core
+        shape_in     = core.input.shape if core else shape
+        shape_out    = core.output.shape if core else shape
+        self.cdc_in  = StreamCDC(ComplexStream, shape_in, input_domain="sync", output_domain="dsp")
+        self.cdc_out = StreamCDC(ComplexStream, shape_out, input_domain="dsp", output_domain="sync")
+        self.input   = self.cdc_in.input
+        self.output  = self.cdc_out.output
+
+    def elaborate(self, platform):
+        m = Module()
+        m.domains.dsp = ClockDomain()
+        m.submodules.cdc_in  = self.cdc_in
+        m.submodules.cdc_out = self.cdc_out
+        if self.core is None:
+            m.d.comb += self.cdc_out.input.stream_eq(self.cdc_in.output)
+        else:
+            m.submodules.core = self.core
+            m.d.comb += [
+                self.core.input.stream_eq(self.cdc_in.output),
+                self.cdc_out.input.stream_eq(self.core.output),
+            ]
+        return m
+
+
+def multiclock_process(dut, input_sequence, cycles, sync_period, dsp_period, output_stall_cycles=0):
+    out = []
+    def input_sender():
+        source = iter(input_sequence)
+        payload = next(source, None)
+        for _ in range(cycles):
+            if payload is None:
+                yield dut.input.valid.eq(0)
+                return
+            yield dut.input.payload.eq(payload)
+            yield dut.input.valid.eq(1)
+            yield
+            if (yield dut.input.ready):
+                payload = next(source, None)
+
+    def output_receiver():
+        for t in range(cycles):
+            yield dut.output.ready.eq(t % (output_stall_cycles + 1) == 0)
+            yield
+            if (yield dut.output.valid) and (yield dut.output.ready):
+                out.append((yield from dut.output.payload.to_complex()))
+
+    sim = Simulator(dut)
+    sim.add_clock(sync_period, domain="sync")
+    sim.add_clock(dsp_period, domain="dsp")
+    sim.add_sync_process(input_sender, domain="sync")
+    sim.add_sync_process(output_receiver, domain="sync")
+    sim.run()
+    return out
+
+
+class TestStreamCDC(unittest.TestCase):
+
+    def test_crossing(self):
+        shape = Q(8, 0)
+        samples = [ complex(i, -i) for i in range(64) ]
+        for sync_period, dsp_period in [ (1e-6, 0.37e-6), (0.37e-6, 1e-6) ]:
+            for output_stall_cycles in [ 0, 2 ]:
+                # Cross to "dsp" and back, so that both directions are exercised
+                dut = CrossedBlock(shape=shape)
+                input_sequence = [ ComplexConst(shape, x) for x in samples ]
+                out = multiclock_process(dut, input_sequence, cycles=1000, sync_period=sync_period,
+                                         dsp_period=dsp_period, output_stall_cycles=output_stall_cycles)
+                self.assertListEqual(out, samples)
+
+    def test_fft_fast_domain(self):
+        N = 64
+        shape = Q(1, 12)
+        samples = [ (i/N) * (1 - 0.5j) for i in range(N) ]
+        dut = CrossedBlock(SerialFFT(N=N, shape=shape, domain="dsp"))
+        input_sequence = [ ComplexConst(shape, x) for x in samples ]
+        out = multiclock_process(dut, input_sequence, cycles=8*N, sync_period=1e-6, dsp_period=0.3e-6)
+        expected = np_fft(samples, n=N)
+        self.assertEqual(len(out), N)
+        for x,y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=0.02)
+
+    def test_fir_fast_domain(self):
+        taps = [ 0.1, -0.2, 0.5, 0.3 ]
+        shape_in, shape_out = Q(1, 11), Q(2, 14)
+        samples = [ ((i % 7) - 3) / 8 + 0.25j for i in range(40) ]
+        dut = CrossedBlock(FIRFilter(taps, shape_in, shape_out, shape_taps=Q(1, 15), domain="dsp"))
+        input_sequence = [ ComplexConst(shape_in, x) for x in samples ]
+        out = multiclock_process(dut, input_sequence, cycles=400, sync_period=1e-6, dsp_period=0.45e-6,
+                                 output_stall_cycles=1)
+        expected = lfilter(taps, 1, samples)
+        self.assertEqual(len(out), len(samples))
+        for x,y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=0.001)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from dsp_sandbox.channelizer import PFBChannelizer
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from stream_helper import stream_process
+
+import numpy as np
+
+def channelizer_model(samples, taps, M, hop):
+    out = []
+    for s in range(M - 1, len(samples), hop):
+        l = np.arange(max(0, s - len(taps) + 1), s + 1)
+        for k in range(M):
+            out.append(np.sum(samples[l] * np.array(taps)[s - l] * np.exp(-2j*np.pi*k*l/M)))
+    return out
+
+class TestPFBChannelizer(unittest.TestCase):
+
+    def channelizer_testbench(self, oversampling, input_idle_cycles):
+        M, T = 8, 4
+        shape = Q(1, 13)
+        taps = list(np.hanning(M*T + 2)[1:-1] / M)
+        samples = np.random.uniform(-0.5, 0.5, 6*M) + 1j * np.random.uniform(-0.5, 0.5, 6*M)
+        dut = PFBChannelizer(taps, M=M, shape=shape, oversampling=oversampling)
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), samples)
+        out = stream_process(dut, dut.input, dut.output, input_sequence, input_idle_cycles=input_idle_cycles,
+                             cycles=30*M)
+        expected = channelizer_model(samples, taps, M, M // oversampling)
+        self.assertEqual(len(out), len(expected))
+        for x, y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=0.005)
+
+    def test_critically_sampled(self):
+        self.channelizer_testbench(oversampling=1, input_idle_cycles=0)
+
+    def test_oversampled(self):
+        self.channelizer_testbench(oversampling=2, input_idle_cycles=1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,9 @@ from amaranth import signed
 from dsp_sandbox.cic import UpsamplingCICFilter, DownsamplingCICFilter
 from dsp_sandbox.types.fixed_point import Q
 from dsp_sandbox.types.complex import ComplexConst
+from dsp_sandbox.models.cic import CICFilterModel
+from dsp_sandbox.models.fixed_point import from_complex, to_complex
+from dsp_sandbox.testbench import StreamTestbench
 from itertools import zip_longest
 from stream_helper import stream_process
 
@@ -83,10 +86,6 @@ class TestCIC(unittest.TestCase):
         # Input samples
         samples = random_samples_gen(1000, width_in)
 
-        # Simulate DUT and gather output stream outputs
-        input_sequence = map(lambda x: ComplexConst(shape=Q(width_in, 0), value=x), samples)
-        out = stream_process(dut, dut.input, dut.output, input_sequence, cycles=10000)
-
         # Build expected output with our model
         expected = cic_upsample(samples, rate, M, stages)
         full_out = width_in + ceil(log2(((rate*M)**(stages)) / rate))
@@ -94,6 +93,11 @@ class TestCIC(unittest.TestCase):
             expected = [ x / (2 ** (full_out-width_out)) for x in expected ]
         expected = [ (floor(x.real) + 1j*floor(x.imag)) for x in expected ]
 
+        # Simulate DUT and gather output stream outputs
+        raw = StreamTestbench(dut, dut.input, dut.output).run(from_complex(samples, dut.input.shape),
+                                                              count=len(expected))
+        out = to_complex(raw, dut.output.shape)
+
         # Compare output and expected values
         self.assertTrue(np.array_equal(out, expected))
 
@@ -109,10 +113,6 @@ class TestCIC(unittest.TestCase):
         # Input samples
         samples = random_samples_gen(1000, width_in)
 
-        # Simulate DUT and gather output stream outputs
-        input_sequence = map(lambda x: ComplexConst(shape=Q(width_in, 0), value=x), samples)
-        out = stream_process(dut, dut.input, dut.output, input_sequence, cycles=6000)
-
         # Build expected output with our model
         expected = cic_downsample(samples, rate, M, stages)
         full_out = width_in + ceil(stages * log2(rate * M))
@@ -120,12 +120,21 @@ class TestCIC(unittest.TestCase):
             expected = [ x / (2 ** (full_out - width_out)) for x in expected ]
         expected = [ (floor(x.real) + 1j*floor(x.imag)) for x in expected ]
 
+        # Simulate DUT and gather output stream outputs
+        raw = StreamTestbench(dut, dut.input, dut.output).run(from_complex(samples, dut.input.shape),
+                                                              count=len(expected))
+        out = to_complex(raw, dut.output.shape)
+
         # Compare output and expected values
-        # TODO: check why error is not exactly 0, rounding issues?
+        # Error is not exactly 0 because intermediate stages are pruned
         error = np.array(out) - np.array(expected)
         max_err = np.max(np.concatenate([np.real(error), np.imag(error)]))
         self.assertTrue(max_err < 2)
-        #self.assertTrue(np.array_equal(out, expected))
+
+        # Pruning is modelled bit by bit
+        model = CICFilterModel(dut)
+        expected = to_complex(model(from_complex(samples, dut.input.shape)), dut.output.shape)
+        self.assertTrue(np.array_equal(out, expected))
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,88 @@
+import unittest
+from amaranth import Module, Signal
+from amaranth.sim import Simulator, Settle
+
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import Complex, ComplexConst, ComplexMultiplication, pipelined_multiply
+
+import numpy as np
+
+
+class TestComplexMultiplication(unittest.TestCase):
+
+    shape_x = Q(2, 5)
+    shape_y = Q(1, 6)
+
+    def check(self, pipelined, const=None):
+        rng = np.random.default_rng(0)
+        n = 200
+        x = rng.integers(-2**6, 2**6, size=(n, 2))
+        y = rng.integers(-2**6, 2**6, size=(n, 2))
+
+        m = Module()
+        a = Complex(shape=self.shape_x)
+        b = ComplexConst(self.shape_y, const) if const is not None else Complex(shape=self.shape_y)
+        products = []
+        for multiplication in ComplexMultiplication:
+            if pipelined:
+                product = pipelined_multiply(m, a, b, multiplication)
+            else:
+                product = a.multiply(b, multiplication)
+            result = Complex(shape=product.shape, name="result")
+            m.d.comb += result.eq(product)
+            products.append(result)
+        m.d.sync += Signal().eq(0)  # make sure a clock domain exists
+
+        latency = 3 if pipelined else 0
+        results = []
+        def process():
+            for i in range(n + latency):
+                if i < n:
+                    yield a.real.as_value().eq(int(x[i,0]))
+                    yield a.imag.as_value().eq(int(x[i,1]))
+                    if const is None:
+                        yield b.real.as_value().eq(int(y[i,0]))
+                        yield b.imag.as_value().eq(int(y[i,1]))
+                yield Settle()
+                if i >= latency:
+                    values = []
+                    for p in products:
+                        values.append(((yield p.real.as_value()), (yield p.imag.as_value())))
+                    results.append(values)
+                yield
+
+        sim = Simulator(m)
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        sim.run()
+        return x, y, results
+
+    def expected(self, x, y):
+        return (x[:,0]*y[:,0] - x[:,1]*y[:,1], x[:,0]*y[:,1] + x[:,1]*y[:,0])
+
+    def test_combinational(self):
+        x, y, results = self.check(pipelined=False)
+        real, imag = self.expected(x, y)
+        for i, multiplication in enumerate(ComplexMultiplication):
+            with self.subTest(multiplication=multiplication):
+                self.assertEqual([ r[i] for r in results ], list(zip(real, imag)))
+
+    def test_constant(self):
+        c = 0.375 - 0.890625j
+        x, _, results = self.check(pipelined=False, const=c)
+        y = np.array([[ round(c.real * 2**6), round(c.imag * 2**6) ]] * len(x))
+        real, imag = self.expected(x, y)
+        for i, multiplication in enumerate(ComplexMultiplication):
+            with self.subTest(multiplication=multiplication):
+                self.assertEqual([ r[i] for r in results ], list(zip(real, imag)))
+
+    def test_pipelined(self):
+        x, y, results = self.check(pipelined=True)
+        real, imag = self.expected(x, y)
+        for i, multiplication in enumerate(ComplexMultiplication):
+            with self.subTest(multiplication=multiplication):
+                self.assertEqual([ r[i] for r in results ], list(zip(real, imag)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from amaranth import Module, Signal
+
+from dsp_sandbox.cordic import CORDIC, CORDICMode
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from stream_helper import stream_process
+
+import numpy as np
+
+def to_signed(value, width):
+    return value - (1 << width) if value >> (width - 1) else value
+
+class TestCORDIC(unittest.TestCase):
+
+    def test_rotation(self):
+        shape = Q(1, 15)
+        dut = CORDIC(shape)
+        samples = (np.random.uniform(-1, 1, 200) + 1j * np.random.uniform(-1, 1, 200)) * 0.7
+
+        # Rotate every sample by a linearly increasing angle
+        increment = 5347
+        m = Module()
+        m.submodules.cordic = dut
+        angle = Signal(len(dut.shape_angle))
+        with m.If(dut.input.consume):
+            m.d.sync += angle.eq(angle + increment)
+        m.d.comb += dut.angle.as_value().eq(angle)
+
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), samples)
+        out = stream_process(m, dut.input, dut.output, input_sequence, output_stall_cycles=1, cycles=4*len(samples))
+
+        bits = len(dut.shape_angle)
+        angles = [ to_signed((k * increment) % 2**bits, bits) / 2**(bits - 1) for k in range(len(samples)) ]
+        expected = samples * np.exp(1j * np.pi * np.array(angles))
+        self.assertEqual(len(out), len(expected))
+        for x, y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=0.001)
+
+    def test_vectoring(self):
+        shape = Q(1, 15)
+        dut = CORDIC(shape, mode=CORDICMode.VECTORING, iterations=12)
+        samples = (np.random.uniform(-1, 1, 200) + 1j * np.random.uniform(-1, 1, 200)) * 0.9
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), samples)
+        out = stream_process(dut, dut.input, dut.output, input_sequence, input_idle_cycles=1, cycles=4*len(samples))
+
+        self.assertEqual(len(out), len(samples))
+        width = len(dut.shape_out)
+        for value, x in zip(out, samples):
+            magnitude = to_signed(value & (2**width - 1), width) / 2**dut.shape_out.fraction_bits
+            phase = to_signed(value >> width, len(dut.shape_angle)) / 2**dut.shape_angle.fraction_bits
+            self.assertAlmostEqual(magnitude, abs(x), delta=0.002)
+            # Compare phases modulo 2 (units of pi)
+            error = (phase - np.angle(x) / np.pi + 1) % 2 - 1
+            self.assertAlmostEqual(error, 0, delta=0.002)
+
+if __name__ == "__main__":
+    unittest.main()
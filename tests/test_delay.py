@@ -0,0 +1,30 @@
+import unittest
+from amaranth import unsigned
+
+from dsp_sandbox.delay import StreamDelay
+from stream_helper import stream_process
+
+class TestStreamDelay(unittest.TestCase):
+
+    def check_storage(self, storage, delay):
+        samples = list(range(100))
+        for input_idle_cycles, output_stall_cycles in [(0, 0), (1, 0), (0, 2), (2, 1)]:
+            dut = StreamDelay(unsigned(8), delay, storage=storage)
+            out = stream_process(dut, dut.input, dut.output, samples, cycles=500,
+                                 input_idle_cycles=input_idle_cycles, output_stall_cycles=output_stall_cycles)
+            self.assertListEqual(out, samples)
+
+    def test_distributed(self):
+        self.check_storage("distributed", 2)
+
+    def test_shift(self):
+        self.check_storage("shift", 7)
+
+    def test_circular(self):
+        self.check_storage("circular", 5)
+
+    def test_bram(self):
+        self.check_storage("bram", 5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from dsp_sandbox.fir import FIRFilter, ParallelFIRFilter
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.models.fixed_point import from_complex
+from dsp_sandbox.testbench import StreamTestbench
+
+import numpy as np
+
+def random_samples_gen(N, width):
+    samples = np.random.uniform(-1, 1, N) + 1j * np.random.uniform(-1, 1, N)
+    samples *= ((1 << (width-1)) - 1)
+    return np.round(samples)
+
+class TestParallelFIR(unittest.TestCase):
+
+    def parallel_fir_testbench(self, taps, parallelism, output_stall_cycles=0):
+        shape_in   = Q(8, 0)
+        shape_out  = Q(12, 2)
+        shape_taps = Q(1, 7)
+        samples = random_samples_gen(16*parallelism, len(shape_in))
+
+        raw = from_complex(samples, shape_in)
+
+        # Reference: sequential FIR filter with the same taps and shapes
+        ref = FIRFilter(taps, shape_in, shape_out, shape_taps=shape_taps)
+        expected = StreamTestbench(ref, ref.input, ref.output).run(raw)
+
+        dut = ParallelFIRFilter(taps, shape_in, shape_out, shape_taps=shape_taps, parallelism=parallelism)
+        out = StreamTestbench(dut, dut.input, dut.output).run(raw, output_ready=[1] + [0]*output_stall_cycles)
+
+        self.assertEqual(len(out), len(samples))
+        self.assertTrue(np.array_equal(out, expected))
+
+    def test_two_parallel(self):
+        taps = [ 0.1, -0.25, 0.5, 0.3, -0.05, 0.2, 0.125 ]
+        self.parallel_fir_testbench(taps, parallelism=2)
+
+    def test_two_parallel_symmetric(self):
+        taps = [ 0.1, -0.25, 0.5, 0.5, -0.25, 0.1 ]
+        self.parallel_fir_testbench(taps, parallelism=2, output_stall_cycles=1)
+
+    def test_four_parallel(self):
+        taps = [ 0.1, -0.25, 0.5, 0.3, -0.05, 0.2, 0.125, 0.02, -0.4 ]
+        self.parallel_fir_testbench(taps, parallelism=4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+from math import floor
+from amaranth import Module, Signal
+from amaranth.sim import Simulator, Settle, Tick
+from dsp_sandbox.types.fixed_point import Q, FixedPointValue, FixedPointRounding, FixedPointOverflow, pipelined_reshape
+
+
+def reference(x, shape_in, shape_out, rounding, overflow):
+    '''Python model of FixedPointValue.reshape on raw integer values'''
+    shift = shape_out.fraction_bits - shape_in.fraction_bits
+    if shape_out.integer_bits < shape_in.integer_bits and rounding == FixedPointRounding.TRUNCATION:
+        shift += shape_out.integer_bits - shape_in.integer_bits
+    value = x * 2**shift
+    if rounding == FixedPointRounding.ROUND_HALF_UP:
+        value = floor(value + 0.5)
+    elif rounding == FixedPointRounding.CONVERGENT:
+        value = round(value)  # Python rounds ties to even
+    else:
+        value = floor(value)
+    width = len(shape_out)
+    low, high = -2**(width-1), 2**(width-1) - 1
+    if overflow == FixedPointOverflow.SATURATE:
+        return min(max(value, low), high)
+    return (value - low) % 2**width + low
+
+
+def simulate(shape_in, outputs, inputs, pipelined=False):
+    '''Evaluate reshaped `outputs` for every raw input value'''
+    x = FixedPointValue(shape_in)
+    m = Module()
+    results = []
+    signals = []
+    for shape_out, rounding, overflow in outputs:
+        if pipelined:
+            value = pipelined_reshape(m, x, shape_out, rounding, overflow)
+        else:
+            value = x.reshape(shape_out, rounding=rounding, overflow=overflow)
+        signal = Signal(shape_out.as_shape())
+        m.d.comb += signal.eq(value.as_value())
+        signals.append(signal)
+    m.d.sync += Signal().eq(0)  # make sure a clock domain exists
+
+    def process():
+        for raw in inputs:
+            yield x.as_value().eq(raw)
+            if pipelined:
+                yield Tick()
+            yield Settle()
+            values = []
+            for signal in signals:
+                values.append((yield signal))
+            results.append(values)
+
+    sim = Simulator(m)
+    sim.add_clock(1e-6)
+    sim.add_process(process)
+    sim.run()
+    return results
+
+
+class TestReshape(unittest.TestCase):
+
+    shape_in = Q(3, 4)
+    modes = [ None, FixedPointRounding.TRUNCATION, FixedPointRounding.ROUND_HALF_UP, FixedPointRounding.CONVERGENT ]
+    shapes_out = [ Q(3, 1), Q(2, 2), Q(4, 2), Q(2, 6) ]
+
+    def check(self, pipelined):
+        inputs = range(-2**6, 2**6)
+        outputs = [ (shape, rounding, overflow) for shape in self.shapes_out for rounding in self.modes
+                    for overflow in (FixedPointOverflow.WRAP, FixedPointOverflow.SATURATE) ]
+        results = simulate(self.shape_in, outputs, inputs, pipelined)
+        for i, (shape, rounding, overflow) in enumerate(outputs):
+            with self.subTest(shape=shape, rounding=rounding, overflow=overflow):
+                expected = [ reference(raw, self.shape_in, shape, rounding, overflow) for raw in inputs ]
+                self.assertEqual([ values[i] for values in results ], expected)
+
+    def test_modes(self):
+        self.check(pipelined=False)
+
+    def test_pipelined(self):
+        self.check(pipelined=True)
+
+    def test_saturate_after_rounding(self):
+        # 3.9375, 1.875, 1.8125 and -4 into Q(2, 2), which holds values in [-2, 1.75]
+        inputs = [ 63, 30, 29, -64 ]
+        outputs = [ (Q(2, 2), FixedPointRounding.ROUND_HALF_UP, FixedPointOverflow.SATURATE),
+                    (Q(2, 2), FixedPointRounding.TRUNCATION, FixedPointOverflow.SATURATE) ]
+        results = simulate(self.shape_in, outputs, inputs)
+        # Rounding keeps the binary point, so out of range values are clamped
+        self.assertEqual([ values[0] for values in results ], [ 7, 7, 7, -8 ])
+        # Truncation scales the value down by the removed integer bit
+        self.assertEqual([ values[1] for values in results ], [ 7, 3, 3, -8 ])
+
+
+if __name__ == '__main__':
+    unittest.main()
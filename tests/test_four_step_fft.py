@@ -0,0 +1,74 @@
+import unittest
+
+from dsp_sandbox.four_step_fft import FourStepFFT, FourStepTwiddleStage
+from dsp_sandbox.serial_fft import TwiddleBackend
+from dsp_sandbox.framing import CornerTurn
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from numpy.fft import fft as np_fft
+from stream_helper import stream_process
+
+import numpy as np
+
+class TestFourStepFFT(unittest.TestCase):
+
+    def check_corner_turn(self, rows, cols, frames, **kwargs):
+        shape = Q(8, 0)
+        dut = CornerTurn(shape, rows, cols)
+        samples = [ x % 128 for x in range(frames * rows * cols) ]
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), samples)
+        out = stream_process(dut, dut.input, dut.output, input_sequence, cycles=4*len(samples), **kwargs)
+        expected = [ (f*rows*cols + r*cols + c) % 128 for f in range(frames) for c in range(cols) for r in range(rows) ]
+        self.assertListEqual(out, expected)
+
+    def test_corner_turn(self):
+        self.check_corner_turn(4, 6, 3, output_stall_cycles=1)
+
+    def test_corner_turn_in_place(self):
+        self.check_corner_turn(4, 8, 5, output_stall_cycles=1)
+        self.check_corner_turn(8, 2, 5, input_idle_cycles=1)
+        self.check_corner_turn(16, 16, 3)
+
+    def test_twiddles(self):
+        N1, N2 = 32, 64
+        shape = Q(2, 16)
+        for backend, delta in ((TwiddleBackend.MULTIPLIER, 2**-13), (TwiddleBackend.CORDIC, 2**-14)):
+            with self.subTest(backend=backend):
+                dut = FourStepTwiddleStage(N1, N2, shape, backend=backend)
+                input_sequence = [ ComplexConst(shape=shape, value=0.9) ] * (N1 * N2)
+                out = stream_process(dut, dut.input, dut.output, input_sequence, cycles=N1*N2 + 50)
+                expected = [ 0.9 * np.exp(-2j*np.pi*n2*k1/(N1*N2)) for n2 in range(N2) for k1 in range(N1) ]
+                self.assertEqual(len(out), len(expected))
+                self.assertLess(np.abs(np.array(out) - expected).max(), delta)
+
+    def check_four_step_fft(self, N1, N2, natural_order, shape=Q(1, 12), delta=0.03, **kwargs):
+        N = N1 * N2
+        dut = FourStepFFT(N1=N1, N2=N2, shape=shape, natural_order=natural_order, **kwargs)
+        frames = [ (np.random.uniform(-1, 1, N) + 1j * np.random.uniform(-1, 1, N)) / 8 for _ in range(2) ]
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), np.concatenate(frames))
+        out = stream_process(dut, dut.input, dut.output, input_sequence, input_idle_cycles=1, cycles=12*N)
+
+        expected = []
+        for frame in frames:
+            spectrum = np_fft(frame)
+            if not natural_order:
+                spectrum = spectrum.reshape(N2, N1).T.flatten()
+            expected += list(spectrum)
+        self.assertEqual(len(out), len(expected))
+        for x, y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=delta)
+
+    def test_four_step_fft(self):
+        self.check_four_step_fft(8, 16, natural_order=True)
+
+    def test_four_step_fft_transposed(self):
+        self.check_four_step_fft(16, 4, natural_order=False)
+
+    def test_four_step_fft_precision(self):
+        self.check_four_step_fft(32, 16, natural_order=True, shape=Q(1, 17), delta=0.001, twiddle_shape=Q(2, 17))
+
+    def test_four_step_fft_cordic(self):
+        self.check_four_step_fft(8, 8, natural_order=True, twiddle_backend=TwiddleBackend.CORDIC)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from amaranth import Cat
+from dsp_sandbox.gearbox import StreamGearbox
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from stream_helper import stream_process
+
+
+class TestStreamGearbox(unittest.TestCase):
+
+    shape = Q(8, 0)
+
+    def beats(self, samples, parallelism):
+        if parallelism == 1:
+            return [ ComplexConst(shape=self.shape, value=x) for x in samples ]
+        return [ Cat(ComplexConst(shape=self.shape, value=x) for x in samples[i:i+parallelism])
+                 for i in range(0, len(samples), parallelism) ]
+
+    def gearbox_testbench(self, parallelism_in, parallelism_out, input_idle_cycles=0, output_stall_cycles=0):
+        samples = [ complex(i, -i) for i in range(48) ]
+        dut = StreamGearbox(self.shape, parallelism_in, parallelism_out)
+        input_sequence = self.beats(samples, parallelism_in)
+        out = stream_process(dut, dut.input, dut.output, input_sequence, input_idle_cycles=input_idle_cycles,
+                             output_stall_cycles=output_stall_cycles, cycles=8*len(samples))
+        self.assertListEqual(out, samples)
+
+    def test_conversions(self):
+        for parallelism_in, parallelism_out in [ (1, 4), (4, 1), (2, 4), (4, 2), (1, 3), (3, 1) ]:
+            for input_idle_cycles, output_stall_cycles in [ (0, 0), (1, 0), (0, 1), (2, 3) ]:
+                with self.subTest(parallelism_in=parallelism_in, parallelism_out=parallelism_out,
+                                  input_idle_cycles=input_idle_cycles, output_stall_cycles=output_stall_cycles):
+                    self.gearbox_testbench(parallelism_in, parallelism_out, input_idle_cycles, output_stall_cycles)
+
+    def test_full_rate(self):
+        # Narrow side at one beat per cycle, with no bubbles introduced by the conversion
+        samples = [ complex(i, 0) for i in range(64) ]
+        for parallelism_in, parallelism_out in [ (1, 4), (4, 1) ]:
+            dut = StreamGearbox(self.shape, parallelism_in, parallelism_out)
+            input_sequence = self.beats(samples, parallelism_in)
+            out = stream_process(dut, dut.input, dut.output, input_sequence, cycles=len(samples) + 4)
+            self.assertListEqual(out, samples)
+
+
+if __name__ == '__main__':
+    unittest.main()
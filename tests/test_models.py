@@ -0,0 +1,104 @@
+import unittest
+from amaranth import Module, Signal
+
+from dsp_sandbox.serial_fft import SerialFFT, FFTScaling, FFTDirection, TwiddleBackend
+from dsp_sandbox.cordic import CORDIC, CORDICMode
+from dsp_sandbox.cic import UpsamplingCICFilter, DownsamplingCICFilter
+from dsp_sandbox.fir import FIRFilter
+from dsp_sandbox.window import Window
+from dsp_sandbox.types.fixed_point import Q, FixedPointRounding, FixedPointOverflow
+from dsp_sandbox.models.fixed_point import from_complex, wrap
+from dsp_sandbox.models.serial_fft import SerialFFTModel
+from dsp_sandbox.models.cordic import CORDICModel
+from dsp_sandbox.models.cic import CICFilterModel
+from dsp_sandbox.models.fir import FIRFilterModel
+from dsp_sandbox.models.window import WindowModel
+from dsp_sandbox.testbench import StreamTestbench
+
+import numpy as np
+
+
+class TestModels(unittest.TestCase):
+
+    def check(self, dut, model, n, amplitude=1, top=None, **kwargs):
+        '''Simulate `dut` (or `top`, around it) with random samples and compare with its model, bit by bit'''
+        rng = np.random.default_rng(0)
+        samples = amplitude * (rng.uniform(-1, 1, n) + 1j * rng.uniform(-1, 1, n))
+        raw = from_complex(samples, dut.input.shape)
+        expected = model(raw)
+        out = StreamTestbench(top or dut, dut.input, dut.output).run(raw, count=len(expected), **kwargs)
+        self.assertTrue(np.array_equal(out, expected))
+
+    def test_serial_fft(self):
+        configs = [
+            dict(N=64),
+            dict(N=32, strategy=FFTScaling.SCALED, rounding=FixedPointRounding.CONVERGENT),
+            dict(N=16, strategy=FFTScaling.SCALED, rounding=FixedPointRounding.ROUND_HALF_UP,
+                 overflow=FixedPointOverflow.SATURATE),
+            dict(N=16, direction=FFTDirection.INVERSE, natural_order=False),
+            dict(N=8, channels=2),
+            dict(N=32, twiddle_backend=TwiddleBackend.CORDIC),
+            dict(N=16, strategy=FFTScaling.SCALED, twiddle_backend=TwiddleBackend.CORDIC,
+                 overflow=FixedPointOverflow.SATURATE),
+            dict(N=16, direction=FFTDirection.RUNTIME, twiddle_backend=TwiddleBackend.CORDIC, channels=2),
+        ]
+        for config in configs:
+            with self.subTest(**config):
+                dut = SerialFFT(shape=Q(1, 10), **config)
+                self.check(dut, SerialFFTModel(dut), 2 * config["N"] * config.get("channels", 1),
+                           output_ready=(1, 0))
+
+    def test_cordic(self):
+        for shape_out, overflow in ((None, None), (Q(1, 12), None), (Q(1, 12), FixedPointOverflow.SATURATE)):
+            with self.subTest(mode=CORDICMode.ROTATION, shape_out=shape_out, overflow=overflow):
+                # Rotate every sample by a linearly increasing angle
+                dut = CORDIC(Q(1, 12), shape_out=shape_out, overflow=overflow)
+                increment = 1213
+                m = Module()
+                m.submodules.cordic = dut
+                angle = Signal(len(dut.shape_angle))
+                with m.If(dut.input.consume):
+                    m.d.sync += angle.eq(angle + increment)
+                m.d.comb += dut.angle.as_value().eq(angle)
+                angles = wrap(increment * np.arange(150), dut.shape_angle)
+                self.check(dut, lambda x: CORDICModel(dut)(x, angles), 150, top=m, output_ready=(1, 0))
+        for gain_compensation in (True, False):
+            with self.subTest(mode=CORDICMode.VECTORING, gain_compensation=gain_compensation):
+                dut = CORDIC(Q(1, 12), mode=CORDICMode.VECTORING, iterations=9,
+                             gain_compensation=gain_compensation)
+                self.check(dut, CORDICModel(dut), 150, input_valid=(1, 0))
+
+    def test_cic(self):
+        configs = [
+            dict(rounding=FixedPointRounding.TRUNCATION),
+            dict(rounding=FixedPointRounding.CONVERGENT),
+            dict(rounding=FixedPointRounding.ROUND_HALF_UP, overflow=FixedPointOverflow.SATURATE),
+        ]
+        for config in configs:
+            with self.subTest(**config):
+                dut = DownsamplingCICFilter(M=1, stages=3, rate=12, width_in=12, width_out=14, **config)
+                self.check(dut, CICFilterModel(dut), 600, amplitude=2**11, input_valid=(1, 0, 1))
+                dut = UpsamplingCICFilter(M=4, stages=3, rate=5, width_in=12, width_out=22, **config)
+                self.check(dut, CICFilterModel(dut), 100, amplitude=2**11)
+
+    def test_fir(self):
+        taps = [0.1, -0.3, 0.7, 0.25, 0.7, -0.3, 0.1]
+        configs = [
+            dict(),
+            dict(rounding=FixedPointRounding.ROUND_HALF_UP, overflow=FixedPointOverflow.SATURATE),
+            dict(rounding=FixedPointRounding.CONVERGENT, pipelined_rounding=True),
+        ]
+        for config in configs:
+            with self.subTest(**config):
+                dut = FIRFilter(taps, Q(1, 11), Q(1, 9), shape_taps=Q(1, 12), **config)
+                self.check(dut, FIRFilterModel(dut), 200, output_ready=(1, 0))
+
+    def test_window(self):
+        for N in (16, 17):
+            with self.subTest(N=N):
+                dut = Window(Q(2, 10), N, coeff_shape=Q(1, 9))
+                self.check(dut, WindowModel(dut), 3*N, amplitude=2, output_ready=(1, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
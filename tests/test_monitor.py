@@ -0,0 +1,79 @@
+import unittest
+
+from amaranth.sim import Simulator
+from dsp_sandbox.cic import DownsamplingCICFilter
+from dsp_sandbox.monitor import StreamMonitor
+from dsp_sandbox.streams import SampleStream
+
+
+class TestStreamMonitor(unittest.TestCase):
+
+    def test_cic_links(self):
+        n_samples, rate, cycles = 64, 4, 300
+        dut = DownsamplingCICFilter(M=1, stages=3, rate=rate, width_in=8, monitor=True)
+        monitors = dut.pipeline.monitors
+        self.assertEqual(len(monitors), len(dut.pipeline.stages) + 1)
+
+        counters = []
+        def process():
+            sent = 0
+            for t in range(cycles):
+                yield dut.input.valid.eq(sent < n_samples)
+                yield dut.output.ready.eq(t % 8 == 0)  # slower than the decimated rate
+                yield
+                if (yield dut.input.ready) and sent < n_samples:
+                    sent += 1
+            yield dut.pipeline.snapshot.eq(1)
+            yield
+            yield dut.pipeline.snapshot.eq(0)
+            yield
+            for monitor in monitors:
+                readout = {}
+                for name, signal in monitor.readout().items():
+                    readout[name] = yield signal
+                counters.append(readout)
+
+        sim = Simulator(dut)
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        sim.run()
+
+        for c in counters:
+            self.assertEqual(c["cycles"], counters[0]["cycles"])
+            self.assertGreaterEqual(c["cycles"], cycles)
+            self.assertEqual(c["valid"], c["transfers"] + c["backpressure"])
+            self.assertLessEqual(c["transfers"] + c["backpressure"] + c["starvation"], c["cycles"])
+        self.assertEqual(counters[0]["transfers"], n_samples)
+        self.assertEqual(counters[-1]["transfers"], n_samples // rate)
+        # Output stalls propagate back to the filter input
+        self.assertGreater(counters[0]["backpressure"], 0)
+        self.assertGreater(counters[-1]["backpressure"], 0)
+        # Once all samples are in, the filter input starves
+        self.assertGreater(counters[0]["starvation"], 0)
+
+    def test_saturation(self):
+        stream = SampleStream(8)
+        dut = StreamMonitor(stream, width=4)
+
+        readout = []
+        def process():
+            yield stream.valid.eq(1)
+            yield stream.ready.eq(1)
+            for _ in range(20):
+                yield
+            yield dut.snapshot.eq(1)
+            yield
+            yield dut.snapshot.eq(0)
+            yield
+            readout.append((yield dut.transfers))
+            readout.append((yield dut.starvation))
+
+        sim = Simulator(dut)
+        sim.add_clock(1e-6)
+        sim.add_sync_process(process)
+        sim.run()
+        self.assertEqual(readout, [15, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
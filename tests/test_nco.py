@@ -0,0 +1,65 @@
+import unittest
+from amaranth import Module
+
+from dsp_sandbox.nco import NCO
+from dsp_sandbox.ddc import DigitalDownConverter
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from stream_helper import stream_process
+
+import numpy as np
+
+class TestNCO(unittest.TestCase):
+
+    def test_nco(self):
+        P, T = 24, 8
+        frequency = 123457
+        dut = NCO(shape=Q(1, 15), phase_bits=P, table_bits=T)
+        m = Module()
+        m.submodules.nco = dut
+        m.d.comb += dut.frequency.eq(frequency)
+        out = stream_process(m, None, dut.output, [], output_stall_cycles=1, cycles=600)
+
+        # Table samples are taken at the center of every phase interval
+        index = (np.arange(len(out)) * frequency % 2**P) >> (P - T)
+        expected = np.exp(2j * np.pi * (index + 0.5) / 2**T)
+        self.assertGreater(len(out), 250)
+        for x, y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=2**-14)
+
+    def test_dithering(self):
+        P, T = 24, 8
+        frequency = 123457
+        dut = NCO(shape=Q(1, 15), phase_bits=P, table_bits=T, dither_bits=4)
+        m = Module()
+        m.submodules.nco = dut
+        m.d.comb += dut.frequency.eq(frequency)
+        out = stream_process(m, None, dut.output, [], cycles=300)
+
+        # Dithering moves the phase by less than one table step
+        expected = np.exp(2j * np.pi * np.arange(len(out)) * frequency / 2**P)
+        for x, y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=2 * 2*np.pi / 2**T)
+
+    def test_ddc(self):
+        P = 32
+        rate, stages = 4, 2
+        taps = [0.25, 0.5, 0.25]
+        dut = DigitalDownConverter(taps, rate=rate, cic_stages=stages, phase_bits=P)
+        f0 = 0.0625
+        m = Module()
+        m.submodules.ddc = dut
+        m.d.comb += dut.frequency.eq(int(f0 * 2**P))
+
+        # A tone at the NCO frequency is converted to DC
+        n_samples = 400
+        samples = 0.5 * np.exp(2j * np.pi * f0 * np.arange(n_samples))
+        input_sequence = map(lambda x: ComplexConst(shape=Q(1, 15), value=x), samples)
+        out = stream_process(m, dut.input, dut.output, input_sequence, output_stall_cycles=2, cycles=4*n_samples)
+
+        self.assertEqual(len(out), n_samples // rate)
+        for x in out[stages + len(taps):]:
+            self.assertAlmostEqual(x, 0.5, delta=0.01)
+
+if __name__ == "__main__":
+    unittest.main()
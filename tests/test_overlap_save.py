@@ -0,0 +1,40 @@
+import unittest
+
+from dsp_sandbox.overlap_save import OverlapSaveFilter
+from dsp_sandbox.framing import FrameOverlapBuffer
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from stream_helper import stream_process
+
+import numpy as np
+
+class TestOverlapSave(unittest.TestCase):
+
+    def test_frame_overlap_buffer(self):
+        N, hop = 8, 3
+        shape = Q(8, 0)
+        dut = FrameOverlapBuffer(shape, N, hop)
+        samples = list(range(1, 31))
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), samples)
+        out = stream_process(dut, dut.input, dut.output, input_sequence, output_stall_cycles=1, cycles=300)
+        padded = [0] * (N - hop) + samples
+        expected = [ x for k in range(len(samples) // hop) for x in padded[k*hop:k*hop+N] ]
+        self.assertListEqual(out[:len(expected)], expected)
+
+    def test_overlap_save(self):
+        N = 32
+        shape_in  = Q(1, 11)
+        shape_out = Q(2, 11)
+        taps = np.hanning(11) / 4
+        dut = OverlapSaveFilter(taps, shape_in, shape_out, N=N)
+        samples = np.random.uniform(-0.5, 0.5, 88) + 1j * np.random.uniform(-0.5, 0.5, 88)
+        input_sequence = map(lambda x: ComplexConst(shape=shape_in, value=x), samples)
+        out = stream_process(dut, dut.input, dut.output, input_sequence, input_idle_cycles=1, cycles=30*N)
+        hop = N - len(taps) + 1
+        expected = np.convolve(samples, taps)[:hop * (len(samples) // hop)]
+        self.assertEqual(len(out), len(expected))
+        for x, y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=0.01)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from amaranth.sim import Simulator
+from dsp_sandbox.pipeline import StreamPipeline
+from dsp_sandbox.skid_buffer import StreamSkidBuffer
+from dsp_sandbox.serial_fft import SerialFFT
+from dsp_sandbox.cic import CombStage, IntegratorStage, UpsamplingCICFilter, DownsamplingCICFilter
+from dsp_sandbox.streams import ComplexStream
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from numpy.fft import fft as np_fft
+from stream_helper import stream_process
+
+
+def first_output_cycle(dut, cycles=500):
+    '''Cycle of the first output sample, with an input sample available from cycle 0'''
+    result = []
+    def process():
+        yield dut.input.valid.eq(1)
+        yield dut.output.ready.eq(1)
+        for t in range(cycles):
+            yield
+            if (yield dut.output.valid):
+                result.append(t)
+                return
+    sim = Simulator(dut)
+    sim.add_clock(1e-6)
+    sim.add_sync_process(process)
+    sim.run()
+    return result[0] if result else None
+
+
+class TestStreamPipeline(unittest.TestCase):
+
+    def test_skid_buffer_insertion(self):
+        stages = [ IntegratorStage(8, 8) for _ in range(7) ]
+        self.assertEqual(StreamPipeline(stages).ready_depth(), 7)
+
+        pipeline = StreamPipeline(stages, max_ready_depth=3)
+        buffers = [ s for s in pipeline.stages if isinstance(s, StreamSkidBuffer) ]
+        self.assertEqual(len(buffers), 2)
+        self.assertEqual(pipeline.ready_depth(), 3)
+        self.assertEqual(pipeline.latency(), 7 + 2)
+
+        # Existing skid buffers already break the ready path
+        stages = [ CombStage(1, 8, 8), StreamSkidBuffer(ComplexStream, Q(8, 0)), CombStage(1, 8, 8) ]
+        pipeline = StreamPipeline(stages, max_ready_depth=1)
+        self.assertEqual(len(pipeline.stages), 3)
+        self.assertEqual(pipeline.latency(), 2)
+
+    def test_fft_ready_depth(self):
+        N = 64
+        shape = Q(1, 12)
+        samples = [ (i/N) * (1 - 0.5j) for i in range(N) ]
+        dut = SerialFFT(N=N, shape=shape, max_ready_depth=2)
+        self.assertEqual(dut.pipeline.ready_depth(), 2)
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), samples)
+        out = stream_process(dut, dut.input, dut.output, input_sequence, output_stall_cycles=2, cycles=8*N)
+        expected = np_fft(samples, n=N)
+        self.assertEqual(len(out), N)
+        for x,y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=0.02)
+
+    def test_latency(self):
+        for max_ready_depth in [None, 1, 3]:
+            for N in [4, 16, 64]:
+                dut = SerialFFT(N=N, natural_order=False, max_ready_depth=max_ready_depth)
+                self.assertEqual(first_output_cycle(dut), dut.latency())
+            for cls in [UpsamplingCICFilter, DownsamplingCICFilter]:
+                dut = cls(M=1, stages=3, rate=4, width_in=8, max_ready_depth=max_ready_depth)
+                self.assertEqual(first_output_cycle(dut), dut.latency())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from amaranth import Elaboratable, Module, Signal
+from dsp_sandbox.replication import ReplicatedStream
+from dsp_sandbox.serial_fft import SerialFFT
+from dsp_sandbox.streams import ComplexStream
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from numpy.fft import fft as np_fft
+from stream_helper import stream_process
+
+
+class HalfRate(Elaboratable):
+    '''Pass-through block accepting one sample every other cycle'''
+    def __init__(self, shape):
+        self.input  = ComplexStream(shape)
+        self.output = ComplexStream(shape)
+
+    def elaborate(self, platform):
+        m = Module()
+        busy = Signal()
+        m.d.comb += self.input.ready.eq(self.output.produce & ~busy)
+        m.d.sync += busy.eq(self.input.consume)
+        with m.If(self.output.produce):
+            m.d.sync += self.output.valid.eq(self.input.consume)
+            m.d.sync += self.output.payload.eq(self.input.payload)
+        return m
+
+
+class TestReplicatedStream(unittest.TestCase):
+
+    def test_fft_frames(self):
+        N, frames = 32, 4
+        shape = Q(1, 12)
+        samples = [ ((i * 7) % 13 - 6) / 16 + 1j * ((i % 5) - 2) / 8 for i in range(N * frames) ]
+        dut = ReplicatedStream(lambda: SerialFFT(N=N, shape=shape), 2, frame_length=N)
+        input_sequence = [ ComplexConst(shape, x) for x in samples ]
+        out = stream_process(dut, dut.input, dut.output, input_sequence, output_stall_cycles=1,
+                             cycles=12*N*frames)
+        expected = [ y for f in range(frames) for y in np_fft(samples[f*N:(f+1)*N]) ]
+        self.assertEqual(len(out), len(expected))
+        for x,y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=0.02)
+
+    def test_throughput_scaling(self):
+        shape = Q(8, 0)
+        samples = [ complex(i, -i) for i in range(60) ]
+        for K in [1, 2, 3]:
+            dut = ReplicatedStream(lambda: HalfRate(shape), K, frame_length=1)
+            input_sequence = [ ComplexConst(shape, x) for x in samples ]
+            out = stream_process(dut, dut.input, dut.output, input_sequence, cycles=len(samples) + 8)
+            # A single instance only gets through half of the samples
+            expected = samples if K > 1 else samples[:len(out)]
+            self.assertListEqual(out, expected)
+            if K == 1:
+                self.assertLess(len(out), len(samples) * 0.6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+from amaranth import Module
+
+from dsp_sandbox.resampler import FarrowResampler, FARROW_CUBIC_LAGRANGE
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from stream_helper import stream_process
+
+import numpy as np
+from math import ceil
+
+def farrow_model(samples, step, n_outputs):
+    padded = np.concatenate([[0], samples])
+    C = np.array(FARROW_CUBIC_LAGRANGE)
+    out = []
+    for k in range(n_outputs):
+        t = k * step
+        n, mu = int(t), t - int(t)
+        c = C @ padded[n:n+4]
+        out.append(((c[3] * mu + c[2]) * mu + c[1]) * mu + c[0])
+    return out
+
+class TestFarrowResampler(unittest.TestCase):
+
+    def check_resampler(self, ratio, **kwargs):
+        shape = Q(1, 15)
+        dut = FarrowResampler(shape)
+        step = round(ratio * 2**dut.step.shape.fraction_bits)
+        m = Module()
+        m.submodules.resampler = dut
+        m.d.comb += dut.step.as_value().eq(step)
+
+        n_samples = 200
+        t = np.arange(n_samples)
+        samples = 0.4 * np.exp(2j * np.pi * 0.03 * t) + 0.3 * np.exp(-2j * np.pi * 0.11 * t)
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), samples)
+        out = stream_process(m, dut.input, dut.output, input_sequence, cycles=4*n_samples, **kwargs)
+
+        step = step / 2**dut.step.shape.fraction_bits
+        n_outputs = ceil((n_samples - 2) / step)
+        self.assertEqual(len(out), n_outputs)
+        for x, y in zip(out, farrow_model(samples, step, n_outputs)):
+            self.assertAlmostEqual(x, y, delta=0.001)
+
+    def test_decimation(self):
+        self.check_resampler(1.37, output_stall_cycles=1)
+
+    def test_interpolation(self):
+        self.check_resampler(0.61, input_idle_cycles=1)
+
+    def test_maximum_step(self):
+        # mu + step reaches 2**integer_bits, possibly on a cycle with no input available
+        self.check_resampler(15.93, input_idle_cycles=2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,21 @@
 import unittest
 
-from dsp_sandbox.serial_fft import SerialFFT, SDFRadix2Stage
+from amaranth import Module, Signal
+from dsp_sandbox.serial_fft import SerialFFT, SDFRadix2Stage, FFTScaling, FFTDirection, TwiddleBackend
 from dsp_sandbox.types.fixed_point import Q
 from dsp_sandbox.types.complex import ComplexConst
-from numpy.fft import fft as np_fft
+from dsp_sandbox.models.fixed_point import from_complex, to_complex
+from dsp_sandbox.testbench import StreamTestbench
+from numpy.fft import fft as np_fft, ifft as np_ifft
 from itertools import zip_longest
 from stream_helper import stream_process
 
+def fft_process(testbench, samples, input_idle_cycles=0, output_stall_cycles=0):
+    # Transform complex samples, stopping as soon as all outputs are received
+    out = testbench.run(from_complex(samples, testbench.input.shape), input_valid=[1] + [0]*input_idle_cycles,
+                        output_ready=[1] + [0]*output_stall_cycles)
+    return to_complex(out, testbench.output.shape).tolist()
+
 class TestSerialFFT(unittest.TestCase):
 
     def test_stage(self):
@@ -18,21 +27,89 @@ class TestSerialFFT(unittest.TestCase):
         out = stream_process(dut, dut.input, dut.output, input_sequence, cycles=30)
         self.assertListEqual(out, [2, 4, -2, -2])
 
-    def fft_testbench(self, input_idle_cycles, output_stall_cycles, cycles):
+    def test_fft_streams(self):
         N = 128
         shape=Q(1, 10)
         samples = [ i/N for i in range(N) ]
         dut = SerialFFT(N=N, shape=shape)
-        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), samples)
-        out = stream_process(dut, dut.input, dut.output, input_sequence, input_idle_cycles=input_idle_cycles, output_stall_cycles=output_stall_cycles, cycles=cycles)
+        testbench = StreamTestbench(dut, dut.input, dut.output)
         expected = np_fft(samples, n=N)
-        for x,y in zip_longest(out, expected):
-            self.assertAlmostEqual(x, y, delta=0.02)
-
-    def test_fft_streams(self):
         for input_idle_cycles in [0, 1, 2, 3]:
             for output_stall_cycles in [0, 1, 2, 3]:
-                self.fft_testbench(input_idle_cycles, output_stall_cycles, cycles=20*128)
+                with self.subTest(input_idle_cycles=input_idle_cycles, output_stall_cycles=output_stall_cycles):
+                    out = fft_process(testbench, samples, input_idle_cycles, output_stall_cycles)
+                    for x,y in zip_longest(out, expected):
+                        self.assertAlmostEqual(x, y, delta=0.02)
+
+    def test_consecutive_frames(self):
+        # Output stalls must not lose samples held in the feedback memories between frames
+        N, frames = 32, 4
+        shape = Q(1, 12)
+        samples = [ ((i * 5) % 11 - 5) / 16 + 1j * ((i % 3) - 1) / 4 for i in range(N * frames) ]
+        dut = SerialFFT(N=N, shape=shape)
+        testbench = StreamTestbench(dut, dut.input, dut.output)
+        for input_idle_cycles, output_stall_cycles in [(1, 3), (3, 1), (3, 7)]:
+            out = fft_process(testbench, samples, input_idle_cycles, output_stall_cycles)
+            expected = [ y for f in range(frames) for y in np_fft(samples[f*N:(f+1)*N]) ]
+            self.assertEqual(len(out), len(expected))
+            for x,y in zip(out, expected):
+                self.assertAlmostEqual(x, y, delta=0.02)
+
+    def test_inverse_fft(self):
+        N = 64
+        shape = Q(1, 12)
+        samples = [ (i/N) * (1 - 1j) for i in range(N) ]
+        dut = SerialFFT(N=N, shape=shape, strategy=FFTScaling.SCALED, direction=FFTDirection.INVERSE)
+        out = fft_process(StreamTestbench(dut, dut.input, dut.output), samples, output_stall_cycles=1)
+        expected = np_ifft(samples, n=N)
+        self.assertEqual(len(out), N)
+        for x,y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=0.005)
+
+    def test_cordic_twiddles(self):
+        N = 64
+        shape = Q(1, 12)
+        samples = [ (i/N) * (1 + 0.5j) for i in range(N) ]
+        dut = SerialFFT(N=N, shape=shape, twiddle_backend=TwiddleBackend.CORDIC)
+        out = fft_process(StreamTestbench(dut, dut.input, dut.output), samples, input_idle_cycles=1)
+        expected = np_fft(samples, n=N)
+        self.assertEqual(len(out), N)
+        for x,y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=0.02)
+
+    def test_interleaved_channels(self):
+        N, C = 32, 4
+        shape = Q(1, 10)
+        channels = [ [ ((i + 3*c) % N / N) * (1 - 0.25j*c) for i in range(N) ] for c in range(C) ]
+        samples = [ channels[c][i] for i in range(N) for c in range(C) ] * 2
+        dut = SerialFFT(N=N, shape=shape, channels=C)
+        out = fft_process(StreamTestbench(dut, dut.input, dut.output), samples, output_stall_cycles=1)
+        spectra = [ np_fft(x, n=N) for x in channels ]
+        expected = [ spectra[c][k] for k in range(N) for c in range(C) ] * 2
+        self.assertEqual(len(out), len(expected))
+        for x,y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=0.02)
+
+    def test_runtime_direction(self):
+        N = 32
+        shape = Q(1, 10)
+        frames = [ [ (i/N) * (1 + 0.5j) for i in range(N) ], [ ((N-i)/N) * 1j for i in range(N) ] ] * 2
+        dut = SerialFFT(N=N, shape=shape, direction=FFTDirection.RUNTIME)
+
+        # Alternate between forward and inverse transforms on every frame
+        m = Module()
+        m.submodules.fft = dut
+        count = Signal(range(2*N))
+        with m.If(dut.input.consume):
+            m.d.sync += count.eq(count + 1)
+        m.d.comb += dut.inverse.eq(count[-1])
+
+        out = fft_process(StreamTestbench(m, dut.input, dut.output), sum(frames, []), input_idle_cycles=1)
+        transforms = [np_fft, lambda x, n: N*np_ifft(x, n=n)] * 2
+        expected = [ y for f, frame in zip(transforms, frames) for y in f(frame, n=N) ]
+        self.assertEqual(len(out), len(expected))
+        for x,y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=0.02)
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,48 @@
+import unittest
+
+from dsp_sandbox.sliding_dft import SlidingDFT
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from stream_helper import stream_process
+
+import numpy as np
+
+class TestSlidingDFT(unittest.TestCase):
+
+    def check_sliding_dft(self, N, bins, n_samples, **kwargs):
+        shape = Q(1, 15)
+        dut = SlidingDFT(shape, N, bins)
+        samples = (np.random.uniform(-1, 1, n_samples) + 1j * np.random.uniform(-1, 1, n_samples)) / 2
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), samples)
+        out = stream_process(dut, dut.input, dut.output, input_sequence, cycles=4*len(bins)*n_samples, **kwargs)
+
+        self.assertEqual(len(out), len(bins) * n_samples)
+        padded = np.concatenate([np.zeros(N), samples])
+        for n in range(n_samples):
+            expected = np.fft.fft(padded[n+1:n+N+1])[bins]
+            for value, ref in zip(out[n*len(bins):(n+1)*len(bins)], expected):
+                self.assertAlmostEqual(value, ref, delta=0.005)
+
+    def test_sliding_dft(self):
+        self.check_sliding_dft(16, [1, 3, 7, 12], 48)
+
+    def test_single_bin(self):
+        self.check_sliding_dft(32, [5], 80, input_idle_cycles=1, output_stall_cycles=1)
+
+    def test_long_run(self):
+        # The error must stay bounded over a long run, well beyond the window length
+        N, bins, n_samples = 16, [5], 100_000
+        shape = Q(1, 15)
+        dut = SlidingDFT(shape, N, bins)
+        samples = (np.random.uniform(-1, 1, n_samples) + 1j * np.random.uniform(-1, 1, n_samples)) / 2
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), samples)
+        out = stream_process(dut, dut.input, dut.output, input_sequence, cycles=len(bins)*n_samples + 100)
+
+        self.assertEqual(len(out), len(bins) * n_samples)
+        padded = np.concatenate([np.zeros(N-1), samples])
+        expected = np.fft.fft(np.lib.stride_tricks.sliding_window_view(padded, N), axis=1)[:, bins]
+        error = np.abs(np.array(out).reshape(n_samples, len(bins)) - expected)
+        self.assertLess(error.max(), 1e-3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from dsp_sandbox.stft import STFT
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from stream_helper import stream_process
+
+import numpy as np
+from scipy.signal import get_window
+
+class TestSTFT(unittest.TestCase):
+
+    def stft_testbench(self, N, hop, input_idle_cycles):
+        shape = Q(1, 11)
+        samples = np.random.uniform(-0.5, 0.5, 4*hop) + 1j * np.random.uniform(-0.5, 0.5, 4*hop)
+        dut = STFT(N=N, hop=hop, shape=shape)
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), samples)
+        out = stream_process(dut, dut.input, dut.output, input_sequence, input_idle_cycles=input_idle_cycles,
+                             cycles=16*N)
+
+        padded = np.concatenate([np.zeros(N - hop), samples])
+        w = get_window("hann", N, fftbins=False)
+        expected = np.concatenate([ np.fft.fft(w * padded[k*hop:k*hop+N]) for k in range(len(samples) // hop) ])
+        self.assertEqual(len(out), len(expected))
+        for x, y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=0.02)
+
+    def test_stft_50_overlap(self):
+        self.stft_testbench(N=32, hop=16, input_idle_cycles=1)
+
+    def test_stft_75_overlap(self):
+        self.stft_testbench(N=32, hop=8, input_idle_cycles=3)
+
+if __name__ == "__main__":
+    unittest.main()
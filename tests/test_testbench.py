@@ -0,0 +1,60 @@
+import unittest
+
+from dsp_sandbox.testbench import StreamTestbench
+from dsp_sandbox.skid_buffer import StreamSkidBuffer
+from dsp_sandbox.gearbox import StreamGearbox
+from dsp_sandbox.streams import ComplexStream, SampleStream
+from dsp_sandbox.types.fixed_point import Q
+
+import numpy as np
+
+
+class TestStreamTestbench(unittest.TestCase):
+
+    def samples(self, n, shape):
+        rng = np.random.default_rng(0)
+        return rng.integers(-2**(len(shape)-1), 2**(len(shape)-1), size=(n, 2))
+
+    def test_patterns(self):
+        shape = Q(2, 6)
+        x = self.samples(300, shape)
+        # Every run starts from a reset of the same simulator
+        dut = StreamSkidBuffer(ComplexStream, shape, reg_output=True)
+        testbench = StreamTestbench(dut, dut.input, dut.output)
+        for input_valid, output_ready in [((1,), (1,)), ((1, 0, 0), (1,)), ((1,), (0, 1, 1, 0)),
+                                          ((0, 1, 1), (1, 0, 0, 0, 1)), ((0,)*10 + (1,)*54, (1,)*63 + (0,))]:
+            with self.subTest(input_valid=input_valid, output_ready=output_ready):
+                out = testbench.run(x, input_valid=input_valid, output_ready=output_ready)
+                self.assertTrue(np.array_equal(out, x))
+
+    def test_count(self):
+        shape = Q(1, 9)
+        x = self.samples(100, shape)
+        dut = StreamSkidBuffer(ComplexStream, shape)
+        out = StreamTestbench(dut, dut.input, dut.output).run(x, count=40)
+        self.assertTrue(np.array_equal(out, x[:40]))
+
+        # Runs stopped by `max_cycles` return the samples received so far
+        dut = StreamSkidBuffer(ComplexStream, shape)
+        out = StreamTestbench(dut, dut.input, dut.output).run(x, output_ready=(1, 0), max_cycles=100)
+        self.assertLess(len(out), len(x))
+        self.assertTrue(np.array_equal(out, x[:len(out)]))
+
+    def test_parallel_streams(self):
+        shape = Q(1, 7)
+        x = self.samples(64, shape)
+        for parallelism_in, parallelism_out in [(1, 4), (4, 2)]:
+            with self.subTest(parallelism_in=parallelism_in, parallelism_out=parallelism_out):
+                dut = StreamGearbox(shape, parallelism_in, parallelism_out)
+                out = StreamTestbench(dut, dut.input, dut.output).run(x, output_ready=(1, 1, 0))
+                self.assertTrue(np.array_equal(out, x))
+
+    def test_sample_stream(self):
+        x = np.arange(50) * 3
+        dut = StreamSkidBuffer(SampleStream, 8, reg_output=True)
+        out = StreamTestbench(dut, dut.input, dut.output).run(x, input_valid=(1, 0))
+        self.assertTrue(np.array_equal(out, x))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from dsp_sandbox.welch import PowerSpectrumAccumulator, PowerAveraging
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from stream_helper import stream_process
+
+import numpy as np
+
+def to_signed(value, width):
+    return value - (1 << width) if value >> (width - 1) else value
+
+class TestWelch(unittest.TestCase):
+
+    def test_linear_averaging(self):
+        N, K = 8, 4
+        shape = Q(6, 0)
+        dut = PowerSpectrumAccumulator(shape, N, K)
+        samples = np.random.randint(-31, 32, 3*N*K) + 1j * np.random.randint(-31, 32, 3*N*K)
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), samples)
+        out = stream_process(dut, dut.input, dut.output, input_sequence, output_stall_cycles=2, cycles=4*len(samples))
+
+        scale = 2**dut.shape_out.fraction_bits
+        out = [ to_signed(x, len(dut.shape_out)) / scale for x in out ]
+        power = samples.real**2 + samples.imag**2
+        expected = np.sum(power.reshape(-1, K, N), axis=1).flatten() / K
+        self.assertListEqual(out, list(expected))
+
+    def test_exponential_averaging(self):
+        N, K, alpha_shift = 4, 3, 2
+        shape = Q(6, 0)
+        dut = PowerSpectrumAccumulator(shape, N, K, averaging=PowerAveraging.EXPONENTIAL, alpha_shift=alpha_shift)
+        samples = np.random.randint(-31, 32, 4*N*K) + 1j * np.random.randint(-31, 32, 4*N*K)
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), samples)
+        out = stream_process(dut, dut.input, dut.output, input_sequence, input_idle_cycles=1, cycles=4*len(samples))
+
+        # Integer model, with alpha_shift fraction bits
+        acc = np.zeros(N, dtype=np.int64)
+        expected = []
+        for frame_idx, frame in enumerate(samples.reshape(-1, N)):
+            power = (frame.real**2 + frame.imag**2).astype(np.int64)
+            acc = acc + (((power << alpha_shift) - acc) >> alpha_shift)
+            if frame_idx % K == K - 1:
+                expected += list(acc)
+        out = [ to_signed(x, len(dut.shape_out)) for x in out ]
+        self.assertListEqual(out, expected)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,13 @@
 import unittest
-from amaranth import unsigned, C
+from amaranth import unsigned, C, Module, Signal
 from dsp_sandbox.window import CyclicStream, Window
 from dsp_sandbox.types.complex import ComplexConst
 from dsp_sandbox.types.fixed_point import Q
 from stream_helper import stream_process
+from scipy.signal import get_window
+
+def quantize(values, fraction_bits):
+    return [ round(v * 2**fraction_bits) / 2**fraction_bits for v in values ]
 
 class TestWindow(unittest.TestCase):
     def test_cyclic_stream(self):
@@ -13,13 +17,35 @@ class TestWindow(unittest.TestCase):
         self.assertListEqual(out[:2*len(samples)], 2*list(range(32)))
 
     def test_window(self):
-        N = 32
+        for N in [32, 33]:
+            shape = Q(5, 10)
+            dut = Window(shape, N)
+            samples = [ 1 for i in range(2*N) ]
+            input_seq = map(lambda x: ComplexConst(shape=shape, value=x), samples)
+            out = stream_process(dut, dut.input, dut.output, input_seq, output_stall_cycles=1, cycles=6*N)
+            expected = 2 * quantize(get_window("hann", N, fftbins=False), 10)
+            self.assertListEqual(out, expected)
+
+    def test_window_select(self):
+        N = 16
         shape = Q(5, 10)
-        dut = Window(shape, 32)
-        samples = [ 1 for i in range(N) ]
+        windows = ["hann", "blackman", ("kaiser", 8.0)]
+        dut = Window(shape, N, window=windows)
+
+        # Select the window for the next frame in the middle of the current one
+        m = Module()
+        m.submodules.window = dut
+        count = Signal(range(N))
+        with m.If(dut.input.consume):
+            m.d.sync += count.eq(count + 1)
+            with m.If(count == N // 2):
+                m.d.sync += dut.select.eq(dut.select + 1)
+
+        samples = [ 1 for i in range(3*N) ]
         input_seq = map(lambda x: ComplexConst(shape=shape, value=x), samples)
-        out = stream_process(dut, dut.input, dut.output, input_seq, cycles=200)
-        # TODO: compare to expected output
+        out = stream_process(m, dut.input, dut.output, input_seq, cycles=6*N)
+        expected = [ w for window in windows for w in quantize(get_window(window, N, fftbins=False), 10) ]
+        self.assertListEqual(out, expected)
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from dsp_sandbox.zero_padded_fft import ZeroPaddedFFT
+from dsp_sandbox.types.fixed_point import Q
+from dsp_sandbox.types.complex import ComplexConst
+from numpy.fft import fft as np_fft
+from stream_helper import stream_process
+
+import numpy as np
+
+class TestZeroPaddedFFT(unittest.TestCase):
+
+    def check_zero_padded_fft(self, N, L, first_bin=0, bins=None, **kwargs):
+        shape = Q(1, 12)
+        dut = ZeroPaddedFFT(N=N, L=L, shape=shape, first_bin=first_bin, bins=bins)
+        frames = [ (np.random.uniform(-1, 1, L) + 1j * np.random.uniform(-1, 1, L)) / 2 for _ in range(3) ]
+        input_sequence = map(lambda x: ComplexConst(shape=shape, value=x), np.concatenate(frames))
+        out = stream_process(dut, dut.input, dut.output, input_sequence, cycles=3*8*N, **kwargs)
+
+        bins = bins or N - first_bin
+        expected = [ y for frame in frames for y in np_fft(frame, n=N)[first_bin:first_bin+bins] ]
+        self.assertEqual(len(out), len(expected))
+        for x, y in zip(out, expected):
+            self.assertAlmostEqual(x, y, delta=0.02)
+
+    def test_zero_padding(self):
+        self.check_zero_padded_fft(64, 16, output_stall_cycles=1)
+
+    def test_partial_output(self):
+        self.check_zero_padded_fft(64, 16, first_bin=21, bins=10)
+
+    def test_single_residue(self):
+        # Bins that are multiples of N/L only need the zero residue
+        self.check_zero_padded_fft(32, 8, first_bin=8, bins=1, input_idle_cycles=2)
+
+if __name__ == "__main__":
+    unittest.main()